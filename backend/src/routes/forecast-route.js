@@ -1,4 +1,5 @@
 import express from 'express';
+import { gzipSync } from 'zlib';
 import forecastDataModel from '../models/forecast-data-model.js';
 
 const router = express.Router();
@@ -6,6 +7,24 @@ const router = express.Router();
 // Forecast service base URL
 const FORECAST_SERVICE_URL = process.env.FORECAST_SERVICE_URL || 'http://localhost:8000';
 
+// Request bodies at least this large are sent gzip-compressed
+const GZIP_MIN_BYTES = 4096;
+
+/**
+ * Headers and body for a JSON POST to the forecast service.
+ * Long histories are gzip-compressed (the service decodes Content-Encoding)
+ */
+const jsonBody = (payload) => {
+  const json = JSON.stringify(payload);
+  if (Buffer.byteLength(json) < GZIP_MIN_BYTES) {
+    return { headers: { 'Content-Type': 'application/json' }, body: json };
+  }
+  return {
+    headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'gzip' },
+    body: gzipSync(json)
+  };
+};
+
 /**
  * Get revenue forecast for a business using real data
  * GET /api/forecast/revenue/:businessId
@@ -29,8 +48,7 @@ router.get('/revenue/:businessId', async (req, res) => {
     // Call forecast microservice
     const response = await fetch(`${FORECAST_SERVICE_URL}/business/revenue`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({
+      ...jsonBody({
         business_id: businessId,
         revenue_history: revenueHistory,
         steps: forecastSteps,
@@ -73,8 +91,7 @@ router.get('/category/:businessId/:categoryId', async (req, res) => {
     // Call forecast microservice
     const response = await fetch(`${FORECAST_SERVICE_URL}/business/category-demand`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({
+      ...jsonBody({
         category_id: categoryId,
         sales_history: salesHistory,
         steps: forecastSteps,
@@ -117,8 +134,7 @@ router.get('/product/:businessId/:productId', async (req, res) => {
     // Call forecast microservice
     const response = await fetch(`${FORECAST_SERVICE_URL}/business/ingredient-usage`, {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({
+      ...jsonBody({
         ingredient_id: productId,
         usage_history: usageHistory,
         steps: forecastSteps,
@@ -187,8 +203,7 @@ router.get('/reorder-alerts/:businessId', async (req, res) => {
           
           const response = await fetch(`${FORECAST_SERVICE_URL}/business/reorder-alert`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
+            ...jsonBody({
               ingredient_id: item.product_id.toString(),
               current_stock: parseFloat(item.current_stock),
               usage_history: usageHistory,
@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+
+ACCURACY_DB = os.getenv("FORECAST_ACCURACY_DB", "forecast_accuracy.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending (
+    entity_id TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    target TEXT NOT NULL,
+    forecast REAL NOT NULL,
+    issued_at REAL NOT NULL,
+    PRIMARY KEY (entity_id, engine, target)
+);
+CREATE TABLE IF NOT EXISTS accuracy (
+    entity_id TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    mean_error REAL NOT NULL,
+    m2_error REAL NOT NULL,
+    mae REAL NOT NULL,
+    mse REAL NOT NULL,
+    n_pct INTEGER NOT NULL,
+    mape REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (entity_id, engine)
+);
+"""
+
+def _update(stats, actual, forecast):
+    """Welford update of running error statistics with one (actual, forecast) pair"""
+    n, mean_error, m2_error, mae, mse, n_pct, mape = stats
+    error = actual - forecast
+    n += 1
+    delta = error - mean_error
+    mean_error += delta / n
+    m2_error += delta * (error - mean_error)
+    mae += (abs(error) - mae) / n
+    mse += (error * error - mse) / n
+    if actual != 0:
+        n_pct += 1
+        mape += (abs(error / actual) * 100 - mape) / n_pct
+    return n, mean_error, m2_error, mae, mse, n_pct, mape
+
+class AccuracyStore:
+    """
+    Forecasts issued per (entity, engine) and running accuracy of the ones
+    whose actuals have arrived, kept in SQLite.
+
+    Each issued value waits in `pending` (a re-issued date replaces the
+    earlier forecast) until a later history covers its date; it is then
+    folded into the entity's running MAE, RMSE, MAPE and bias in O(1) and
+    dropped, so no forecast is scored twice and nothing is refitted.
+    """
+    def __init__(self, path=ACCURACY_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def issue(self, entity_id, engine, index, forecast):
+        """Record forecast values for the dates in index"""
+        now = time.time()
+        rows = [
+            (entity_id, engine, date.isoformat(), float(value), now)
+            for date, value in zip(index, np.asarray(forecast, dtype=np.float64))
+            if np.isfinite(value)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pending (entity_id, engine, target, forecast, issued_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def score(self, entity_id, series):
+        """
+        Fold the actuals in a date-indexed series into the accuracy of every
+        pending forecast of the entity they cover. Pending dates up to the
+        series' last date are dropped whether or not an actual exists (e.g.
+        before a truncated history). Returns the number of points scored.
+        """
+        if len(series) == 0:
+            return 0
+        last = series.index[-1].isoformat()
+        actuals = dict(zip((date.isoformat() for date in series.index), np.asarray(series, dtype=np.float64)))
+        scored = 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT engine, target, forecast FROM pending WHERE entity_id = ? AND target <= ? ORDER BY engine, target",
+                (entity_id, last)
+            ).fetchall()
+            if not rows:
+                return 0
+            by_engine = {}
+            for engine, target, forecast in rows:
+                actual = actuals.get(target)
+                if actual is not None and np.isfinite(actual):
+                    by_engine.setdefault(engine, []).append((actual, forecast))
+            self._conn.execute("BEGIN")
+            try:
+                for engine, pairs in by_engine.items():
+                    row = self._conn.execute(
+                        "SELECT n, mean_error, m2_error, mae, mse, n_pct, mape FROM accuracy WHERE entity_id = ? AND engine = ?",
+                        (entity_id, engine)
+                    ).fetchone()
+                    stats = row or (0, 0.0, 0.0, 0.0, 0.0, 0, 0.0)
+                    for actual, forecast in pairs:
+                        stats = _update(stats, actual, forecast)
+                    self._conn.execute(
+                        """INSERT OR REPLACE INTO accuracy
+                           (entity_id, engine, n, mean_error, m2_error, mae, mse, n_pct, mape, updated_at)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        (entity_id, engine, *stats, time.time())
+                    )
+                    scored += len(pairs)
+                self._conn.execute("DELETE FROM pending WHERE entity_id = ? AND target <= ?", (entity_id, last))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return scored
+
+    def query(self, entity_id=None, engine=None):
+        """
+        Running accuracy per (entity, engine), optionally filtered, with
+        pending forecast counts. entity_id matches the key itself and the
+        keys under it (ingredient:12 also matches ingredient:12/reorder-alert).
+        """
+        clauses, args = [], []
+        if entity_id is not None:
+            clauses.append("(a.entity_id = ? OR substr(a.entity_id, 1, ?) = ?)")
+            args.extend([entity_id, len(entity_id) + 1, entity_id + "/"])
+        if engine is not None:
+            clauses.append("a.engine = ?")
+            args.append(engine)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT a.entity_id, a.engine, a.n, a.mean_error, a.m2_error, a.mae, a.mse, a.n_pct, a.mape,
+                           a.updated_at,
+                           (SELECT COUNT(*) FROM pending p WHERE p.entity_id = a.entity_id AND p.engine = a.engine)
+                    FROM accuracy a {where} ORDER BY a.entity_id, a.engine""",
+                args
+            ).fetchall()
+        return [
+            {
+                "entity_id": entity_id,
+                "engine": engine,
+                "points": n,
+                "mae": mae,
+                "rmse": float(np.sqrt(mse)),
+                "mape": mape if n_pct else None,
+                "bias": mean_error,
+                "error_std": float(np.sqrt(m2_error / (n - 1))) if n > 1 else None,
+                "pending": pending,
+                "updated_at": updated_at
+            }
+            for entity_id, engine, n, mean_error, m2_error, mae, mse, n_pct, mape, updated_at, pending in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+# Coarse frequencies a daily history can be fitted at, and the calendar
+# periods their forecasts are spread over
+AGGREGATIONS = {"W": "W-SUN", "MS": "M"}
+# Fewest complete periods a coarse fit is attempted on
+MIN_PERIODS = 8
+
+def _check(series, aggregate):
+    if aggregate not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregate '{aggregate}', expected one of {tuple(AGGREGATIONS)}")
+    freq = series.index.freq or (to_offset(pd.infer_freq(series.index)) if len(series) >= 3 else None)
+    if freq is None or freq.freqstr != "D":
+        raise ValueError("aggregate needs a daily history")
+
+def aggregate(series, aggregate):
+    """
+    Totals of a daily series per complete week (Monday-Sunday, 'W') or
+    calendar month ('MS'), as one grouped sum. Partial periods at either end
+    are dropped so every coarse point covers the same span of days.
+    """
+    _check(series, aggregate)
+    periods = series.index.to_period(AGGREGATIONS[aggregate])
+    values = pd.Series(np.asarray(series, dtype=np.float64), index=series.index)
+    grouped = values.groupby(periods)
+    totals, counts = grouped.sum(), grouped.size()
+    length = (counts.index.end_time.normalize() - counts.index.start_time).days + 1
+    complete = counts.to_numpy() == length.to_numpy()
+    totals = totals[complete]
+    if len(totals) < MIN_PERIODS:
+        raise ValueError(f"aggregate='{aggregate}' needs at least {MIN_PERIODS} complete periods, got {len(totals)}")
+    index = totals.index.to_timestamp(how="start")
+    return pd.Series(totals.to_numpy(), index=pd.DatetimeIndex(index, freq="infer"), name=series.name)
+
+def weekday_profile(series):
+    """
+    Relative level of each weekday (Monday first, mean 1) over the history,
+    used to spread a period's total over its days. Flat when the history has
+    no positive mass.
+    """
+    values = np.asarray(series, dtype=np.float64)
+    weekdays = series.index.dayofweek.to_numpy()
+    sums = np.bincount(weekdays, weights=values, minlength=7)
+    counts = np.bincount(weekdays, minlength=7)
+    means = np.clip(np.divide(sums, counts, out=np.zeros(7), where=counts > 0), 0, None)
+    if means.sum() <= 0:
+        return np.ones(7)
+    return means * 7 / means.sum()
+
+def horizon(series, coarse, steps, aggregate):
+    """Number of coarse periods after the last complete one that cover the next `steps` days"""
+    freq = AGGREGATIONS[aggregate]
+    last_day = series.index[-1] + pd.Timedelta(days=steps)
+    return (last_day.to_period(freq) - coarse.index[-1].to_period(freq)).n
+
+def disaggregate(series, coarse, moments, steps, aggregate):
+    """
+    Daily (forecast, lower, upper) for the `steps` days after the history
+    from coarse-period forecasts. Each day receives its weekday's share of
+    its period's total, with the period's days weighted by weekday_profile;
+    interval bounds, quantile rows and sample paths are split with the same
+    shares (None entries pass through).
+    """
+    freq = AGGREGATIONS[aggregate]
+    profile = weekday_profile(series)
+    days = pd.date_range(series.index[-1] + pd.Timedelta(days=1), periods=steps, freq="D")
+    periods = days.to_period(freq)
+    offsets = np.asarray([(p - coarse.index[-1].to_period(freq)).n for p in periods]) - 1
+    weights = {
+        p: profile[pd.date_range(p.start_time, p.end_time.normalize(), freq="D").dayofweek].sum()
+        for p in periods.unique()
+    }
+    shares = profile[days.dayofweek] / np.asarray([weights[p] for p in periods])
+    return tuple(None if values is None else np.asarray(values)[..., offsets] * shares for values in moments)
@@ -1,15 +1,62 @@
+import functools
+from contextlib import asynccontextmanager
+from datetime import date
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import Annotated, List, Optional, Dict, Any, Literal
 import pandas as pd
 import model
+from exogenous import build_exog
+from preprocessing import regularize, clean_outliers
+from low_memory import compact_frame, track_peak_memory
+import jobs
+import datasource
+import bulk_import
+import history_store
+import scheduling
+from response_cache import CACHE_TTL, ETagMiddleware
+from fast_json import NumpyRoute
+from compression import CompressionMiddleware
+
+@asynccontextmanager
+async def lifespan(app):
+    # Created here rather than at import, so worker processes and tools that
+    # import this module do not open the job database
+    app.state.job_store = jobs.JobStore(JOB_HANDLERS)
+    app.state.job_store.start()
+    yield
+    app.state.job_store.stop()
+    app.state.job_store.queue.close()
+    jobs.shutdown_pool()
+    model.close_stores()
 
 app = FastAPI(
     title="Forecast Service",
     description="Microservice for time series forecasting using ARIMA and SARIMA models",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+# Endpoint results (dicts holding NumPy arrays) are written by orjson, not jsonable_encoder
+app.router.route_class = NumpyRoute
+
+# Cache-Control max-age per route, in seconds. Responses are reused for that long
+# for an identical request; routes at 0 only get ETags and 304s
+CACHE_MAX_AGE = {
+    "/forecast": CACHE_TTL,
+    "/forecast/auto": CACHE_TTL,
+    "/forecast/manual": CACHE_TTL,
+    "/evaluate": CACHE_TTL,
+    "/business/ingredient-usage": CACHE_TTL,
+    "/business/category-demand": CACHE_TTL,
+    "/business/revenue": CACHE_TTL,
+    "/business/reorder-alert": min(CACHE_TTL, 60),
+    "/accuracy": 0,
+}
+
+# Added before CORS so cached responses still pass through it. Requests with a
+# source read the database, so the same body can see new sales: never cached
+app.add_middleware(ETagMiddleware, max_age=CACHE_MAX_AGE, uncached_fields=("source",))
 
 # CORS middleware for frontend integration
 app.add_middleware(
@@ -20,57 +67,245 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost: decodes gzip/zstd request bodies and compresses large responses
+app.add_middleware(CompressionMiddleware)
+
 # Request/Response Models
 class DataPoint(BaseModel):
     date: str
     value: float
-
-class ForecastRequest(BaseModel):
-    series: List[DataPoint]
+    exog: Optional[Dict[str, float]] = Field(default=None, description="Covariates for this date, e.g. {\"promo\": 1, \"price\": 45.0}")
+
+Engine = Literal["auto", "sarima", "fourier"]
+ENGINE_DESCRIPTION = "Fitting engine: sarima, fourier (Fourier terms + ARIMA for long daily histories) or auto"
+FUTURE_EXOG_DESCRIPTION = "Covariate values for each forecast step, same keys as the data point exog"
+HOLIDAYS_DESCRIPTION = "Add built-in holiday, holiday eve and payday regressors"
+Aggregate = Literal["W", "MS"]
+AGGREGATE_DESCRIPTION = (
+    "Fit a daily history as weekly (W) or monthly (MS) totals and spread the forecast back over the days "
+    "by weekday profile. Not combined with covariates"
+)
+ENTITY_DESCRIPTION = "Stable id of the forecasted series (e.g. a product id); later fits for it start from this fit's parameters"
+
+class ExogenousFields(BaseModel):
+    future_exog: Optional[List[Dict[str, float]]] = Field(default=None, description=FUTURE_EXOG_DESCRIPTION)
+    holidays: bool = Field(default=False, description=HOLIDAYS_DESCRIPTION)
+
+class MemoryFields(BaseModel):
+    low_memory: bool = Field(
+        default=False,
+        description="Keep the history as one contiguous float32 array where accuracy permits, fit without "
+                    "per-observation filter output and report the request's peak memory"
+    )
+    max_history: Optional[int] = Field(default=None, gt=0, description="Fit on at most this many of the most recent periods")
+
+class DistributionFields(BaseModel):
+    quantiles: Optional[List[Annotated[float, Field(gt=0, lt=1)]]] = Field(
+        default=None,
+        max_length=99,
+        description="Forecast quantiles to return, e.g. [0.5, 0.8, 0.95], all from the same fit"
+    )
+    sample_paths: int = Field(default=0, ge=0, le=1000, description="Number of simulated forecast paths to return")
+
+FillMethod = Literal["zero", "interpolate", "ffill"]
+FILL_DESCRIPTION = "How missing periods are filled: zero (no events), interpolate or ffill"
+
+class ResamplingFields(MemoryFields):
+    frequency: Optional[str] = Field(default=None, description="Pandas frequency such as D, W or MS; inferred when omitted")
+    fill_method: FillMethod = Field(default="interpolate", description=FILL_DESCRIPTION)
+    duplicates: Literal["sum", "mean", "last"] = Field(default="sum", description="How repeated dates are aggregated")
+    end_date: Optional[str] = Field(default=None, description="Extend the history to this date, e.g. trailing days without sales")
+    clean_outliers: bool = Field(default=False, description="Winsorize outliers (rolling median/MAD) and report level shifts before fitting")
+    outlier_threshold: float = Field(default=3.5, gt=0, description="Robust deviations beyond which a point is an outlier")
+
+class SalesResamplingFields(ResamplingFields):
+    fill_method: FillMethod = Field(default="zero", description=FILL_DESCRIPTION + ". Days without sales count as zero")
+
+class DatabaseHistory(BaseModel):
+    days: int = Field(default=datasource.DEFAULT_DAYS, gt=0, le=3650, description="Days of history to load")
+    until: Optional[str] = Field(default=None, description="Last day of the history (default: today)")
+    business_id: Optional[str] = Field(default=None, description="Business of the category (category-demand only)")
+
+class SourceFields(BaseModel):
+    source: Optional[DatabaseHistory] = Field(
+        default=None,
+        description="Load the history with the backend's aggregation SQL instead of sending it in the request"
+    )
+
+class StoredHistory(BaseModel):
+    store: str = Field(description="History store written by a bulk import")
+    offset: int = Field(ge=0, description="First point of the entity in the store")
+    length: int = Field(gt=0, description="Number of points of the entity")
+
+class StoredHistoryFields(BaseModel):
+    stored_history: Optional[StoredHistory] = Field(
+        default=None,
+        description="Read the history from a memory-mapped history store instead of the request (set by /jobs/import)"
+    )
+
+class ForecastRequest(ExogenousFields, DistributionFields, StoredHistoryFields, ResamplingFields):
+    series: List[DataPoint] = Field(default_factory=list)
+    entity_id: Optional[str] = Field(default=None, description=ENTITY_DESCRIPTION)
     steps: int = Field(default=6, gt=0, le=365, description="Number of periods to forecast")
     seasonal: bool = Field(default=True, description="Use SARIMA (True) or ARIMA (False)")
     seasonal_period: Optional[int] = Field(default=None, description="Seasonal period (e.g., 12 for monthly, 4 for quarterly)")
     confidence_level: float = Field(default=0.95, ge=0.5, le=0.99, description="Confidence interval level")
+    engine: Engine = Field(default="auto", description=ENGINE_DESCRIPTION)
+    aggregate: Optional[Aggregate] = Field(default=None, description=AGGREGATE_DESCRIPTION)
 
-class ManualForecastRequest(BaseModel):
+class ManualForecastRequest(ExogenousFields, DistributionFields, ResamplingFields):
     series: List[DataPoint]
+    entity_id: Optional[str] = Field(default=None, description=ENTITY_DESCRIPTION)
     steps: int = Field(default=6, gt=0, le=365)
     order: tuple = Field(default=(1, 1, 1), description="ARIMA order (p, d, q)")
     seasonal_order: Optional[tuple] = Field(default=None, description="Seasonal order (P, D, Q, m)")
     confidence_level: float = Field(default=0.95, ge=0.5, le=0.99)
 
-class ModelEvaluationRequest(BaseModel):
+class ModelEvaluationRequest(ResamplingFields):
     series: List[DataPoint]
     test_size: int = Field(default=6, gt=0, description="Number of periods for testing")
     seasonal: bool = Field(default=True)
     seasonal_period: Optional[int] = Field(default=None)
+    engine: Engine = Field(default="auto", description=ENGINE_DESCRIPTION)
+    holidays: bool = Field(default=False, description=HOLIDAYS_DESCRIPTION)
 
-class IngredientUsageRequest(BaseModel):
+class IngredientUsageRequest(ExogenousFields, DistributionFields, SourceFields, StoredHistoryFields, SalesResamplingFields):
     ingredient_id: str
-    usage_history: List[DataPoint]
+    usage_history: List[DataPoint] = Field(default_factory=list)
     steps: int = Field(default=7, gt=0, le=90, description="Days to forecast")
     seasonal: bool = Field(default=True)
     seasonal_period: int = Field(default=7, description="Default: weekly pattern")
+    engine: Engine = Field(default="auto", description=ENGINE_DESCRIPTION)
+    aggregate: Optional[Aggregate] = Field(default=None, description=AGGREGATE_DESCRIPTION)
 
-class CategoryDemandRequest(BaseModel):
+class CategoryDemandRequest(ExogenousFields, DistributionFields, SourceFields, StoredHistoryFields, SalesResamplingFields):
     category_id: str
-    sales_history: List[DataPoint]
+    sales_history: List[DataPoint] = Field(default_factory=list)
     steps: int = Field(default=30, gt=0, le=365, description="Days to forecast")
     seasonal: bool = Field(default=True)
+    engine: Engine = Field(default="auto", description=ENGINE_DESCRIPTION)
+    aggregate: Optional[Aggregate] = Field(default=None, description=AGGREGATE_DESCRIPTION)
 
-class RevenueRequest(BaseModel):
+class RevenueRequest(ExogenousFields, DistributionFields, SourceFields, StoredHistoryFields, SalesResamplingFields):
     business_id: str
-    revenue_history: List[DataPoint]
-    steps: int = Field(default=6, gt=0, le=12, description="Months to forecast")
+    revenue_history: List[DataPoint] = Field(default_factory=list)
+    steps: int = Field(
+        default=6, gt=0, le=12,
+        description="Months to forecast (periods of the history; weeks with aggregate W)"
+    )
     seasonal: bool = Field(default=True)
-
-class ReorderAlertRequest(BaseModel):
+    engine: Engine = Field(default="auto", description=ENGINE_DESCRIPTION)
+    aggregate: Optional[Aggregate] = Field(
+        default=None,
+        description="Fit a daily history as weekly (W) or monthly (MS) totals and forecast one total per period. "
+                    "Not combined with covariates"
+    )
+
+class ReorderAlertRequest(ExogenousFields, SourceFields, SalesResamplingFields):
     ingredient_id: str
     current_stock: float
-    usage_history: List[DataPoint]
+    usage_history: List[DataPoint] = Field(default_factory=list)
     reorder_point: float = Field(description="Stock level to trigger alert")
     lead_time_days: int = Field(default=3, description="Days to receive new stock")
     safety_stock: float = Field(default=0, description="Additional buffer stock")
+    engine: Engine = Field(default="auto", description=ENGINE_DESCRIPTION)
+    aggregate: Optional[Aggregate] = Field(default=None, description=AGGREGATE_DESCRIPTION)
+
+class DriftEntity(BaseModel):
+    entity_id: str = Field(description="Entity id as used by the forecasting endpoints, e.g. ingredient:12")
+    series: List[DataPoint]
+    seasonal: bool = Field(default=True)
+    seasonal_period: Optional[int] = Field(default=None, description="Seasonal period the entity is forecast with")
+
+class DriftCheckRequest(SalesResamplingFields):
+    entities: List[DriftEntity] = Field(min_length=1)
+
+REORDER_HORIZON = 30
+
+def to_frame(points):
+    """Build a date-indexed, sorted DataFrame (value + covariate columns) from data points"""
+    columns = {"value": [dp.value for dp in points]}
+    if any(dp.exog for dp in points):
+        covariates = pd.DataFrame([dp.exog or {} for dp in points])
+        columns.update({name: covariates[name].to_numpy() for name in covariates.columns})
+    df = pd.DataFrame(columns, index=pd.DatetimeIndex(pd.to_datetime([dp.date for dp in points]), name="date"))
+    return df if df.index.is_monotonic_increasing else df.sort_index(kind="stable")
+
+def load_history(points, request, query=None, **ids):
+    """
+    The request's history and the date it runs to: the data points as sent;
+    with request.stored_history, a frame over the entity's slice of a history
+    store; or, with request.source, a frame loaded by the datasource query up
+    to source.until (today by default), so days without sales at the end count.
+    """
+    stored = getattr(request, "stored_history", None)
+    if stored is not None:
+        dates, values = history_store.read_series(stored.store, stored.offset, stored.length)
+        return pd.DataFrame({"value": values}, index=pd.DatetimeIndex(dates, name="date"), copy=False), None
+    source = getattr(request, "source", None)
+    if source is None:
+        if not points:
+            raise ValueError("No history: send data points, set source or stored_history")
+        return points, None
+    until = pd.Timestamp(source.until).date() if source.until else date.today()
+    dates, values = datasource.get_source().history(query, days=source.days, until=until, **ids)
+    if len(values) == 0:
+        raise ValueError(f"No {query} history in the last {source.days} days")
+    frame = pd.DataFrame({"value": values}, index=pd.DatetimeIndex(dates.astype("datetime64[ns]"), name="date"))
+    return frame, until.isoformat()
+
+def prepare_frame(points, request, end_date=None, observed=False):
+    """
+    Parse data points (or take a loaded frame), put them on a regular
+    calendar and optionally clean outliers. request.end_date overrides end_date.
+    With observed, the values as sent (repeated dates aggregated, no gap
+    filling or cleaning) are returned as a third element, to score earlier
+    forecasts against.
+    """
+    df, report, *actuals = regularize(
+        points if isinstance(points, pd.DataFrame) else to_frame(points),
+        freq=request.frequency,
+        fill_method=request.fill_method,
+        duplicates=request.duplicates,
+        end_date=request.end_date or end_date,
+        observed=observed
+    )
+    if request.clean_outliers:
+        df, report["cleaning"] = clean_outliers(df, threshold=request.outlier_threshold)
+    if request.low_memory or request.max_history:
+        df, report["memory"] = compact_frame(df, max_history=request.max_history, float32=request.low_memory)
+    if getattr(request, "aggregate", None):
+        report["aggregated_to"] = request.aggregate
+    return (df, report, *actuals)
+
+def tracking_key(entity_id, endpoint):
+    """Key an endpoint's forecasts for an entity are tracked under, e.g. ingredient:12/reorder-alert"""
+    return None if entity_id is None else f"{entity_id}/{endpoint}"
+
+def memory_report(endpoint):
+    """Add the request's peak traced memory (None when it overlapped another) to low_memory responses"""
+    @functools.wraps(endpoint)
+    def wrapper(request):
+        if not request.low_memory:
+            return endpoint(request)
+        with track_peak_memory() as usage:
+            response = endpoint(request)
+        response["preprocessing"].setdefault("memory", {}).update(usage)
+        return response
+    return wrapper
+
+def distribution(result):
+    """Quantile and sample path fields of a model result, present only when requested"""
+    return {key: result[key] for key in ("quantiles", "sample_paths") if key in result}
+
+def exog_for(df, request, steps):
+    """Design matrices (X, X_future) for the covariates and calendar options of a request"""
+    return build_exog(
+        df.drop(columns="value"),
+        future_exog=getattr(request, "future_exog", None),
+        holidays=request.holidays,
+        steps=steps
+    )
 
 @app.get("/")
 def root():
@@ -83,6 +318,7 @@ def root():
     }
 
 @app.post("/forecast/auto")
+@memory_report
 def auto_forecast(request: ForecastRequest):
     """
     Automatic SARIMA/ARIMA forecasting using auto_arima for parameter selection.
@@ -94,24 +330,31 @@ def auto_forecast(request: ForecastRequest):
     - Model metrics
     """
     try:
-        df = pd.DataFrame([{"date": dp.date, "value": dp.value} for dp in request.series])
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-        df = df.sort_index()
+        history, end_date = load_history(request.series, request)
+        df, preprocessing, actuals = prepare_frame(history, request, end_date, observed=True)
+        exog, future_exog = exog_for(df, request, steps=request.steps)
 
         result = model.run_auto_forecast(
             series=df["value"],
             seasonal=request.seasonal,
             seasonal_period=request.seasonal_period,
             steps=request.steps,
-            confidence_level=request.confidence_level
+            confidence_level=request.confidence_level,
+            engine=request.engine,
+            exog=exog,
+            future_exog=future_exog,
+            entity_id=request.entity_id,
+            track_as=tracking_key(request.entity_id, "auto"),
+            actuals=actuals,
+            low_memory=request.low_memory,
+            aggregate=request.aggregate,
+            quantiles=request.quantiles,
+            sample_paths=request.sample_paths
         )
 
-        model_name = f"SARIMA{result['order']}x{result['seasonal_order']}" if request.seasonal else f"ARIMA{result['order']}"
-
         return {
             "success": True,
-            "model": model_name,
+            "model": result["model_name"],
             "order": result["order"],
             "seasonal_order": result["seasonal_order"],
             "forecast": result["forecast"],
@@ -121,6 +364,8 @@ def auto_forecast(request: ForecastRequest):
                 "level": request.confidence_level
             },
             "metrics": result["metrics"],
+            **distribution(result),
+            "preprocessing": preprocessing,
             "steps": request.steps
         }
 
@@ -128,6 +373,7 @@ def auto_forecast(request: ForecastRequest):
         raise HTTPException(status_code=400, detail=f"Forecast error: {str(e)}")
 
 @app.post("/forecast/manual")
+@memory_report
 def manual_forecast(request: ManualForecastRequest):
     """
     Manual SARIMA/ARIMA forecasting with user-specified parameters.
@@ -135,17 +381,23 @@ def manual_forecast(request: ManualForecastRequest):
     Use this when you know the optimal model parameters.
     """
     try:
-        df = pd.DataFrame([{"date": dp.date, "value": dp.value} for dp in request.series])
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-        df = df.sort_index()
+        df, preprocessing, actuals = prepare_frame(request.series, request, observed=True)
+        exog, future_exog = exog_for(df, request, steps=request.steps)
 
         result = model.run_manual_forecast(
             series=df["value"],
             order=request.order,
             seasonal_order=request.seasonal_order,
             steps=request.steps,
-            confidence_level=request.confidence_level
+            confidence_level=request.confidence_level,
+            exog=exog,
+            future_exog=future_exog,
+            entity_id=request.entity_id,
+            track_as=tracking_key(request.entity_id, "manual"),
+            actuals=actuals,
+            low_memory=request.low_memory,
+            quantiles=request.quantiles,
+            sample_paths=request.sample_paths
         )
 
         model_name = f"SARIMA{request.order}x{request.seasonal_order}" if request.seasonal_order else f"ARIMA{request.order}"
@@ -162,6 +414,8 @@ def manual_forecast(request: ManualForecastRequest):
                 "level": request.confidence_level
             },
             "metrics": result["metrics"],
+            **distribution(result),
+            "preprocessing": preprocessing,
             "steps": request.steps
         }
 
@@ -169,6 +423,7 @@ def manual_forecast(request: ManualForecastRequest):
         raise HTTPException(status_code=400, detail=f"Forecast error: {str(e)}")
 
 @app.post("/evaluate")
+@memory_report
 def evaluate_model(request: ModelEvaluationRequest):
     """
     Evaluate forecast model accuracy using train-test split.
@@ -179,16 +434,17 @@ def evaluate_model(request: ModelEvaluationRequest):
     - Model parameters
     """
     try:
-        df = pd.DataFrame([{"date": dp.date, "value": dp.value} for dp in request.series])
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-        df = df.sort_index()
+        df, preprocessing = prepare_frame(request.series, request)
+        exog, _ = exog_for(df, request, steps=0)
 
         result = model.evaluate_forecast(
             series=df["value"],
             test_size=request.test_size,
             seasonal=request.seasonal,
-            seasonal_period=request.seasonal_period
+            seasonal_period=request.seasonal_period,
+            engine=request.engine,
+            exog=exog,
+            low_memory=request.low_memory
         )
 
         return {
@@ -198,7 +454,8 @@ def evaluate_model(request: ModelEvaluationRequest):
             "predictions": result["predictions"],
             "actual": result["actual"],
             "train_size": result["train_size"],
-            "test_size": request.test_size
+            "test_size": request.test_size,
+            "preprocessing": preprocessing
         }
 
     except Exception as e:
@@ -209,6 +466,7 @@ def evaluate_model(request: ModelEvaluationRequest):
 # ============================================
 
 @app.post("/business/ingredient-usage")
+@memory_report
 def forecast_ingredient_usage(request: IngredientUsageRequest):
     """
     Forecast ingredient usage for inventory planning.
@@ -222,16 +480,25 @@ def forecast_ingredient_usage(request: IngredientUsageRequest):
     - Stock depletion date estimate
     """
     try:
-        df = pd.DataFrame([{"date": dp.date, "value": dp.value} for dp in request.usage_history])
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-        df = df.sort_index()
+        history, end_date = load_history(request.usage_history, request, "product_usage", product_id=request.ingredient_id)
+        df, preprocessing, actuals = prepare_frame(history, request, end_date=end_date, observed=True)
+        exog, future_exog = exog_for(df, request, steps=request.steps)
 
         result = model.forecast_ingredient_usage(
             series=df["value"],
             steps=request.steps,
             seasonal=request.seasonal,
-            seasonal_period=request.seasonal_period
+            seasonal_period=request.seasonal_period,
+            engine=request.engine,
+            exog=exog,
+            future_exog=future_exog,
+            entity_id=f"ingredient:{request.ingredient_id}",
+            track_as=tracking_key(f"ingredient:{request.ingredient_id}", "ingredient-usage"),
+            actuals=actuals,
+            low_memory=request.low_memory,
+            aggregate=request.aggregate,
+            quantiles=request.quantiles,
+            sample_paths=request.sample_paths
         )
 
         return {
@@ -247,13 +514,16 @@ def forecast_ingredient_usage(request: IngredientUsageRequest):
             "average_daily_usage": result["avg_daily_usage"],
             "peak_usage_day": result["peak_day"],
             "model": result["model_name"],
-            "metrics": result["metrics"]
+            "metrics": result["metrics"],
+            **distribution(result),
+            "preprocessing": preprocessing
         }
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Ingredient usage forecast error: {str(e)}")
 
 @app.post("/business/category-demand")
+@memory_report
 def forecast_category_demand(request: CategoryDemandRequest):
     """
     Forecast demand for a product category.
@@ -267,15 +537,30 @@ def forecast_category_demand(request: CategoryDemandRequest):
     - Seasonality patterns
     """
     try:
-        df = pd.DataFrame([{"date": dp.date, "value": dp.value} for dp in request.sales_history])
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-        df = df.sort_index()
+        history, end_date = load_history(
+            request.sales_history,
+            request,
+            "category_sales",
+            business_id=request.source.business_id if request.source else None,
+            category_id=request.category_id
+        )
+        df, preprocessing, actuals = prepare_frame(history, request, end_date=end_date, observed=True)
+        exog, future_exog = exog_for(df, request, steps=request.steps)
 
         result = model.forecast_category_demand(
             series=df["value"],
             steps=request.steps,
-            seasonal=request.seasonal
+            seasonal=request.seasonal,
+            engine=request.engine,
+            exog=exog,
+            future_exog=future_exog,
+            entity_id=f"category:{request.category_id}",
+            track_as=tracking_key(f"category:{request.category_id}", "category-demand"),
+            actuals=actuals,
+            low_memory=request.low_memory,
+            aggregate=request.aggregate,
+            quantiles=request.quantiles,
+            sample_paths=request.sample_paths
         )
 
         return {
@@ -290,13 +575,16 @@ def forecast_category_demand(request: CategoryDemandRequest):
             "total_forecasted_demand": result["total_demand"],
             "trend": result["trend"],
             "model": result["model_name"],
-            "metrics": result["metrics"]
+            "metrics": result["metrics"],
+            **distribution(result),
+            "preprocessing": preprocessing
         }
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Category demand forecast error: {str(e)}")
 
 @app.post("/business/revenue")
+@memory_report
 def forecast_revenue(request: RevenueRequest):
     """
     Forecast total sales revenue for a business.
@@ -310,15 +598,24 @@ def forecast_revenue(request: RevenueRequest):
     - Financial metrics
     """
     try:
-        df = pd.DataFrame([{"date": dp.date, "value": dp.value} for dp in request.revenue_history])
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-        df = df.sort_index()
+        history, end_date = load_history(request.revenue_history, request, "daily_revenue", business_id=request.business_id)
+        df, preprocessing, actuals = prepare_frame(history, request, end_date=end_date, observed=True)
+        exog, future_exog = exog_for(df, request, steps=request.steps)
 
         result = model.forecast_revenue(
             series=df["value"],
             steps=request.steps,
-            seasonal=request.seasonal
+            seasonal=request.seasonal,
+            engine=request.engine,
+            exog=exog,
+            future_exog=future_exog,
+            entity_id=f"business:{request.business_id}",
+            track_as=tracking_key(f"business:{request.business_id}", "revenue"),
+            actuals=actuals,
+            low_memory=request.low_memory,
+            aggregate=request.aggregate,
+            quantiles=request.quantiles,
+            sample_paths=request.sample_paths
         )
 
         return {
@@ -335,13 +632,16 @@ def forecast_revenue(request: RevenueRequest):
             "growth_rate": result["growth_rate"],
             "trend": result["trend"],
             "model": result["model_name"],
-            "metrics": result["metrics"]
+            "metrics": result["metrics"],
+            **distribution(result),
+            "preprocessing": preprocessing
         }
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Revenue forecast error: {str(e)}")
 
 @app.post("/business/reorder-alert")
+@memory_report
 def check_reorder_alert(request: ReorderAlertRequest):
     """
     Intelligent reorder point system using forecast data.
@@ -356,17 +656,24 @@ def check_reorder_alert(request: ReorderAlertRequest):
     - Stock depletion timeline
     """
     try:
-        df = pd.DataFrame([{"date": dp.date, "value": dp.value} for dp in request.usage_history])
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-        df = df.sort_index()
+        history, end_date = load_history(request.usage_history, request, "product_usage", product_id=request.ingredient_id)
+        df, preprocessing, actuals = prepare_frame(history, request, end_date=end_date, observed=True)
+        exog, future_exog = exog_for(df, request, steps=REORDER_HORIZON)
 
         result = model.calculate_reorder_alert(
             series=df["value"],
             current_stock=request.current_stock,
             reorder_point=request.reorder_point,
             lead_time_days=request.lead_time_days,
-            safety_stock=request.safety_stock
+            safety_stock=request.safety_stock,
+            engine=request.engine,
+            exog=exog,
+            future_exog=future_exog,
+            entity_id=f"ingredient:{request.ingredient_id}",
+            track_as=tracking_key(f"ingredient:{request.ingredient_id}", "reorder-alert"),
+            actuals=actuals,
+            low_memory=request.low_memory,
+            aggregate=request.aggregate
         )
 
         return {
@@ -385,78 +692,235 @@ def check_reorder_alert(request: ReorderAlertRequest):
                 "next_30_days": result["usage_next_30_days"]
             },
             "alert_message": result["message"],
-            "priority": result["priority"]
+            "priority": result["priority"],
+            "preprocessing": preprocessing
         }
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Reorder alert error: {str(e)}")
 
-@app.post("/forecast")
-def legacy_forecast(payload: dict):
+@app.post("/monitor/drift")
+def check_drift(request: DriftCheckRequest):
     """
-    Legacy endpoint - maintains backward compatibility
-    
-    Expects JSON payload like:
-    {
-        "series": [{"date": "2023-01-01", "value": 120}, ...],
-        "steps": 6,
-        "seasonal": true
+    Drift status of many entities' stored models, without fitting.
+
+    Each entity's last selected SARIMA model is filtered over its history and
+    the one-step residuals since that selection are checked with CUSUM.
+    `refit` lists the entities whose next forecast will run a full order
+    search (drift, or no stored model); the others are refitted at their
+    stored order.
+    """
+    results = []
+    for item in request.entities:
+        try:
+            df, _ = prepare_frame(item.series, request)
+            report = model.drift_status(df["value"], item.entity_id, item.seasonal, item.seasonal_period)
+        except Exception as e:
+            report = {"status": "error", "error": str(e)}
+        results.append({"entity_id": item.entity_id, **report})
+
+    return {
+        "success": True,
+        "entities": results,
+        "refit": [r["entity_id"] for r in results if r["status"] != "stable"]
     }
+
+# ============================================
+# ACCURACY TRACKING
+# ============================================
+
+@app.get("/accuracy")
+def get_accuracy(entity_id: Optional[str] = None, engine: Optional[str] = None):
+    """
+    Running accuracy of issued forecasts, per entity, endpoint and engine.
+
+    Forecasts are tracked under the entity and the endpoint that issued them
+    (e.g. ingredient:12/reorder-alert) and scored as later requests to that
+    endpoint bring the actuals. Filter by entity_id (ingredient:12 for all of
+    its endpoints, or a full tracking key) and/or engine (sarima, fourier,
+    manual, or sarima@W for weekly aggregation).
     """
+    return {"success": True, "accuracy": model.get_accuracy_store().query(entity_id, engine)}
+
+# ============================================
+# ASYNC JOBS
+# ============================================
+
+JOB_HANDLERS = {
+    "forecast/auto": (ForecastRequest, auto_forecast),
+    "forecast/manual": (ManualForecastRequest, manual_forecast),
+    "evaluate": (ModelEvaluationRequest, evaluate_model),
+    "business/ingredient-usage": (IngredientUsageRequest, forecast_ingredient_usage),
+    "business/category-demand": (CategoryDemandRequest, forecast_category_demand),
+    "business/revenue": (RevenueRequest, forecast_revenue),
+    "business/reorder-alert": (ReorderAlertRequest, check_reorder_alert),
+}
+
+TENANT_DESCRIPTION = (
+    "Tenant the job is scheduled under for fair sharing of the workers, e.g. business:3 "
+    "(default: the payload's business_id or source.business_id; otherwise the default tenant)"
+)
+
+class JobRequest(BaseModel):
+    kind: Literal[tuple(JOB_HANDLERS)] = Field(description="Endpoint to run, e.g. forecast/auto")
+    payload: Dict[str, Any] = Field(description="Request body for that endpoint")
+    tenant: Optional[str] = Field(default=None, description=TENANT_DESCRIPTION)
+
+@app.post("/jobs", status_code=202)
+def submit_job(request: JobRequest):
+    """
+    Submit a long-running forecast as a background job.
+
+    The payload is validated and persisted immediately, then fitted on the
+    worker pool; queued jobs survive a service restart. Submitting a payload
+    identical to a pending or retained job returns that job's id.
+    Poll GET /jobs/{job_id} for the status and result.
+    """
+    job_store = app.state.job_store
+    request_model, _ = JOB_HANDLERS[request.kind]
     try:
-        df = pd.DataFrame(payload["series"])
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-        df = df.sort_index()
+        job_request = request_model(**request.payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid payload for {request.kind}: {str(e)}")
 
-        result = model.run_sarima(
-            series=df["value"],
-            seasonal=payload.get("seasonal", True),
-            m=payload.get("seasonal_period", 12),
-            steps=payload.get("steps", 6)
+    try:
+        job_id = job_store.submit(request.kind, job_request, tenant=request.tenant)
+    except jobs.JobStoreFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {
+        "success": True,
+        "job_id": job_id,
+        "kind": request.kind,
+        "status": job_store.get(job_id)["status"]
+    }
+
+class ImportRequest(BaseModel):
+    path: str = Field(description="Parquet (.parquet) or Arrow IPC/Feather file, relative to FORECAST_IMPORT_DIR")
+    kind: Literal[tuple(bulk_import.IMPORT_KINDS)] = Field(description="Endpoint each entity's history is forecast with")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Options shared by every entity, e.g. steps")
+    entity_column: str = Field(default="entity_id")
+    date_column: str = Field(default="date")
+    value_column: str = Field(default="value")
+    tenant: Optional[str] = Field(
+        default=None,
+        description="Tenant all jobs of the import are scheduled under (default: the payload's business, else the file)"
+    )
+
+@app.post("/jobs/import", status_code=202)
+def import_jobs(request: ImportRequest):
+    """
+    Bulk backfill: one background job per entity of a Parquet/Arrow file.
+
+    The file is read memory-mapped and split into per-entity series with a
+    single sort, and the series are written once to a history store. Each
+    entity becomes a `kind` job with the shared payload that references its
+    slice of the store, so workers map the values instead of receiving them.
+    Poll the returned job ids with GET /jobs/{job_id}.
+    """
+    job_store = app.state.job_store
+    try:
+        payloads, rows = bulk_import.import_payloads(
+            request.path,
+            request.kind,
+            request.payload,
+            entity=request.entity_column,
+            date=request.date_column,
+            value=request.value_column
         )
+    except (ValueError, KeyError, RuntimeError) as e:
+        raise HTTPException(status_code=400, detail=f"Import error: {str(e)}")
 
-        return {
-            "model": f"SARIMA{result['order']}{result['seasonal_order']}",
-            "forecast": result["forecast"],
-            "confidence": {
-                "lower": result["lower"],
-                "upper": result["upper"]
-            }
-        }
+    if job_store.queue.pending() + len(payloads) > job_store.max_import_jobs:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Import has {len(payloads)} entities but the job queue holds at most {job_store.max_import_jobs} jobs"
+        )
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    # All jobs of an import share one tenant, unless each entity is a business
+    tenant = request.tenant or scheduling.tenant_of(request.payload, default=None)
+    if tenant is None and bulk_import.IMPORT_KINDS[request.kind] != "business_id":
+        tenant = f"import:{request.path}"
+
+    request_model, _ = JOB_HANDLERS[request.kind]
+    requests, errors = {}, {}
+    for entity_id, payload in payloads.items():
+        try:
+            requests[entity_id] = request_model(**payload)
+        except ValueError as e:
+            errors[entity_id] = str(e)
+    try:
+        job_ids = dict(zip(requests, job_store.submit_many(request.kind, list(requests.values()), tenant=tenant)))
+    except jobs.JobStoreFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {
+        "success": True,
+        "kind": request.kind,
+        "rows": rows,
+        "entities": len(payloads),
+        "jobs": job_ids,
+        "errors": errors
+    }
+
+@app.get("/tenants")
+def get_tenants():
+    """
+    Per-tenant job scheduling metrics: queued and running jobs, age of the
+    oldest queued job, jobs dispatched by this process, weight and the
+    running-job limit. Only tenants with pending jobs are listed.
+    """
+    job_store = app.state.job_store
+    return {"success": True, "workers": jobs.WORKERS, "tenants": job_store.tenants()}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """
+    Status of a background job: queued, running, done or failed.
+
+    Finished jobs include the endpoint's response as `result` (or `error`)
+    and are retained for FORECAST_JOB_TTL seconds.
+    """
+    job_store = app.state.job_store
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    return {"success": True, **job}
 
 @app.post("/forecast")
-def forecast(payload: dict):
+def legacy_forecast(payload: dict):
     """
+    Legacy endpoint - maintains backward compatibility
+    
     Expects JSON payload like:
     {
         "series": [{"date": "2023-01-01", "value": 120}, ...],
         "steps": 6,
         "seasonal": true
     }
+
+    The payload is mapped onto /forecast/auto (calendar handling and
+    parameter caching), with the old seasonal period default of 12, and
+    answered in the legacy response shape. The engine stays SARIMA, which
+    is what the "model" label describes.
     """
     try:
-        df = pd.DataFrame(payload["series"])
-        df["date"] = pd.to_datetime(df["date"])
-        df.set_index("date", inplace=True)
-
-        result = model.run_sarima(
-            series=df["value"],
+        request = ForecastRequest(
+            series=payload["series"],
+            steps=payload.get("steps", 6),
             seasonal=payload.get("seasonal", True),
-            steps=payload.get("steps", 6)
+            seasonal_period=payload.get("seasonal_period", 12),
+            engine="sarima"
         )
-
-        return {
-            "model": f"SARIMA{result['order']}{result['seasonal_order']}",
-            "forecast": result["forecast"],
-            "confidence": {
-                "lower": result["lower"],
-                "upper": result["upper"]
-            }
-        }
-
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+    result = auto_forecast(request)
+    return {
+        "model": f"SARIMA{tuple(result['order'])}{tuple(result['seasonal_order'])}",
+        "forecast": result["forecast"],
+        "confidence": {
+            "lower": result["confidence_interval"]["lower"],
+            "upper": result["confidence_interval"]["upper"]
+        }
+    }
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+import history_store
+
+IMPORT_DIR = os.getenv("FORECAST_IMPORT_DIR", "imports")
+
+# Job kinds a bulk import can feed, with the entity id field of their request
+IMPORT_KINDS = {
+    "forecast/auto": "entity_id",
+    "business/ingredient-usage": "ingredient_id",
+    "business/category-demand": "category_id",
+    "business/revenue": "business_id",
+}
+
+def resolve_path(path, root=IMPORT_DIR):
+    """Absolute path of an import file, which must lie inside root (FORECAST_IMPORT_DIR)"""
+    root = os.path.realpath(root)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root:
+        raise ValueError(f"Import files must be inside {root}")
+    if not os.path.isfile(full):
+        raise ValueError(f"Import file {path} not found")
+    return full
+
+def read_columns(path, entity="entity_id", date="date", value="value"):
+    """
+    (entity codes, entity names, datetime64[ns] dates, float64 values) from a
+    Parquet file or an Arrow IPC/Feather file, read memory-mapped: only the
+    three columns are touched, and Arrow files are not copied into memory.
+    Entity ids are dictionary-encoded by Arrow, so no Python object is made
+    per row; a missing entity id gets code -1. Needs pyarrow.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Bulk import needs pyarrow (pip install pyarrow)") from e
+
+    columns = [entity, date, value]
+    if path.endswith(".parquet"):
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = ipc.open_file(pa.memory_map(path, "r")).read_all().select(columns)
+    encoded = table.column(entity).combine_chunks().dictionary_encode()
+    codes = encoded.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+    names = [str(name) for name in encoded.dictionary.to_pylist()]
+    dates = pd.to_datetime(table.column(date).to_numpy(zero_copy_only=False)).values.astype("datetime64[ns]")
+    values = table.column(value).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+    return codes, names, dates, values
+
+def valid_rows(codes, dates, values):
+    """Mask of the rows that have an entity (code >= 0), a date and a finite value"""
+    return (codes >= 0) & ~np.isnat(dates) & np.isfinite(values)
+
+def split_series(codes, dates, values):
+    """
+    Per-entity (dates, values) views of flat columns, from one stable sort
+    by (entity code, date). Returns {code: (dates, values)}.
+    """
+    if len(codes) == 0:
+        return {}
+    order = np.lexsort((dates, codes))
+    codes, dates, values = codes[order], dates[order], values[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)]
+    return {int(codes[start]): (dates[start:end], values[start:end]) for start, end in zip(starts, ends)}
+
+def store_name(path, *columns):
+    """History store name of an import: the same file and columns give the same store"""
+    stat = os.stat(path)
+    key = "|".join([path, str(stat.st_mtime_ns), str(stat.st_size), *columns])
+    return "import-" + hashlib.sha1(key.encode()).hexdigest()[:16]
+
+def import_payloads(path, kind, payload, entity="entity_id", date="date", value="value"):
+    """
+    One request payload per entity of an import file. The series are written
+    once to a history store and each payload carries only the entity's id
+    and its stored_history slice, so jobs stay small and workers read the
+    values from the shared memory map. Rows without an entity id, a date or
+    a value are dropped.
+    Returns {entity id: payload} and the number of rows read.
+    """
+    if kind not in IMPORT_KINDS:
+        raise ValueError(f"Bulk import cannot feed '{kind}', expected one of {tuple(IMPORT_KINDS)}")
+    id_field = IMPORT_KINDS[kind]
+    full = resolve_path(path)
+    codes, names, dates, values = read_columns(full, entity, date, value)
+    keep = valid_rows(codes, dates, values)
+    parts = {names[code]: series for code, series in split_series(codes[keep], dates[keep], values[keep]).items()}
+    name = store_name(full, entity, date, value)
+    index = history_store.write_store(name, parts)
+    payloads = {
+        entity_id: {**payload, id_field: entity_id, "stored_history": {"store": name, "offset": offset, "length": length}}
+        for entity_id, (offset, length) in index.items()
+    }
+    return payloads, len(codes)
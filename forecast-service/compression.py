@@ -0,0 +1,194 @@
+import gzip
+import io
+import os
+import re
+import zlib
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+
+MIN_SIZE = int(os.getenv("FORECAST_COMPRESS_MIN_SIZE", 1024))
+MAX_BODY = int(os.getenv("FORECAST_MAX_BODY", 64 * 1024 * 1024))
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+def accepted_encodings(accept_encoding):
+    """{coding: q} of an Accept-Encoding header, codings lower-cased (q=0 refuses a coding)"""
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        match = re.search(r"q\s*=\s*([0-9.]+)", params)
+        if coding:
+            accepted[coding.strip().lower()] = float(match.group(1)) if match else 1.0
+    return accepted
+
+def response_encoding(accept_encoding):
+    """
+    Coding with the highest q among zstd (when zstandard is installed) and
+    gzip, zstd on a tie; codings not listed take the q of "*". None when
+    neither is accepted.
+    """
+    accepted = accepted_encodings(accept_encoding)
+    codings = ("zstd", "gzip") if _zstandard() is not None else ("gzip",)
+    # max keeps the first of equal q values, so zstd wins ties
+    encoding = max(codings, key=lambda coding: accepted.get(coding, accepted.get("*", 0.0)))
+    return encoding if accepted.get(encoding, accepted.get("*", 0.0)) > 0 else None
+
+def compress(body, encoding):
+    if encoding == "zstd":
+        return _zstandard().ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def decompress(body, encoding, limit=MAX_BODY):
+    """
+    Decoded gzip or zstd request body. Raises OverflowError when it is
+    larger than limit and ValueError when it is malformed.
+    """
+    if encoding == "zstd":
+        try:
+            data = _zstandard().ZstdDecompressor().stream_reader(io.BytesIO(body)).read(limit + 1)
+        except _zstandard().ZstdError as e:
+            raise ValueError(f"Malformed zstd request body: {e}") from e
+    else:
+        decoder = zlib.decompressobj(wbits=31)
+        try:
+            data = decoder.decompress(body, limit + 1)
+        except zlib.error as e:
+            raise ValueError(f"Malformed gzip request body: {e}") from e
+        if len(data) <= limit and not decoder.eof:
+            raise ValueError("Truncated gzip request body")
+    if len(data) > limit:
+        raise OverflowError(f"Decompressed request body is larger than {limit} bytes")
+    return data
+
+def decodable(encoding):
+    """Whether request bodies with this Content-Encoding can be decoded"""
+    return encoding == "gzip" or (encoding == "zstd" and _zstandard() is not None)
+
+def _tag_with(tag, encoding):
+    """ETag of the encoded representation: "abc" -> "abc-gzip" (weak tags keep their W/)"""
+    return tag[:-1] + f'-{encoding}"' if tag.endswith('"') else tag
+
+def _tags_without_encoding(if_none_match):
+    return re.sub(r'-(?:gzip|zstd)"', '"', if_none_match)
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that accepts gzip (and zstd) request bodies, announced
+    with Content-Encoding, and compresses responses of at least min_size
+    bytes for clients whose Accept-Encoding allows it. Small responses such
+    as health checks are sent as they are. Request bodies that decode to
+    more than max_body bytes are refused with 413.
+
+    An encoded response's ETag gets the coding as a suffix ("abc-gzip"), and
+    the suffix is removed again from If-None-Match on the way in, so the
+    routes' ETags and 304s work unchanged behind it.
+    """
+    def __init__(self, app, min_size=MIN_SIZE, max_body=MAX_BODY):
+        self.app = app
+        self.min_size = min_size
+        self.max_body = max_body
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_headers = MutableHeaders(scope=dict(scope, headers=list(scope["headers"])))
+        encoded_tags = set()
+        if "if-none-match" in headers:
+            encoded_tags = set(re.findall(r'-(gzip|zstd)"', headers["if-none-match"]))
+            request_headers["if-none-match"] = _tags_without_encoding(headers["if-none-match"])
+
+        content_encoding = headers.get("content-encoding", "identity").strip().lower()
+        if content_encoding != "identity":
+            if not decodable(content_encoding):
+                await self._error(send, 415, f"Unsupported Content-Encoding '{content_encoding}'" + (
+                    " (zstd needs the zstandard package)" if content_encoding == "zstd" else ", expected gzip"
+                ))
+                return
+            chunks = []
+            while True:
+                message = await receive()
+                if message["type"] != "http.request":
+                    break
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    break
+            try:
+                body = decompress(b"".join(chunks), content_encoding, self.max_body)
+            except OverflowError as e:
+                await self._error(send, 413, str(e))
+                return
+            except ValueError as e:
+                await self._error(send, 400, str(e))
+                return
+            del request_headers["content-encoding"]
+            request_headers["content-length"] = str(len(body))
+            receive = self._replay(body, receive)
+        scope = dict(scope, headers=request_headers.raw)
+
+        encoding = response_encoding(headers.get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = {}
+        chunks = []
+
+        async def send_compressed(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            response_headers = MutableHeaders(raw=list(start.get("headers", [])))
+            if start.get("status") == 304:
+                # The client's tag named the representation it holds
+                if "etag" in response_headers and encoding in encoded_tags:
+                    response_headers["etag"] = _tag_with(response_headers["etag"], encoding)
+            elif len(body) >= self.min_size and "content-encoding" not in response_headers:
+                body = compress(body, encoding)
+                response_headers["content-encoding"] = encoding
+                response_headers["content-length"] = str(len(body))
+                if "etag" in response_headers:
+                    response_headers["etag"] = _tag_with(response_headers["etag"], encoding)
+            response_headers.add_vary_header("Accept-Encoding")
+            await send({**start, "headers": response_headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _replay(body, receive):
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+        return replay
+
+    @staticmethod
+    async def _error(send, status, detail):
+        body = orjson.dumps({"detail": detail})
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,205 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+import numpy as np
+
+SOURCE_DB = os.getenv("FORECAST_SOURCE_DB")
+POOL_SIZE = int(os.getenv("FORECAST_SOURCE_POOL_SIZE", 5))
+DEFAULT_DAYS = 365
+
+# The aggregations of backend/src/models/forecast-data-model.js, with the
+# window passed as parameters (from the cutoff date up to the day after
+# `until`) instead of DATE_SUB(CURDATE(), ...) so the same SQL runs on
+# MySQL and on the SQLite stand-in
+QUERIES = {
+    # getDailyRevenueHistory
+    "daily_revenue": ("""
+        SELECT DATE(p.purchase_date) AS date, SUM(p.total_amount) AS value
+        FROM purchases_table p
+        JOIN business_user_position_table bup ON p.user_id = bup.user_id
+        WHERE bup.business_id = %s
+        AND p.status_id != 3
+        AND p.purchase_date >= %s
+        AND p.purchase_date < %s
+        GROUP BY DATE(p.purchase_date)
+        ORDER BY date ASC
+    """, ("business_id",)),
+    # getCategorySalesHistory
+    "category_sales": ("""
+        SELECT DATE(pu.purchase_date) AS date, SUM(pi.quantity) AS value
+        FROM purchases_table pu
+        JOIN purchase_items_table pi ON pu.purchase_id = pi.purchase_id
+        JOIN product_table p ON pi.product_id = p.product_id
+        WHERE p.business_id = %s
+        AND p.category_id = %s
+        AND pu.status_id != 3
+        AND pu.purchase_date >= %s
+        AND pu.purchase_date < %s
+        GROUP BY DATE(pu.purchase_date)
+        ORDER BY date ASC
+    """, ("business_id", "category_id")),
+    # getProductUsageHistory
+    "product_usage": ("""
+        SELECT DATE(pu.purchase_date) AS date, SUM(pi.quantity) AS value
+        FROM purchases_table pu
+        JOIN purchase_items_table pi ON pu.purchase_id = pi.purchase_id
+        WHERE pi.product_id = %s
+        AND pu.status_id != 3
+        AND pu.purchase_date >= %s
+        AND pu.purchase_date < %s
+        GROUP BY DATE(pu.purchase_date)
+        ORDER BY date ASC
+    """, ("product_id",)),
+}
+
+# Tables the queries read, for the SQLite stand-in
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS business_user_position_table (user_id INTEGER, business_id INTEGER);
+CREATE TABLE IF NOT EXISTS product_table (
+    product_id INTEGER PRIMARY KEY, business_id INTEGER, category_id INTEGER, name TEXT, is_active INTEGER DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS purchases_table (
+    purchase_id INTEGER PRIMARY KEY, user_id INTEGER, purchase_date TEXT, total_amount REAL, status_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS purchase_items_table (purchase_id INTEGER, product_id INTEGER, quantity REAL);
+"""
+
+class ConnectionPool:
+    """
+    Up to `size` connections made by connect(), reused across requests.
+    A connection that raised is closed instead of returned to the pool.
+    """
+    def __init__(self, connect, size=POOL_SIZE, check=None):
+        self._connect = connect
+        self._check = check
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            else:
+                conn = self._checked(conn)
+            try:
+                yield conn
+            except Exception:
+                conn.close()
+                raise
+            self._idle.put(conn)
+
+    def _checked(self, conn):
+        """An idle connection that passes check, or a new one in its place"""
+        if self._check is None:
+            return conn
+        try:
+            self._check(conn)
+            return conn
+        except Exception:
+            conn.close()
+            return self._connect()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class HistorySource:
+    """
+    Runs the backend's history aggregations on a pooled connection and
+    returns the rows as NumPy arrays, skipping the JSON round-trip through
+    the Node service. Subclasses provide the connection and placeholder.
+    """
+    placeholder = "%s"
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def history(self, query, days=DEFAULT_DAYS, until=None, **ids):
+        """
+        (dates, values) of a QUERIES aggregation over the last `days` days up
+        to and including `until` (default today): datetime64[D] and float64
+        arrays. Purchases after `until` are left out, so a backfill as of an
+        earlier date sees what was known then.
+        """
+        if query not in QUERIES:
+            raise ValueError(f"Unknown history query '{query}', expected one of {tuple(QUERIES)}")
+        sql, keys = QUERIES[query]
+        missing = [key for key in keys if ids.get(key) is None]
+        if missing:
+            raise ValueError(f"History query '{query}' needs {', '.join(missing)}")
+        until = until or date.today()
+        since = until - timedelta(days=days)
+        params = [ids[key] for key in keys] + [since.isoformat(), (until + timedelta(days=1)).isoformat()]
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql.replace("%s", self.placeholder), params)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        dates = np.array([row[0] for row in rows], dtype="datetime64[D]")
+        values = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        return dates, values
+
+    def close(self):
+        self.pool.close()
+
+class SQLiteSource(HistorySource):
+    """Local stand-in with the backend's tables in one SQLite file, for tests and development"""
+    placeholder = "?"
+
+    def __init__(self, path, size=POOL_SIZE):
+        def connect():
+            return sqlite3.connect(path, check_same_thread=False, timeout=30)
+        conn = connect()
+        conn.executescript(SQLITE_SCHEMA)
+        conn.close()
+        super().__init__(ConnectionPool(connect, size))
+
+class MySQLSource(HistorySource):
+    """The backend's MySQL database, configured with the same DB_* variables as backend/src/config/pool.js"""
+    def __init__(self, size=POOL_SIZE):
+        try:
+            import pymysql
+        except ImportError as e:
+            raise RuntimeError("The MySQL history source needs PyMySQL (pip install PyMySQL)") from e
+
+        def connect():
+            return pymysql.connect(
+                host=os.getenv("DB_HOST"),
+                user=os.getenv("DB_USER"),
+                password=os.getenv("DB_PASSWORD", ""),
+                database=os.getenv("DB_NAME"),
+                port=int(os.getenv("DB_PORT", 3306))
+            )
+        super().__init__(ConnectionPool(connect, size, check=lambda conn: conn.ping(reconnect=True)))
+
+_source = None
+_source_pid = None
+_source_lock = threading.Lock()
+
+def get_source():
+    """
+    The configured history source, created on first use in each process:
+    SQLite when FORECAST_SOURCE_DB is set, MySQL when DB_HOST is set.
+    """
+    global _source, _source_pid
+    with _source_lock:
+        if _source is None or _source_pid != os.getpid():
+            if SOURCE_DB:
+                _source = SQLiteSource(SOURCE_DB)
+            elif os.getenv("DB_HOST"):
+                _source = MySQLSource()
+            else:
+                raise ValueError("No history source configured (set DB_HOST or FORECAST_SOURCE_DB)")
+            _source_pid = os.getpid()
+        return _source
@@ -0,0 +1,75 @@
+import os
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+# Tabular CUSUM on standardized one-step residuals: slacks k and decision
+# interval h in residual standard deviations. With these values a
+# well-specified model false-alarms on about 5% of entities per 30 new
+# points, and a 3 sd level shift is flagged within 5 points
+CUSUM_K = 0.5
+SPREAD_K = 1.5
+CUSUM_H = float(os.getenv("FORECAST_DRIFT_THRESHOLD", 6.0))
+
+def cusum(z, k=CUSUM_K, spread_k=SPREAD_K, h=CUSUM_H):
+    """
+    Two-sided CUSUM of standardized residuals z for a shift in level, plus a
+    one-sided CUSUM of (z^2 - 1) / sqrt(2) for an increase in spread.
+    Returns (index of the first alarm or None, largest statistic reached).
+    """
+    upper = lower = spread = peak = 0.0
+    for i, value in enumerate(z):
+        upper = max(0.0, upper + value - k)
+        lower = max(0.0, lower - value - k)
+        spread = max(0.0, spread + (value * value - 1) / np.sqrt(2) - spread_k)
+        peak = max(peak, upper, lower, spread)
+        if peak > h:
+            return i, peak
+    return None, peak
+
+def standardized_residuals(series, order, seasonal_order, trend, params, exog=None):
+    """
+    One-step-ahead forecast errors of a fixed SARIMA model over series,
+    divided by their predicted standard deviation. The model is filtered
+    with the stored {name: value} params, not fitted; returns None when
+    any of its parameters is missing.
+    """
+    model = SARIMAX(
+        np.asarray(series, dtype=np.float64),
+        exog=exog,
+        order=order,
+        seasonal_order=seasonal_order,
+        trend=trend
+    )
+    if params is None or any(name not in params for name in model.param_names):
+        return None
+    results = model.filter(np.array([params[name] for name in model.param_names]))
+    return np.asarray(results.standardized_forecasts_error[0])
+
+def check(store, entity_id, search, series, exog=None):
+    """
+    Drift status of the model last selected for entity under a search key.
+
+    The selected model is filtered over the history with the parameters it
+    was forecast with, and cusum runs over the residuals of the points
+    after the last date it was fitted on. Returns a report dict whose
+    status is 'stable', 'drift' or 'unknown' (nothing stored, or the
+    history carries no dates), with the stored order and trend when known.
+    """
+    selection = store.get_selection(entity_id, search)
+    baseline = store.get_baseline(entity_id, search)
+    if selection is None or baseline is None or not isinstance(series.index, pd.DatetimeIndex):
+        return {"status": "unknown", "new_points": None, "statistic": None}
+    order, seasonal_order = selection
+    trend, fitted_through, params = baseline
+    new = np.asarray(series.index > pd.Timestamp(fitted_through))
+    report = {"order": order, "seasonal_order": seasonal_order, "trend": trend, "new_points": int(new.sum())}
+    try:
+        z = standardized_residuals(series, order, seasonal_order, trend, params, exog=exog)
+    except (ValueError, np.linalg.LinAlgError):
+        z = None
+    if z is None:
+        return {**report, "status": "unknown", "statistic": None}
+    z = z[new]
+    alarm, statistic = cusum(z[np.isfinite(z)])
+    return {**report, "status": "stable" if alarm is None else "drift", "statistic": float(statistic)}
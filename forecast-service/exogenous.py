@@ -0,0 +1,114 @@
+import datetime
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+CALENDAR_COLUMNS = ("holiday", "holiday_eve", "payday")
+
+# Regular holidays and special non-working days with a fixed date (month, day)
+FIXED_HOLIDAYS = (
+    (1, 1), (4, 9), (5, 1), (6, 12), (8, 21), (11, 1), (11, 2),
+    (11, 30), (12, 8), (12, 24), (12, 25), (12, 30), (12, 31),
+)
+
+def easter_date(year):
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+def holiday_dates(year):
+    """Fixed-date holidays plus Holy Week (Maundy Thursday to Black Saturday)"""
+    easter = easter_date(year)
+    dates = {datetime.date(year, month, day) for month, day in FIXED_HOLIDAYS}
+    dates.update(easter - datetime.timedelta(days=offset) for offset in (1, 2, 3))
+    return dates
+
+@lru_cache(maxsize=64)
+def holiday_calendar(start, days):
+    """
+    Daily calendar design matrix (days x 3) starting at `start` (YYYY-MM-DD).
+    Columns follow CALENDAR_COLUMNS. Memoized per date range and read-only.
+    """
+    dates = pd.date_range(start, periods=days, freq="D")
+    holidays = set()
+    for year in range(dates[0].year, dates[-1].year + 2):
+        holidays.update(holiday_dates(year))
+    holidays = np.array(sorted(holidays), dtype="datetime64[D]")
+
+    day_values = dates.values.astype("datetime64[D]")
+    is_holiday = np.isin(day_values, holidays)
+    is_eve = np.isin(day_values + np.timedelta64(1, "D"), holidays)
+    is_payday = (dates.day == 15) | dates.is_month_end
+
+    calendar = np.column_stack([is_holiday, is_eve, is_payday]).astype(np.float64)
+    calendar.setflags(write=False)
+    return calendar
+
+def future_index(index, steps):
+    """Dates of the forecast horizon following a DatetimeIndex"""
+    freq = pd.infer_freq(index) if len(index) >= 3 else None
+    return pd.date_range(index[-1], periods=steps + 1, freq=freq or "D")[1:]
+
+def calendar_features(index, steps):
+    """Calendar regressors for the history dates and the forecast horizon"""
+    dates = index.append(future_index(index, steps)).normalize()
+    start = dates[0]
+    offsets = (dates - start).days.to_numpy()
+    calendar = holiday_calendar(start.strftime("%Y-%m-%d"), int(offsets[-1]) + 1)
+    rows = calendar[offsets]
+    return rows[:len(index)], rows[len(index):]
+
+def future_covariates(columns, future_exog, steps):
+    """Validate future covariate rows and return them as a (steps x columns) array"""
+    if steps == 0:
+        return np.empty((0, len(columns)))
+    if not future_exog or len(future_exog) < steps:
+        raise ValueError(f"future_exog must provide {steps} rows for covariates {columns}")
+    frame = pd.DataFrame(future_exog[:steps])
+    missing = [c for c in columns if c not in frame.columns]
+    if missing or frame[columns].isna().any().any():
+        raise ValueError(f"future_exog is missing values for covariates {missing or columns}")
+    return frame[columns].to_numpy(dtype=np.float64)
+
+def build_exog(covariates, future_exog=None, holidays=False, steps=1):
+    """
+    Assemble (X, X_future) design matrices for SARIMAX/auto_arima.
+
+    covariates: DataFrame indexed by date with one column per user covariate
+    future_exog: list of {column: value} dicts, one per forecast step
+    holidays: append the built-in calendar regressors
+    Returns (None, None) when there is nothing to add.
+    """
+    history, future = [], []
+
+    columns = list(covariates.columns)
+    if columns:
+        if covariates.isna().any().any():
+            raise ValueError(f"Every data point must provide values for covariates {columns}")
+        history.append(covariates[columns].to_numpy(dtype=np.float64))
+        future.append(future_covariates(columns, future_exog, steps))
+
+    if holidays:
+        calendar_history, calendar_future = calendar_features(covariates.index, steps)
+        history.append(calendar_history)
+        future.append(calendar_future)
+
+    if not history:
+        return None, None
+
+    X = np.hstack(history)
+    X_future = np.hstack(future)
+    # Columns that never vary in the history cannot be estimated
+    varying = np.ptp(X, axis=0) > 0
+    if not varying.any():
+        return None, None
+    return X[:, varying], X_future[:, varying]
@@ -0,0 +1,333 @@
+import numpy as np
+from scipy.optimize import minimize
+from scipy.signal import lfilter, lfiltic
+from scipy.stats import norm
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+MAX_ORDER = (2, 1, 2)
+MAX_SEASONAL_ORDER = (2, 1, 2)
+MIN_OBSERVATIONS = 30
+START_VALUES = (-0.9, -0.5, 0.0, 0.5, 0.9)
+FULL_GRID_PARAMS = 3
+PENALTY = 1e10
+# Where fit_manual_model uses FastSARIMA instead of SARIMAX. Against SARIMAX
+# (12 simulated series per case, forecast means within 0.15 standard errors
+# and standard errors within 10%), agreement needs a differenced model and
+# 150 observations beyond the initial states; non-differenced MA and mixed
+# terms converge to different optima. Non-seasonal models with more than two
+# coefficients were no faster than SARIMAX, and seasonal ones with more than
+# four drifted past the tolerance.
+FAST_PATH_MIN_OBSERVATIONS = 150
+FAST_PATH_MAX_COEFFICIENTS = 2
+FAST_PATH_MAX_SEASONAL_COEFFICIENTS = 4
+
+def supports(order, seasonal_order, n):
+    """Whether FastSARIMA handles this order and leaves enough observations beyond the initial states"""
+    p, d, q = order
+    P, D, Q, m = seasonal_order
+    if any(v > limit for v, limit in zip((p, d, q), MAX_ORDER)):
+        return False
+    if any(v > limit for v, limit in zip((P, D, Q), MAX_SEASONAL_ORDER)):
+        return False
+    if m <= 1:
+        if P or D or Q:
+            return False
+        m = 0
+    states = max(p + d + (P + D) * m, q + Q * m)
+    return n - states >= MIN_OBSERVATIONS
+
+def fast_path_applies(order, seasonal_order, n):
+    """Whether fit_manual_model should fit this order with FastSARIMA (see FAST_PATH_MIN_OBSERVATIONS)"""
+    if not supports(order, seasonal_order, n):
+        return False
+    p, d, q = order
+    P, D, Q, m = seasonal_order
+    seasonal = m > 1 and (P or D or Q)
+    if d + (D if seasonal else 0) == 0:
+        return False
+    if p + q + P + Q > (FAST_PATH_MAX_SEASONAL_COEFFICIENTS if seasonal else FAST_PATH_MAX_COEFFICIENTS):
+        return False
+    states = max(p + d + (P + D) * m, q + Q * m) if seasonal else max(p + d, q)
+    return n - states >= FAST_PATH_MIN_OBSERVATIONS
+
+def constrain(x):
+    """Stationary lag coefficients (order <= 2) from unconstrained values via partial autocorrelations"""
+    r = x / np.sqrt(1 + x * x)
+    if len(r) == 2:
+        return np.array([r[0] * (1 - r[1]), r[1]])
+    return r
+
+def unconstrain(coef):
+    """Inverse of constrain, clipped just inside the stationary region"""
+    coef = np.asarray(coef, dtype=np.float64)
+    r = np.array([coef[0] / (1 - coef[1]), coef[1]]) if len(coef) == 2 and coef[1] != 1 else coef
+    r = np.clip(r, -0.999, 0.999)
+    return r / np.sqrt(1 - r * r)
+
+def lag_polynomial(coef, sign, step=1):
+    """[1, sign*c1, sign*c2, ...] with the coefficients placed every `step` lags"""
+    poly = np.zeros(len(coef) * step + 1)
+    poly[0] = 1.0
+    poly[step::step] = sign * np.asarray(coef)
+    return poly
+
+class HannanRissanen:
+    """
+    Two-stage least squares start values for one differenced, demeaned series.
+    A long autoregression estimates the innovations once; each candidate
+    order then regresses the series on its own lags and the lagged innovation
+    estimates (seasonal lags added, not multiplied). Lag columns are cached,
+    so candidates of one order search share them.
+    """
+    def __init__(self, w, long_order):
+        self.w = np.asarray(w, dtype=np.float64)
+        self.long_order = min(len(self.w) // 3, long_order)
+        self._columns = {}
+        self.resid = None
+        if self.long_order >= 1:
+            lagged = np.lib.stride_tricks.sliding_window_view(self.w, self.long_order + 1)[:, ::-1]
+            coef, *_ = np.linalg.lstsq(lagged[:, 1:], lagged[:, 0], rcond=None)
+            self.resid = np.concatenate([np.zeros(self.long_order), lagged[:, 0] - lagged[:, 1:] @ coef])
+
+    def _column(self, source, lag, start):
+        key = (source, lag, start)
+        if key not in self._columns:
+            values = self.w if source == "w" else self.resid
+            self._columns[key] = values[start - lag:len(values) - lag]
+        return self._columns[key]
+
+    def coefficients(self, sizes, m):
+        """Start coefficients ordered (ar, ma, seasonal ar, seasonal ma); zeros if the series is too short"""
+        p, q, P, Q = sizes
+        ar_lags = list(range(1, p + 1)) + [m * i for i in range(1, P + 1)]
+        ma_lags = list(range(1, q + 1)) + [m * i for i in range(1, Q + 1)]
+        if not ar_lags and not ma_lags:
+            return np.zeros(0)
+        start = max(ar_lags + ma_lags) + self.long_order
+        if self.resid is None or len(self.w) - start <= len(ar_lags) + len(ma_lags):
+            return np.zeros(p + q + P + Q)
+        X = np.column_stack(
+            [self._column("w", lag, start) for lag in ar_lags] + [self._column("e", lag, start) for lag in ma_lags]
+        )
+        coef, *_ = np.linalg.lstsq(X, self.w[start:], rcond=None)
+        ar, sar = coef[:p], coef[p:p + P]
+        ma, sma = coef[p + P:p + P + q], coef[p + P + q:]
+        return np.concatenate([ar, ma, sar, sma])
+
+class FastSARIMA:
+    """
+    Fixed-order SARIMA for low orders, fitted without the statsmodels object model.
+
+    The model is one IIR filter from observations to innovations,
+    full_ar(B) y = ma(B) e, with the differencing folded into the AR
+    polynomial, so the likelihood costs two lfilter passes and two small
+    matrix products. The filter's initial state is diffuse and profiled out
+    by least squares; the result is the exact diffuse likelihood that SARIMAX
+    approximates with its approximate-diffuse initialization, and estimates
+    agree with fit_manual_model. Coefficients are optimized over stationary AR
+    and invertible MA polynomials (equivalent under the exact likelihood).
+    Parameter names and the predict/aic interface match statsmodels/pmdarima.
+    """
+    def __init__(self, order, seasonal_order=(0, 0, 0, 0)):
+        self.order = tuple(int(v) for v in order)
+        self.seasonal_order = tuple(int(v) for v in seasonal_order)
+        p, d, q = self.order
+        P, D, Q, m = self.seasonal_order
+        self._sizes = (p, q, P, Q)
+        self._m = max(m, 1)
+        self._diff_poly = np.array([1.0])
+        for _ in range(d):
+            self._diff_poly = np.convolve(self._diff_poly, [1.0, -1.0])
+        for _ in range(D):
+            self._diff_poly = np.convolve(self._diff_poly, lag_polynomial([1.0], -1, self._m))
+
+    @property
+    def param_names(self):
+        p, q, P, Q = self._sizes
+        return (
+            [f"ar.L{i}" for i in range(1, p + 1)]
+            + [f"ma.L{i}" for i in range(1, q + 1)]
+            + [f"ar.S.L{self._m * i}" for i in range(1, P + 1)]
+            + [f"ma.S.L{self._m * i}" for i in range(1, Q + 1)]
+            + ["sigma2"]
+        )
+
+    def _transform(self, x, inverse=False):
+        """Map unconstrained values to (ar, ma, seasonal ar, seasonal ma) coefficients, or back"""
+        out, start = np.empty(len(x)), 0
+        # An invertible MA polynomial is a stationary AR polynomial with the signs flipped
+        for size, sign in zip(self._sizes, (1, -1, 1, -1)):
+            block = x[start:start + size]
+            if size:
+                out[start:start + size] = sign * (unconstrain(sign * block) if inverse else constrain(block))
+            start += size
+        return out
+
+    def _polynomials(self, coef):
+        """(full AR polynomial including differencing, MA polynomial)"""
+        p, q, P, Q = self._sizes
+        ar, ma = coef[:p], coef[p:p + q]
+        sar, sma = coef[p + q:p + q + P], coef[p + q + P:]
+        ar_poly = np.convolve(lag_polynomial(ar, -1), lag_polynomial(sar, -1, self._m))
+        ma_poly = np.convolve(lag_polynomial(ma, 1), lag_polynomial(sma, 1, self._m))
+        return np.convolve(ar_poly, self._diff_poly), ma_poly
+
+    @staticmethod
+    def _innovations(y, full_ar, ma_poly):
+        """
+        Innovations with the initial filter state profiled out.
+        Returns (innovations, log|H'H|, number of initial states).
+        """
+        n = len(y)
+        states = max(len(full_ar), len(ma_poly)) - 1
+        e = lfilter(full_ar, ma_poly, y)
+        if states == 0:
+            return e, 0.0, 0
+        if len(ma_poly) == 1:
+            # Pure AR: H is a shifted identity, profiling zeroes the first innovations
+            e[:states] = 0.0
+            return e, 0.0, states
+        # The response to initial state j is the impulse response of 1/ma(B)
+        # delayed by j steps, so H is a strided view of a single filter pass
+        impulse = np.zeros(n)
+        impulse[0] = 1.0
+        g = lfilter([1.0], ma_poly, impulse)
+        H = np.lib.stride_tricks.sliding_window_view(np.concatenate([np.zeros(states - 1), g]), n)[::-1]
+        gram = H @ H.T
+        z = np.linalg.solve(gram, -(H @ e))
+        _, logdet = np.linalg.slogdet(gram)
+        return e + z @ H, logdet, states
+
+    def _loss(self, coef, y):
+        """-2 * concentrated log-likelihood up to a constant"""
+        try:
+            e, logdet, states = self._innovations(y, *self._polynomials(coef))
+        except np.linalg.LinAlgError:
+            return PENALTY
+        dof = len(y) - states
+        sse = e @ e
+        if not np.isfinite(sse) or not np.isfinite(logdet) or sse <= 0:
+            return PENALTY
+        return dof * np.log(sse / dof) + logdet
+
+    def _objective(self, x, y):
+        return self._loss(self._transform(x), y)
+
+    def _hannan_rissanen(self, y):
+        """Hannan-Rissanen start coefficients for the differenced, demeaned series"""
+        p, q, P, Q = self._sizes
+        w = lfilter(self._diff_poly, [1.0], y)[len(self._diff_poly) - 1:]
+        long_order = max(p + q, (P + Q) * self._m) + self._m
+        return HannanRissanen(w - w.mean(), long_order).coefficients(self._sizes, self._m)
+
+    def _grid(self):
+        """
+        Start coefficients: the full grid over START_VALUES for up to
+        FULL_GRID_PARAMS coefficients, otherwise zeros, each coefficient alone
+        at every non-zero start value, and AR at +v with MA at -v.
+        """
+        k = sum(self._sizes)
+        if k <= FULL_GRID_PARAMS:
+            return np.array(np.meshgrid(*[START_VALUES] * k, indexing="ij")).reshape(k, -1).T
+        p, q, P, Q = self._sizes
+        signs = np.concatenate([np.ones(p), -np.ones(q), np.ones(P), -np.ones(Q)])
+        singles = np.vstack([np.eye(k) * value for value in START_VALUES if value])
+        patterns = np.vstack([value * signs for value in START_VALUES if value > 0])
+        return np.vstack([np.zeros(k), singles, patterns])
+
+    def fit(self, series, start_params=None, starts=None):
+        """
+        Maximize the likelihood with L-BFGS-B. Cold fits search from the
+        Hannan-Rissanen estimates and from the best grid start; with
+        start_params (a {name: value} dict of a previous fit) only from those,
+        and with starts (a list of such dicts) from each of them.
+        Coefficients missing from a start dict begin at zero.
+        """
+        y = np.asarray(series, dtype=np.float64)
+        k = sum(self._sizes)
+        if start_params:
+            starts = [start_params]
+        if starts and k:
+            names = self.param_names[:-1]
+            starts = [np.array([start.get(name, 0.0) for name in names], dtype=np.float64) for start in starts]
+            starts = [self._transform(np.where(np.isfinite(start), start, 0.0), inverse=True) for start in starts]
+        elif k:
+            grid = np.array([self._transform(coef, inverse=True) for coef in self._grid()])
+            best = grid[np.argmin([self._objective(x, y) for x in grid])]
+            starts = [self._transform(self._hannan_rissanen(y), inverse=True), best]
+        else:
+            starts = [np.zeros(0)]
+
+        self.converged, self.iterations = True, 0
+        x = starts[0]
+        if k:
+            results = [minimize(self._objective, x0, args=(y,), method="L-BFGS-B") for x0 in starts]
+            result = min(results, key=lambda r: r.fun)
+            x = result.x
+            self.converged = bool(result.success and result.fun < PENALTY)
+            self.iterations = sum(int(r.nit) for r in results)
+
+        coef = self._transform(x)
+        full_ar, ma_poly = self._polynomials(coef)
+        e, logdet, states = self._innovations(y, full_ar, ma_poly)
+        self.nobs = len(y) - states
+        self.sigma2 = float(e @ e / self.nobs)
+        self.llf = float(-0.5 * self.nobs * (np.log(2 * np.pi * self.sigma2) + 1) - 0.5 * logdet)
+        self.params = np.concatenate([coef, [self.sigma2]])
+        self.mle_retvals = {"converged": self.converged, "iterations": self.iterations}
+        self._y = y
+        self._criteria = None
+
+        self._full_ar, self._ma_poly = full_ar, ma_poly
+        lags = max(len(full_ar), len(ma_poly))
+        self._y_tail = y[-lags:][::-1]
+        self._e_tail = e[-lags:][::-1]
+        return self
+
+    def impulse_weights(self, steps):
+        """psi weights of the (integrated) model for `steps` periods, psi_0 = 1"""
+        impulse = np.zeros(steps)
+        impulse[0] = 1.0
+        return lfilter(self._ma_poly, self._full_ar, impulse)
+
+    def forecast_moments(self, steps):
+        """Forecast mean and standard error for `steps` periods"""
+        zi = lfiltic(self._ma_poly, self._full_ar, self._y_tail, self._e_tail)
+        mean, _ = lfilter(self._ma_poly, self._full_ar, np.zeros(steps), zi=zi)
+        psi = self.impulse_weights(steps)
+        return mean, np.sqrt(self.sigma2 * np.cumsum(psi ** 2))
+
+    def predict(self, n_periods, X=None, return_conf_int=False, alpha=0.05):
+        if X is not None:
+            raise ValueError("FastSARIMA does not support exogenous regressors")
+        mean, se = self.forecast_moments(n_periods)
+        if not return_conf_int:
+            return mean
+        z = norm.ppf(1 - alpha / 2)
+        return mean, np.column_stack([mean - z * se, mean + z * se])
+
+    def _statsmodels_criteria(self):
+        """(llf, effective observations) of the equivalent SARIMAX at these parameters, computed once"""
+        if self._criteria is None:
+            model = SARIMAX(
+                self._y,
+                order=self.order,
+                seasonal_order=self.seasonal_order,
+                enforce_stationarity=False,
+                enforce_invertibility=False
+            )
+            self._criteria = (float(model.loglike(self.params)), model.nobs - model.loglikelihood_burn)
+        return self._criteria
+
+    def aic(self):
+        llf, _ = self._statsmodels_criteria()
+        return -2 * llf + 2 * len(self.params)
+
+    def bic(self):
+        llf, nobs = self._statsmodels_criteria()
+        return -2 * llf + np.log(nobs) * len(self.params)
+
+    def aicc(self):
+        _, nobs = self._statsmodels_criteria()
+        k = len(self.params)
+        return self.aic() + 2 * k * (k + 1) / max(nobs - k - 1, 1)
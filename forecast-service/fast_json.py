@@ -0,0 +1,54 @@
+import functools
+import inspect
+import numpy as np
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.responses import Response
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _default(obj):
+    """Values orjson does not serialize natively: non-contiguous arrays, NumPy scalars, models, the rest as str"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return str(obj)
+
+def dumps(content):
+    """
+    JSON bytes of a response dict. NumPy arrays and scalars are written
+    directly by orjson, without building Python lists of floats first.
+    NaN and infinity become null.
+    """
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+class NumpyJSONResponse(JSONResponse):
+    def render(self, content):
+        return dumps(content)
+
+class NumpyRoute(APIRoute):
+    """
+    Route whose endpoint result is sent as a NumpyJSONResponse, with the
+    route's status_code, so FastAPI skips jsonable_encoder. The endpoint
+    function itself is registered unchanged and still returns its dict when
+    called directly (jobs).
+    """
+    def __init__(self, path, endpoint, **kwargs):
+        status_code = kwargs.get("status_code") or 200
+        if inspect.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def wrapped(*args, **kw):
+                return _respond(await endpoint(*args, **kw), status_code)
+        else:
+            @functools.wraps(endpoint)
+            def wrapped(*args, **kw):
+                return _respond(endpoint(*args, **kw), status_code)
+        super().__init__(path, wrapped, **kwargs)
+
+def _respond(result, status_code=200):
+    return result if isinstance(result, Response) else NumpyJSONResponse(result, status_code=status_code)
@@ -0,0 +1,116 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import numpy as np
+
+HISTORY_DIR = os.getenv("FORECAST_HISTORY_DIR", "histories")
+HISTORY_TTL = int(os.getenv("FORECAST_HISTORY_TTL", 7 * 24 * 3600))
+# Temporary files older than this were left by a writer that died
+TEMP_MAX_AGE = 3600
+STORE_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+INDEX_SUFFIX = ".index.json"
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def _paths(name, root):
+    if not STORE_NAME.match(name):
+        raise ValueError(f"Invalid history store name '{name}'")
+    base = os.path.join(root, name)
+    return base + ".values.npy", base + ".dates.npy", base + INDEX_SUFFIX
+
+def write_store(name, parts, root=HISTORY_DIR):
+    """
+    Write per-entity series {entity: (dates, values)} as one store: all
+    values and dates (int64 ns) concatenated in two .npy files, plus an
+    index of {entity: [offset, length]}. Each writer uses its own temporary
+    names and renames the files into place, the index last: a store exists
+    once its index does, so readers never see a partial store. An existing
+    store is kept as is. Returns the index.
+    """
+    values_path, dates_path, index_path = _paths(name, root)
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            return json.load(f)
+    os.makedirs(root, exist_ok=True)
+    lengths = [len(values) for _, values in parts.values()]
+    offsets = np.r_[0, np.cumsum(lengths)[:-1]] if lengths else []
+    index = {str(entity): [int(offset), int(length)] for entity, offset, length in zip(parts, offsets, lengths)}
+    values = np.concatenate([np.asarray(v, dtype=np.float64) for _, v in parts.values()]) if parts else np.empty(0)
+    dates = np.concatenate([np.asarray(d, dtype="datetime64[ns]").view(np.int64) for d, _ in parts.values()]) \
+        if parts else np.empty(0, dtype=np.int64)
+    suffix = f".{uuid.uuid4().hex}.tmp"
+    for path, array in ((values_path, values), (dates_path, dates)):
+        with open(path + suffix, "wb") as f:
+            np.save(f, array)
+        os.replace(path + suffix, path)
+    with open(index_path + suffix, "w") as f:
+        json.dump(index, f)
+    os.replace(index_path + suffix, index_path)
+    return index
+
+def open_store(name, root=HISTORY_DIR):
+    """
+    (dates, values) of a store as read-only memory maps, opened once per
+    process. Worker processes share the pages through the OS page cache.
+    """
+    key = (root, name)
+    with _stores_lock:
+        if key not in _stores:
+            values_path, dates_path, index_path = _paths(name, root)
+            if not os.path.exists(index_path):
+                raise ValueError(f"History store '{name}' not found")
+            _stores[key] = (np.load(dates_path, mmap_mode="r"), np.load(values_path, mmap_mode="r"))
+        return _stores[key]
+
+def read_series(name, offset, length, root=HISTORY_DIR):
+    """One entity's (datetime64[ns] dates, float64 values), as views into the store's memory maps"""
+    dates, values = open_store(name, root)
+    if offset < 0 or length <= 0 or offset + length > len(values):
+        raise ValueError(f"Range [{offset}, {offset + length}) is outside history store '{name}'")
+    return dates[offset:offset + length].view("datetime64[ns]"), values[offset:offset + length]
+
+def remove_store(name, root=HISTORY_DIR):
+    """
+    Delete a store's files, the index first so it stops being opened.
+    Processes that already mapped it keep reading their mapping.
+    """
+    with _stores_lock:
+        _stores.pop((root, name), None)
+    values_path, dates_path, index_path = _paths(name, root)
+    for path in (index_path, values_path, dates_path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def purge(max_age=HISTORY_TTL, keep=(), root=HISTORY_DIR):
+    """
+    Remove stores written more than max_age seconds ago, except those named
+    in keep (the ones pending jobs still read), and temporary files of
+    writers that died. Returns the names of the removed stores.
+    """
+    if not os.path.isdir(root):
+        return []
+    now = time.time()
+    removed = []
+    for entry in os.scandir(root):
+        try:
+            age = now - entry.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if entry.name.endswith(".tmp"):
+            if age > TEMP_MAX_AGE:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+        elif entry.name.endswith(INDEX_SUFFIX):
+            name = entry.name[:-len(INDEX_SUFFIX)]
+            if age > max_age and name not in keep:
+                remove_store(name, root)
+                removed.append(name)
+    return removed
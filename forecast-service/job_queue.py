@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import fast_json
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner INTEGER,
+    owner_boot TEXT,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    submitted_at REAL NOT NULL,
+    finished_at REAL,
+    tenant TEXT NOT NULL DEFAULT 'default'
+);
+CREATE INDEX IF NOT EXISTS jobs_fingerprint ON jobs (fingerprint, status);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submitted_at);
+"""
+
+# Queues created before jobs had a tenant
+MIGRATIONS = {
+    "tenant": "ALTER TABLE jobs ADD COLUMN tenant TEXT NOT NULL DEFAULT 'default'",
+    "owner_boot": "ALTER TABLE jobs ADD COLUMN owner_boot TEXT",
+}
+
+# Identifies this process in addition to its PID, which a restarted
+# container reuses (the service often runs as PID 1)
+BOOT_ID = uuid.uuid4().hex
+
+TENANT_INDEX = "CREATE INDEX IF NOT EXISTS jobs_tenant ON jobs (status, tenant, submitted_at)"
+
+def payload_fingerprint(kind, payload):
+    """Hash of the job kind and its canonical JSON payload"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{kind}:{canonical}".encode()).hexdigest()
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class DurableQueue:
+    """
+    SQLite-backed job queue with at-least-once delivery.
+
+    Jobs move queued -> running -> done/failed. A running job holds a lease;
+    when the lease expires or its owning process is gone (its PID is not
+    running, or is this process's PID under another boot id) the job is queued
+    again, so work interrupted by a crash or restart is retried.
+    Submitting a payload identical to a pending or retained job returns the
+    existing job instead of adding a new one.
+    """
+    def __init__(self, path, lease_seconds=600, max_attempts=3, boot_id=BOOT_ID):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.boot_id = boot_id
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                self._conn.execute(statement)
+        self._conn.execute(TENANT_INDEX)
+
+    def enqueue(self, kind, payload, ttl, tenant="default"):
+        """Add a job unless an identical one is pending or retained; returns (job_id, created)"""
+        return self.enqueue_many(kind, [payload], ttl, tenant)[0]
+
+    def enqueue_many(self, kind, payloads, ttl, tenant="default"):
+        """
+        enqueue for a batch of payloads in one transaction (one fsync instead
+        of one per job); returns [(job_id, created)] in the same order.
+        """
+        now = time.time()
+        added = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for payload in payloads:
+                    fingerprint = payload_fingerprint(kind, payload)
+                    row = self._conn.execute(
+                        """SELECT job_id FROM jobs WHERE fingerprint = ?
+                           AND (status IN ('queued', 'running') OR (status = 'done' AND finished_at > ?))
+                           ORDER BY submitted_at DESC LIMIT 1""",
+                        (fingerprint, now - ttl)
+                    ).fetchone()
+                    if row is not None:
+                        added.append((row["job_id"], False))
+                        continue
+                    job_id = uuid.uuid4().hex
+                    self._conn.execute(
+                        """INSERT INTO jobs (job_id, fingerprint, kind, payload, status, submitted_at, tenant)
+                           VALUES (?, ?, ?, ?, 'queued', ?, ?)""",
+                        (job_id, fingerprint, kind, json.dumps(payload, default=str), now, tenant)
+                    )
+                    added.append((job_id, True))
+                self._conn.execute("COMMIT")
+                return added
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def claim(self, limit, tenant=None):
+        """Atomically move up to `limit` queued jobs (of one tenant, if given) to running for this process"""
+        if limit <= 0:
+            return []
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if tenant is None:
+                    rows = self._conn.execute(
+                        "SELECT job_id, kind, payload, attempts FROM jobs WHERE status = 'queued' ORDER BY submitted_at LIMIT ?",
+                        (limit,)
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        """SELECT job_id, kind, payload, attempts FROM jobs WHERE status = 'queued' AND tenant = ?
+                           ORDER BY submitted_at LIMIT ?""",
+                        (tenant, limit)
+                    ).fetchall()
+                claimed = []
+                for row in rows:
+                    if row["attempts"] >= self.max_attempts:
+                        self._conn.execute(
+                            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ?",
+                            (f"Gave up after {row['attempts']} interrupted attempts", now, row["job_id"])
+                        )
+                        continue
+                    self._conn.execute(
+                        """UPDATE jobs SET status = 'running', attempts = attempts + 1, owner = ?, owner_boot = ?,
+                           lease_until = ? WHERE job_id = ?""",
+                        (os.getpid(), self.boot_id, now + self.lease_seconds, row["job_id"])
+                    )
+                    claimed.append((row["job_id"], row["kind"], json.loads(row["payload"])))
+                self._conn.execute("COMMIT")
+                return claimed
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def renew(self, job_ids):
+        """Extend the lease of jobs this process is still working on"""
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET lease_until = ? WHERE job_id = ? AND status = 'running'",
+                [(time.time() + self.lease_seconds, job_id) for job_id in job_ids]
+            )
+
+    def complete(self, job_id, result):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ? WHERE job_id = ?",
+                (fast_json.dumps(result).decode(), time.time(), job_id)
+            )
+
+    def fail(self, job_id, error):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ?",
+                (error, time.time(), job_id)
+            )
+
+    def requeue(self, job_id):
+        """Return a running job to the queue (e.g. its worker process died)"""
+        with self._lock:
+            self._conn.execute(
+                """UPDATE jobs SET status = 'queued', owner = NULL, owner_boot = NULL, lease_until = NULL
+                   WHERE job_id = ? AND status = 'running'""",
+                (job_id,)
+            )
+
+    def recover(self):
+        """Requeue running jobs whose lease expired or whose owner process is gone"""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, owner, owner_boot, lease_until FROM jobs WHERE status = 'running'"
+            ).fetchall()
+            stale = [
+                row["job_id"] for row in rows
+                if (row["lease_until"] or 0) < now
+                or row["owner"] is None
+                or (row["owner_boot"] != self.boot_id
+                    and (row["owner"] == os.getpid() or not _pid_alive(row["owner"])))
+            ]
+            self._conn.executemany(
+                "UPDATE jobs SET status = 'queued', owner = NULL, owner_boot = NULL, lease_until = NULL WHERE job_id = ?",
+                [(job_id,) for job_id in stale]
+            )
+        return len(stale)
+
+    def get(self, job_id):
+        """Public view of a job, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "submitted_at": row["submitted_at"],
+            "finished_at": row["finished_at"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"]
+        }
+
+    def tenant_depths(self):
+        """{tenant: {"queued", "running", "oldest_queued"}} over the pending jobs of all processes"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT tenant, status, COUNT(*) AS jobs, MIN(submitted_at) AS oldest FROM jobs
+                   WHERE status IN ('queued', 'running') GROUP BY tenant, status"""
+            ).fetchall()
+        depths = {}
+        for row in rows:
+            depth = depths.setdefault(row["tenant"], {"queued": 0, "running": 0, "oldest_queued": None})
+            depth[row["status"]] = row["jobs"]
+            if row["status"] == "queued":
+                depth["oldest_queued"] = row["oldest"]
+        return depths
+
+    def stored_histories(self):
+        """Names of the history stores that queued or running jobs read (stored_history.store)"""
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT DISTINCT json_extract(payload, '$.stored_history.store') FROM jobs
+                   WHERE status IN ('queued', 'running')"""
+            ).fetchall()
+        return {row[0] for row in rows if row[0] is not None}
+
+    def pending(self):
+        """Number of queued or running jobs"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+
+    def purge(self, ttl):
+        """Delete finished jobs older than ttl seconds"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (time.time() - ttl,)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,229 @@
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import HTTPException
+import history_store
+from job_queue import DurableQueue
+from scheduling import FairScheduler, tenant_of
+
+WORKERS = int(os.getenv("FORECAST_WORKERS", os.cpu_count() or 2))
+RESULT_TTL_SECONDS = int(os.getenv("FORECAST_JOB_TTL", 3600))
+MAX_JOBS = int(os.getenv("FORECAST_MAX_JOBS", 1000))
+# Bulk imports queue one job per entity, so they may fill the queue further
+MAX_IMPORT_JOBS = int(os.getenv("FORECAST_MAX_IMPORT_JOBS", 100000))
+JOB_DB = os.getenv("FORECAST_JOB_DB", "forecast_jobs.db")
+POLL_INTERVAL = 0.5
+MAINTENANCE_INTERVAL = 30
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Shared process pool used for fitting work, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=WORKERS)
+        return _pool
+
+def shutdown_pool():
+    """Stop the worker processes (called on application shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def reset_pool():
+    """Replace a broken pool; the next get_pool() call starts fresh workers"""
+    shutdown_pool()
+
+def run_handler(handler, request):
+    """Run an endpoint handler inside a worker, turning HTTP errors into plain ones"""
+    try:
+        return handler(request)
+    except HTTPException as e:
+        raise RuntimeError(e.detail)
+
+class JobStoreFull(Exception):
+    """Raised when no more jobs can be accepted"""
+
+class JobStore:
+    """
+    Runs jobs from a durable SQLite queue on the worker pool.
+
+    Submissions are persisted before they are dispatched, so queued and
+    in-flight jobs survive a restart and are picked up again on start().
+    Identical payloads are deduplicated, finished jobs are retained for
+    `ttl` seconds and at most `max_jobs` may be pending at once (up to
+    `max_import_jobs` through submit_many).
+    Free workers are handed out across tenants by a FairScheduler.
+    """
+    def __init__(self, handlers, path=JOB_DB, max_jobs=MAX_JOBS, ttl=RESULT_TTL_SECONDS, scheduler=None,
+                 max_import_jobs=MAX_IMPORT_JOBS):
+        self.handlers = handlers
+        self.max_jobs = max_jobs
+        self.max_import_jobs = max(max_import_jobs, max_jobs)
+        self.ttl = ttl
+        self.queue = DurableQueue(path)
+        self.scheduler = scheduler if scheduler is not None else FairScheduler()
+        # Written by the dispatcher thread and by future callbacks on the pool's thread
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Recover interrupted jobs and start the dispatcher thread"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self.queue.recover()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="job-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._start_lock:
+            if self._thread is None:
+                return
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def submit(self, kind, request, tenant=None):
+        """
+        Persist a job for request (a validated request model) and return its
+        id. The tenant defaults to the request's business, or the default
+        tenant when it has none.
+        """
+        if self.queue.pending() >= self.max_jobs:
+            raise JobStoreFull(f"Job queue is full ({self.max_jobs} jobs), try again later")
+        payload = request.model_dump(mode="json")
+        job_id, _ = self.queue.enqueue(kind, payload, self.ttl, tenant=tenant or tenant_of(payload))
+        self.start()
+        self._wake.set()
+        return job_id
+
+    def submit_many(self, kind, requests, tenant=None):
+        """
+        Persist one job per request in a single transaction and return their
+        ids in order. All or none are queued: raises JobStoreFull when the
+        batch would take the queue past max_import_jobs.
+        """
+        pending = self.queue.pending()
+        if pending + len(requests) > self.max_import_jobs:
+            raise JobStoreFull(
+                f"{len(requests)} jobs do not fit in the job queue ({pending} pending, at most {self.max_import_jobs})"
+            )
+        payloads = [request.model_dump(mode="json") for request in requests]
+        by_tenant = {}
+        for position, payload in enumerate(payloads):
+            by_tenant.setdefault(tenant or tenant_of(payload), []).append(position)
+        job_ids = [None] * len(payloads)
+        for batch_tenant, positions in by_tenant.items():
+            added = self.queue.enqueue_many(kind, [payloads[i] for i in positions], self.ttl, tenant=batch_tenant)
+            for position, (job_id, _) in zip(positions, added):
+                job_ids[position] = job_id
+        self.start()
+        self._wake.set()
+        return job_ids
+
+    def get(self, job_id):
+        """Public view of a job, or None if unknown or expired"""
+        job = self.queue.get(job_id)
+        if job is None:
+            return None
+        if job["finished_at"] is not None and time.time() - job["finished_at"] > self.ttl:
+            return None
+        return job
+
+    def _run(self):
+        last_maintenance = 0.0
+        while not self._stop.is_set():
+            now = time.time()
+            if now - last_maintenance >= MAINTENANCE_INTERVAL:
+                with self._inflight_lock:
+                    running = list(self._inflight)
+                self.queue.renew(running)
+                self.queue.recover()
+                self.queue.purge(self.ttl)
+                history_store.purge(keep=self.queue.stored_histories())
+                last_maintenance = now
+            self._schedule()
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+
+    def _schedule(self):
+        """Fill the free workers, one job at a time from the tenant the scheduler picks"""
+        with self._inflight_lock:
+            free = WORKERS - len(self._inflight)
+        if free <= 0:
+            return
+        depths = self.queue.tenant_depths()
+        while free > 0:
+            tenant = self.scheduler.pick(depths)
+            if tenant is None:
+                return
+            claimed = self.queue.claim(1, tenant=tenant)
+            depths[tenant]["queued"] -= 1
+            if not claimed:
+                continue
+            depths[tenant]["running"] += 1
+            self.scheduler.charge(tenant)
+            job_id, kind, payload = claimed[0]
+            self._dispatch(job_id, kind, payload)
+            free -= 1
+
+    def tenants(self):
+        """Per-tenant queue depth, running jobs and jobs dispatched by this process"""
+        now = time.time()
+        depths = self.queue.tenant_depths()
+        return {
+            tenant: {
+                "queued": depth["queued"],
+                "running": depth["running"],
+                "oldest_queued_seconds": None if depth["oldest_queued"] is None else now - depth["oldest_queued"],
+                "dispatched": self.scheduler.dispatched[tenant],
+                "weight": self.scheduler.weight(tenant),
+                "max_running": self.scheduler.max_running
+            }
+            for tenant, depth in sorted(depths.items())
+        }
+
+    def _dispatch(self, job_id, kind, payload):
+        request_model, handler = self.handlers[kind]
+        try:
+            request = request_model(**payload)
+        except ValueError as e:
+            self.queue.fail(job_id, f"Invalid payload: {str(e)}")
+            return
+        future = get_pool().submit(run_handler, handler, request)
+        with self._inflight_lock:
+            self._inflight[job_id] = future
+        future.add_done_callback(functools.partial(self._finish, job_id))
+
+    def _finish(self, job_id, future):
+        with self._inflight_lock:
+            self._inflight.pop(job_id, None)
+        if self._stop.is_set():
+            # The queue is closed on shutdown; the job stays running and is
+            # recovered by the next start
+            return
+        if future.cancelled():
+            self.queue.requeue(job_id)
+        elif isinstance(future.exception(), BrokenProcessPool):
+            # A worker died (e.g. out of memory); retry on a fresh pool
+            reset_pool()
+            self.queue.requeue(job_id)
+        elif future.exception() is not None:
+            self.queue.fail(job_id, str(future.exception()))
+        else:
+            self.queue.complete(job_id, future.result())
+        self._wake.set()
@@ -0,0 +1,367 @@
+"""
+Load and soak test for the forecast service
+===========================================
+
+Replays the calls the backend's /api/forecast routes make (see
+backend/src/routes/forecast-route.js): revenue, category demand and product
+usage forecasts over 30-day histories, and reorder alerts over 20-day usage
+histories. Histories skip days without sales, as the backend's SQL does.
+
+Reports throughput, latency percentiles and error rates per call, plus the
+server's memory (RSS) over time, so long runs show leaks and ramps show the
+saturation point.
+
+Usage:
+    # Service started separately (uvicorn app:app), one-minute closed loop
+    python load_test.py --concurrency 8 --duration 60
+
+    # Service started in this process, fixed arrival rate, hour-long soak
+    python load_test.py --in-process --rate 10 --duration 3600 --report-interval 60
+
+    # Find the saturation point
+    python load_test.py --in-process --ramp 1,2,4,8,16 --duration 30
+
+Forecast responses are cached by the service (ETag cache); pass --no-cache
+to make every request fit, or --vary to change each history slightly.
+With --in-process the memory reported is that of this whole process, load
+generator included; pass --server-pid to track a separately started service.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import queue
+import random
+import socket
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+import numpy as np
+import requests
+
+BASE_URL = "http://localhost:8000"
+
+# Share of calls per backend route. Reorder alerts fan out to up to 10
+# products per page load, so they make up most of the calls
+MIX = {"revenue": 0.15, "category": 0.2, "product": 0.2, "reorder": 0.45}
+
+# Same threshold as the backend's jsonBody helper
+GZIP_MIN_BYTES = 4096
+
+class Traffic:
+    """
+    Deterministic synthetic businesses, each with categories and products,
+    and the request bodies the backend sends for them.
+    """
+    def __init__(self, businesses=20, categories=5, products=15, seed=7):
+        self.businesses = businesses
+        self.categories = categories
+        self.products = products
+        self.seed = seed
+
+    def history(self, key, days, vary=False, rng=None):
+        """Daily totals for the last `days` days of one entity, without zero-sale days"""
+        r = random.Random(f"{self.seed}:{key}")
+        level = r.uniform(5, 500)
+        weekly = [r.uniform(0.7, 1.4) for _ in range(7)]
+        today = date.today()
+        points = []
+        for offset in range(days, 0, -1):
+            day = today - timedelta(days=offset)
+            if r.random() < 0.15:
+                continue
+            value = level * weekly[day.weekday()] * r.uniform(0.8, 1.2)
+            if vary:
+                value *= rng.uniform(0.99, 1.01)
+            points.append({"date": day.isoformat(), "value": round(value, 2)})
+        return points
+
+    def call(self, rng, vary=False):
+        """(call name, path, body) of one backend call, drawn from MIX"""
+        name = rng.choices(list(MIX), weights=list(MIX.values()))[0]
+        business = rng.randrange(self.businesses)
+        if name == "revenue":
+            return name, "/business/revenue", {
+                "business_id": str(business),
+                "revenue_history": self.history(f"revenue:{business}", 30, vary, rng),
+                "steps": 7,
+                "seasonal": False
+            }
+        if name == "category":
+            category = business * self.categories + rng.randrange(self.categories)
+            return name, "/business/category-demand", {
+                "category_id": str(category),
+                "sales_history": self.history(f"category:{category}", 30, vary, rng),
+                "steps": 14,
+                "seasonal": False
+            }
+        product = business * self.products + rng.randrange(self.products)
+        if name == "product":
+            return name, "/business/ingredient-usage", {
+                "ingredient_id": str(product),
+                "usage_history": self.history(f"product:{product}", 30, vary, rng),
+                "steps": 7,
+                "seasonal": False
+            }
+        usage = self.history(f"product:{product}", 20, vary, rng)
+        avg_daily_usage = sum(p["value"] for p in usage) / 20
+        return name, "/business/reorder-alert", {
+            "ingredient_id": str(product),
+            "current_stock": round(avg_daily_usage * rng.uniform(2, 15), 2),
+            "usage_history": usage,
+            "reorder_point": avg_daily_usage * (3 + 2),
+            "lead_time_days": 3,
+            "safety_stock": 20
+        }
+
+class Recorder:
+    """Thread-safe log of (finished at, call name, latency seconds, ok)"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+
+    def add(self, name, latency, ok):
+        with self._lock:
+            self.samples.append((time.time(), name, latency, ok))
+
+    def since(self, start):
+        with self._lock:
+            return [sample for sample in self.samples if sample[0] >= start]
+
+def summarize(samples, seconds):
+    """Per-call and overall request count, throughput, error rate and latency percentiles (ms)"""
+    groups = defaultdict(list)
+    for _, name, latency, ok in samples:
+        groups[name].append((latency, ok))
+        groups["all"].append((latency, ok))
+    summary = {}
+    for name, rows in groups.items():
+        latencies = np.array([latency for latency, _ in rows]) * 1000
+        errors = sum(1 for _, ok in rows if not ok)
+        summary[name] = {
+            "requests": len(rows),
+            "throughput": len(rows) / seconds if seconds > 0 else 0.0,
+            "error_rate": errors / len(rows),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p90_ms": float(np.percentile(latencies, 90)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "max_ms": float(latencies.max())
+        }
+    return summary
+
+def rss_mb(pid):
+    """Resident memory of a process in MB (Linux /proc), or None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+def send(session, base_url, path, payload, no_cache=False, timeout=30):
+    """POST one call the way the backend does (gzip above GZIP_MIN_BYTES); returns whether it succeeded"""
+    body = json.dumps(payload).encode()
+    headers = {"Content-Type": "application/json"}
+    if len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    if no_cache:
+        headers["Cache-Control"] = "no-cache"
+    try:
+        response = session.post(base_url + path, data=body, headers=headers, timeout=timeout)
+        return response.ok
+    except requests.RequestException:
+        return False
+
+def run_phase(base_url, traffic, recorder, concurrency, duration, rate=None, no_cache=False, vary=False, seed=0):
+    """
+    Send calls for `duration` seconds from `concurrency` threads. Without a
+    rate each thread sends its next call as soon as the last one returns
+    (closed loop). With a rate, calls are due at fixed intervals and latency
+    counts from the due time, so queueing behind a saturated service shows
+    up in the percentiles (open loop).
+    """
+    deadline = time.time() + duration
+    due = queue.Queue(maxsize=concurrency * 4) if rate else None
+
+    def pace():
+        start = time.time()
+        n = 0
+        while True:
+            at = start + n / rate
+            if at >= deadline:
+                break
+            time.sleep(max(0.0, at - time.time()))
+            due.put(at)
+            n += 1
+        for _ in range(concurrency):
+            due.put(None)
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        session = requests.Session()
+        while True:
+            if rate:
+                started = due.get()
+                if started is None:
+                    break
+            else:
+                started = time.time()
+                if started >= deadline:
+                    break
+            name, path, payload = traffic.call(rng, vary)
+            ok = send(session, base_url, path, payload, no_cache=no_cache)
+            recorder.add(name, time.time() - started, ok)
+        session.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    if rate:
+        threads.append(threading.Thread(target=pace, daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def start_in_process(port=None):
+    """Run the service with uvicorn in a background thread; returns its base URL"""
+    import uvicorn
+    import app as service
+
+    if port is None:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(service.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="forecast-service", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+def print_summary(summary, title):
+    print(f"\n{title}")
+    print(f"   {'call':<10} {'requests':>8} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name in sorted(summary, key=lambda n: (n == "all", n)):
+        s = summary[name]
+        print(f"   {name:<10} {s['requests']:>8} {s['throughput']:>8.2f} {s['error_rate']:>6.1%} "
+              f"{s['p50_ms']:>8.0f} {s['p90_ms']:>8.0f} {s['p99_ms']:>8.0f} {s['max_ms']:>8.0f}")
+
+def soak(base_url, traffic, args, pid):
+    """One phase at args.concurrency, with a report (and RSS sample) every report_interval seconds"""
+    recorder = Recorder()
+    memory = [(0.0, rss_mb(pid))] if pid else []
+    start = time.time()
+    phase = threading.Thread(target=run_phase, args=(base_url, traffic, recorder, args.concurrency, args.duration),
+                             kwargs={"rate": args.rate, "no_cache": args.no_cache, "vary": args.vary, "seed": args.seed})
+    phase.start()
+    last = start
+    while phase.is_alive():
+        phase.join(timeout=args.report_interval)
+        now = time.time()
+        interval = summarize(recorder.since(last), now - last).get("all")
+        rss = rss_mb(pid) if pid else None
+        if rss is not None:
+            memory.append((now - start, rss))
+        if interval:
+            print(f"   [{now - start:7.0f}s] {interval['throughput']:6.2f} req/s  p50 {interval['p50_ms']:6.0f} ms  "
+                  f"p99 {interval['p99_ms']:6.0f} ms  errors {interval['error_rate']:5.1%}"
+                  + (f"  rss {rss:7.1f} MB" if rss is not None else ""))
+        last = now
+
+    result = {"summary": summarize(recorder.samples, time.time() - start)}
+    print_summary(result["summary"], f"Summary ({args.duration:.0f}s, concurrency {args.concurrency}"
+                  + (f", rate {args.rate}/s)" if args.rate else ", closed loop)"))
+    if len(memory) >= 2:
+        elapsed = np.array([t for t, _ in memory])
+        rss = np.array([m for _, m in memory])
+        result["memory"] = {"start_mb": rss[0], "end_mb": rss[-1], "peak_mb": rss.max(), "growth_mb_per_hour": None}
+        print(f"\n   Memory: {rss[0]:.1f} MB -> {rss[-1]:.1f} MB (peak {rss.max():.1f} MB)", end="")
+        # The first interval loads modules and fills caches; the trend after it is what a leak shows up in
+        if len(memory) >= 4:
+            slope = float(np.polyfit(elapsed[1:], rss[1:], 1)[0]) * 3600
+            result["memory"]["growth_mb_per_hour"] = slope
+            print(f", trend after warm-up {slope:+.1f} MB/hour", end="")
+        print()
+    return result
+
+def ramp(base_url, traffic, args):
+    """
+    One phase per concurrency level. The saturation point is the first level
+    whose throughput is within 10% of the best so far while p99 latency keeps
+    rising: more clients only queue.
+    """
+    levels = []
+    for concurrency in args.ramp:
+        recorder = Recorder()
+        start = time.time()
+        run_phase(base_url, traffic, recorder, concurrency, args.duration,
+                  no_cache=args.no_cache, vary=args.vary, seed=args.seed)
+        overall = summarize(recorder.samples, time.time() - start).get("all")
+        if overall is None:
+            continue
+        levels.append({"concurrency": concurrency, **overall})
+        print(f"   concurrency {concurrency:>3}: {overall['throughput']:6.2f} req/s  p50 {overall['p50_ms']:6.0f} ms  "
+              f"p99 {overall['p99_ms']:6.0f} ms  errors {overall['error_rate']:5.1%}")
+
+    saturation = None
+    best = None
+    for level in levels:
+        if best is not None and level["throughput"] < best["throughput"] * 1.1 and level["p99_ms"] > best["p99_ms"]:
+            saturation = best
+            break
+        if best is None or level["throughput"] > best["throughput"]:
+            best = level
+    if saturation:
+        print(f"\n   Saturates at about {saturation['throughput']:.1f} req/s "
+              f"(concurrency {saturation['concurrency']}, p99 {saturation['p99_ms']:.0f} ms)")
+    else:
+        print("\n   No saturation within the tested concurrency levels")
+    return {"levels": levels, "saturation": saturation}
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and soak test for the forecast service")
+    parser.add_argument("--url", default=BASE_URL, help="Service base URL")
+    parser.add_argument("--in-process", action="store_true", help="Start the service in this process instead")
+    parser.add_argument("--server-pid", type=int, help="Process id of the service, for memory tracking")
+    parser.add_argument("--concurrency", type=int, default=4, help="Client threads")
+    parser.add_argument("--rate", type=float, help="Calls per second (open loop); default: closed loop")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds per run (or per ramp level)")
+    parser.add_argument("--report-interval", type=float, default=10, help="Seconds between progress reports")
+    parser.add_argument("--ramp", type=lambda s: [int(c) for c in s.split(",")],
+                        help="Comma-separated concurrency levels to step through, e.g. 1,2,4,8")
+    parser.add_argument("--businesses", type=int, default=20)
+    parser.add_argument("--no-cache", action="store_true", help="Send Cache-Control: no-cache so every call fits")
+    parser.add_argument("--vary", action="store_true", help="Perturb histories so calls rarely repeat")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("FORECAST SERVICE - LOAD TEST")
+    print("=" * 60)
+
+    if args.in_process:
+        base_url = start_in_process()
+        pid = os.getpid()
+    else:
+        base_url = args.url.rstrip("/")
+        pid = args.server_pid
+        try:
+            requests.get(f"{base_url}/", timeout=2).raise_for_status()
+        except requests.RequestException:
+            print(f"Cannot reach {base_url}. Start it with: uvicorn app:app, or pass --in-process")
+            raise SystemExit(1)
+    print(f"Target: {base_url}" + (f" (pid {pid})" if pid else ""))
+
+    traffic = Traffic(businesses=args.businesses)
+    result = ramp(base_url, traffic, args) if args.ramp else soak(base_url, traffic, args, pid)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2, default=float)
+        print(f"\nResults written to {args.json}")
+
+if __name__ == "__main__":
+    main()
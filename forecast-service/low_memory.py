@@ -0,0 +1,76 @@
+import threading
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+# Largest float32 rounding error accepted, relative to the series' standard deviation
+FLOAT32_TOLERANCE = 1e-5
+
+def compact_values(values, float32=True):
+    """
+    Values as one contiguous array: float32 when rounding costs less than
+    FLOAT32_TOLERANCE of the series' spread, otherwise float64.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if not float32 or len(values) == 0:
+        return values
+    single = values.astype(np.float32)
+    error = np.max(np.abs(single - values))
+    spread = values.std()
+    return single if error <= FLOAT32_TOLERANCE * spread or error == 0 else values
+
+def compact_frame(df, max_history=None, float32=True):
+    """
+    Keep the last max_history rows of a regularized frame with the value
+    column as one contiguous (float32 where accurate) array; covariates are
+    left as they are. Returns (frame, report).
+    """
+    if max_history is not None and len(df) > max_history:
+        df = df.iloc[-max_history:]
+    values = compact_values(df["value"].to_numpy(), float32=float32)
+    frame = pd.DataFrame({"value": values}, index=df.index, copy=False)
+    covariates = [c for c in df.columns if c != "value"]
+    if covariates:
+        frame = frame.join(df[covariates])
+    report = {"history_points": len(frame), "dtype": str(values.dtype)}
+    return frame, report
+
+_lock = threading.Lock()
+# Blocks being traced: {token: whether another block ran alongside}
+_active = {}
+_started = False
+
+@contextmanager
+def track_peak_memory():
+    """
+    Yields a dict that receives the peak memory traced by tracemalloc while
+    the block runs (numpy arrays included), in bytes above the level at entry.
+
+    Tracing and its peak are process-wide, so the peak is only this block's
+    when no other block ran at the same time: a block that overlapped
+    another gets peak_bytes None. The peak is reset only on entering a block
+    while no other is active, so it never cuts another block's peak short.
+    """
+    global _started
+    token = object()
+    with _lock:
+        if not _active:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started = True
+            tracemalloc.reset_peak()
+        for other in _active:
+            _active[other] = True
+        _active[token] = bool(_active)
+        baseline = tracemalloc.get_traced_memory()[0]
+    usage = {}
+    try:
+        yield usage
+    finally:
+        with _lock:
+            overlapped = _active.pop(token)
+            usage["peak_bytes"] = None if overlapped else max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            if not _active and _started:
+                tracemalloc.stop()
+                _started = False
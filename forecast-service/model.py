@@ -1,142 +1,764 @@
+import os
 import pandas as pd
 import numpy as np
-from pmdarima import auto_arima
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pmdarima import ARIMA, auto_arima
+from scipy.signal import lfilter
+from scipy.stats import norm
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from sklearn.metrics import mean_absolute_error, mean_squared_error
+from seasonality import detect_seasonal_period, series_fingerprint, MAX_SEASONAL_PERIOD
+import param_store
+import accuracy_store
+from param_store import model_spec
+import fast_arima
+import order_search
+import aggregation
+import drift
 import warnings
 warnings.filterwarnings('ignore')
 
+ENGINES = ("auto", "sarima", "fourier")
+FOURIER_PERIODS = (7, 365.25)
+FOURIER_MIN_LENGTH = 730
+FOURIER_MAX_ORDER = 10
+MODEL_CACHE_SIZE = 256
+MODEL_CACHE_BYTES = int(os.getenv("FORECAST_MODEL_CACHE_MB", 512)) * 1024 * 1024
+MIN_CACHED_HORIZON = 30
+SAMPLE_PATH_SEED = 42
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_parameter_store():
+    """Shared ParameterStore at FORECAST_PARAM_DB, opened on first use"""
+    with _stores_lock:
+        if "params" not in _stores:
+            _stores["params"] = param_store.ParameterStore(param_store.PARAM_DB)
+        return _stores["params"]
+
+def get_accuracy_store():
+    """Shared AccuracyStore at FORECAST_ACCURACY_DB, opened on first use"""
+    with _stores_lock:
+        if "accuracy" not in _stores:
+            _stores["accuracy"] = accuracy_store.AccuracyStore(accuracy_store.ACCURACY_DB)
+        return _stores["accuracy"]
+
+def close_stores():
+    """Close the stores opened so far (called on application shutdown)"""
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
+
 def calculate_mape(actual, predicted):
     """Calculate Mean Absolute Percentage Error"""
     actual, predicted = np.array(actual), np.array(predicted)
     return np.mean(np.abs((actual - predicted) / actual)) * 100
 
 def get_model_metrics(model_fit):
-    """Extract model performance metrics"""
+    """Extract model performance metrics (pmdarima-style methods or statsmodels attributes)"""
+    def value(name):
+        metric = getattr(model_fit, name)
+        return float(metric() if callable(metric) else metric)
     try:
         return {
-            "aic": float(model_fit.aic()),
-            "bic": float(model_fit.bic()),
-            "aicc": float(model_fit.aicc()) if hasattr(model_fit, 'aicc') else None
+            "aic": value("aic"),
+            "bic": value("bic"),
+            "aicc": value("aicc") if hasattr(model_fit, 'aicc') else None
         }
     except:
         return {"aic": None, "bic": None, "aicc": None}
 
-def run_sarima(series, seasonal=True, m=12, steps=6):
-    """Legacy function - Fits SARIMA/ARIMA"""
-    model = auto_arima(
-        series,
-        seasonal=seasonal,
-        m=m,
-        suppress_warnings=True,
-        error_action="ignore"
+def resolve_seasonality(series, seasonal=True, seasonal_period=None):
+    """
+    Return (seasonal, m) for auto_arima. An explicit seasonal_period is used
+    as given, whatever the series length; otherwise the period is detected,
+    which only finds periods the series covers at least twice.
+    """
+    if not seasonal:
+        return False, 1
+    if seasonal_period is None:
+        seasonal_period = detect_seasonal_period(series)
+    if seasonal_period and int(seasonal_period) > 1:
+        return True, int(seasonal_period)
+    return False, 1
+
+@lru_cache(maxsize=128)
+def fourier_terms(period, K, length):
+    """Sin/cos regressors (length x 2K) for one seasonal period, cached read-only"""
+    t = np.arange(1, length + 1, dtype=np.float64)[:, None]
+    k = np.arange(1, K + 1, dtype=np.float64)[None, :]
+    angles = 2 * np.pi * k * t / period
+    terms = np.hstack([np.sin(angles), np.cos(angles)])
+    terms.setflags(write=False)
+    return terms
+
+def fourier_order(period):
+    """Default number of harmonics for a period"""
+    return int(max(1, min(FOURIER_MAX_ORDER, period // 2)))
+
+def fourier_design(periods, length):
+    """Stack the cached Fourier terms of every period into one design matrix"""
+    return np.hstack([fourier_terms(p, fourier_order(p), length) for p in periods])
+
+class FourierARIMA:
+    """
+    Long seasonal cycles are captured by a least-squares fit on Fourier
+    regressors and a low-order non-seasonal ARIMA models the residuals.
+    Exposes the same predict/order/aic interface as a pmdarima model.
+    """
+    def __init__(self, periods, max_p=2, max_q=2):
+        self.periods = tuple(periods)
+        self.max_p = max_p
+        self.max_q = max_q
+
+    def _design(self, start, stop, X=None):
+        terms = fourier_design(self.periods, stop)[start:]
+        blocks = [np.ones((len(terms), 1)), terms]
+        if X is not None:
+            blocks.append(np.asarray(X, dtype=np.float64)[:len(terms)])
+        return np.hstack(blocks)
+
+    def fit(self, series, X=None):
+        y = np.asarray(series, dtype=np.float64)
+        self.n_ = len(y)
+        X = self._design(0, self.n_, X)
+        self.coef_, _, _, _ = np.linalg.lstsq(X, y, rcond=None)
+        self.arima_ = auto_arima(
+            y - X @ self.coef_,
+            seasonal=False,
+            start_p=0, start_q=0,
+            max_p=self.max_p, max_q=self.max_q,
+            suppress_warnings=True,
+            error_action='ignore',
+            stepwise=True
+        )
+        return self
+
+    def predict(self, n_periods, X=None, return_conf_int=False, alpha=0.05):
+        seasonal_part = self._design(self.n_, self.n_ + n_periods, X) @ self.coef_
+        if not return_conf_int:
+            return self.arima_.predict(n_periods=n_periods) + seasonal_part
+        forecast, conf_int = self.arima_.predict(n_periods=n_periods, return_conf_int=True, alpha=alpha)
+        return forecast + seasonal_part, conf_int + seasonal_part[:, None]
+
+    @property
+    def order(self):
+        return self.arima_.order
+
+    @property
+    def seasonal_order(self):
+        return (0, 0, 0, 0)
+
+    @property
+    def name(self):
+        periods = ",".join(f"{p:g}" for p in self.periods)
+        return f"ARIMA{self.order}+Fourier({periods})"
+
+    def aic(self):
+        return self.arima_.aic() + 2 * len(self.coef_)
+
+    def bic(self):
+        return self.arima_.bic() + np.log(self.n_) * len(self.coef_)
+
+    def aicc(self):
+        return self.arima_.aicc() + 2 * len(self.coef_)
+
+def is_daily(series):
+    """Whether the series has a daily DatetimeIndex (set or inferred frequency)"""
+    index = getattr(series, "index", None)
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 3:
+        return False
+    freq = index.freq or pd.infer_freq(index)
+    return freq is not None and pd.tseries.frequencies.to_offset(freq) == pd.offsets.Day()
+
+def select_engine(series, engine="auto", seasonal_period=None):
+    """
+    Pick the fitting engine; 'auto' uses Fourier terms for long daily
+    histories (FOURIER_PERIODS are daily cycles) or seasonal periods too long
+    for SARIMA, and SARIMA otherwise.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+    if engine == "auto":
+        long_period = seasonal_period is not None and seasonal_period > MAX_SEASONAL_PERIOD
+        long_daily = len(series) >= FOURIER_MIN_LENGTH and is_daily(series)
+        engine = "fourier" if long_period or long_daily else "sarima"
+    return engine
+
+def fourier_periods(series, seasonal_period=None):
+    """
+    Seasonal periods covered at least twice by the series: the weekly and
+    yearly FOURIER_PERIODS for daily data, plus an explicit seasonal_period
+    """
+    candidates = set(FOURIER_PERIODS) if is_daily(series) else set()
+    if seasonal_period:
+        candidates.add(seasonal_period)
+    return tuple(sorted(p for p in candidates if len(series) >= 2 * p))
+
+def warm_search_start(entity_id, search, search_kwargs):
+    """
+    Start the stepwise search at the order previously selected for entity,
+    so it needs fewer candidate fits when that order is still (nearly) best.
+    """
+    selection = get_parameter_store().get_selection(entity_id, search)
+    if selection is None:
+        return search_kwargs
+    (p, _, q), (P, _, Q, _) = selection
+    start = dict(search_kwargs)
+    for name, value in (("p", p), ("q", q), ("P", P), ("Q", Q)):
+        start[f"start_{name}"] = min(value, start.get(f"max_{name}", value))
+    return start
+
+def remember_fit(entity_id, model_fit):
+    """Store the fitted parameters of a converged statsmodels results object or FastSARIMA for warm starts"""
+    if not model_fit.mle_retvals.get("converged", True):
+        return
+    if isinstance(model_fit, fast_arima.FastSARIMA):
+        spec = model_spec(model_fit.order, model_fit.seasonal_order)
+        get_parameter_store().put(entity_id, spec, model_fit.param_names, model_fit.params)
+        return
+    model = model_fit.model
+    spec = model_spec(model.order, model.seasonal_order, model.trend)
+    get_parameter_store().put(entity_id, spec, model.param_names, model_fit.params)
+
+def refit_if_stable(series, entity_id, search, exog=None, low_memory=False):
+    """
+    Refit the order last selected for entity, warm-started from its stored
+    parameters, when drift.check finds the one-step residuals since that
+    selection stable. Returns None, so the caller runs the full order search,
+    on drift, when nothing usable is stored or when the refit fails.
+    """
+    report = drift.check(get_parameter_store(), entity_id, search, series, exog=exog)
+    if report["status"] != "stable":
+        return None
+    order, seasonal_order, trend = report["order"], report["seasonal_order"], report["trend"]
+    try:
+        # Stored values are mapped onto the parameter names of the SARIMAX
+        # pmdarima builds, so the order of the stored dict does not matter
+        start_params = get_parameter_store().start_params(
+            entity_id,
+            model_spec(order, seasonal_order, trend),
+            SARIMAX(
+                np.asarray(series, dtype=np.float64),
+                exog=exog,
+                order=order,
+                seasonal_order=seasonal_order,
+                trend=trend
+            )
+        )
+        model = ARIMA(
+            order=order,
+            seasonal_order=seasonal_order,
+            with_intercept=trend == "c",
+            start_params=start_params,
+            suppress_warnings=True
+        ).fit(series, X=exog, low_memory=low_memory)
+    except (ValueError, np.linalg.LinAlgError):
+        return None
+    remember_fit(entity_id, model.arima_res_)
+    return model
+
+def drift_status(series, entity_id, seasonal=True, seasonal_period=None, exog=None):
+    """drift.check report for the SARIMA order last selected for entity, on this history"""
+    _, m_value = resolve_seasonality(series, seasonal, seasonal_period)
+    return drift.check(get_parameter_store(), entity_id, f"sarima:m={m_value}", series, exog=exog)
+
+def fit_auto_model(series, seasonal=True, seasonal_period=None, engine="auto", exog=None, entity_id=None,
+                   batched_search=True, low_memory=False, drift_monitor=True, **search_kwargs):
+    """
+    Resolve engine and seasonality, then fit; returns a model with predict/order/aic.
+    With an entity_id and drift_monitor, an entity whose model shows no drift
+    since its order was selected is refitted at that order without a search
+    (refit_if_stable); otherwise the SARIMA search starts from that order.
+    Without covariates the order search runs in order_search (batched candidate
+    evaluation), falling back to auto_arima where it does not apply.
+    low_memory fits keep no per-observation filter output (see _forecast_moments).
+    """
+    engine = select_engine(series, engine, seasonal_period)
+    if engine == "fourier" and seasonal:
+        periods = fourier_periods(series, seasonal_period)
+        if periods:
+            return FourierARIMA(periods).fit(series, X=exog)
+    seasonal, m_value = resolve_seasonality(series, seasonal, seasonal_period)
+    search = f"sarima:m={m_value}"
+    if entity_id is not None:
+        if drift_monitor:
+            model = refit_if_stable(series, entity_id, search, exog=exog, low_memory=low_memory)
+            if model is not None:
+                return model
+        search_kwargs = warm_search_start(entity_id, search, search_kwargs)
+    model = None
+    if batched_search and order_search.supports(exog, m=m_value, **search_kwargs):
+        model = order_search.batched_auto_arima(
+            series, seasonal=seasonal, m=m_value, low_memory=low_memory, **search_kwargs
+        )
+    if model is None:
+        model = auto_arima(
+            series,
+            X=exog,
+            seasonal=seasonal,
+            m=m_value,
+            suppress_warnings=True,
+            error_action='ignore',
+            stepwise=True,
+            low_memory=low_memory,
+            **search_kwargs
+        )
+    if entity_id is not None:
+        get_parameter_store().put_selection(entity_id, search, model.order, model.seasonal_order)
+        remember_fit(entity_id, model.arima_res_)
+        if isinstance(getattr(series, "index", None), pd.DatetimeIndex):
+            results = model.arima_res_
+            get_parameter_store().put_baseline(
+                entity_id, search, results.model.trend, series.index[-1].isoformat(),
+                results.model.param_names, results.params
+            )
+    return model
+
+def describe_model(model):
+    """Human readable model name, e.g. SARIMA(1, 1, 1)x(1, 1, 1, 7)"""
+    if hasattr(model, "name"):
+        return model.name
+    if model.seasonal_order[3] > 1:
+        return f"SARIMA{model.order}x{model.seasonal_order}"
+    return f"ARIMA{model.order}"
+
+def object_nbytes(obj, max_depth=8):
+    """
+    Approximate memory held by the NumPy arrays reachable from obj through
+    attributes, containers and array bases (each array counted once). The
+    filter output of a statsmodels fit dominates the size of a model.
+    """
+    seen = set()
+    total = 0
+    stack = [(obj, 0)]
+    while stack:
+        item, depth = stack.pop()
+        if id(item) in seen or depth > max_depth:
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.ndarray):
+            if item.base is None:
+                total += item.nbytes
+            else:
+                stack.append((item.base, depth))
+        elif isinstance(item, (pd.Series, pd.DataFrame, pd.Index)):
+            total += int(item.memory_usage(deep=False).sum()) if hasattr(item, "columns") else item.memory_usage()
+        elif isinstance(item, dict):
+            stack.extend((value, depth + 1) for value in item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend((value, depth + 1) for value in item)
+        elif hasattr(item, "__dict__") and not isinstance(item, type):
+            stack.extend((value, depth + 1) for value in vars(item).values())
+    return total
+
+class ModelCache:
+    """
+    LRU cache of fitted models keyed by series, covariates and fit settings,
+    bounded by entry count and by the approximate bytes the models hold.
+
+    Each entry also keeps the longest forecast computed so far as a mean and
+    standard error per step, so shorter horizons and other confidence levels
+    are derived without calling predict again. Concurrent requests for the
+    same key wait for one fit instead of each fitting the model.
+    """
+    def __init__(self, max_size=MODEL_CACHE_SIZE, max_bytes=MODEL_CACHE_BYTES):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._fitting = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        """Add an entry; its size is measured once here (entry["nbytes"])"""
+        entry["nbytes"] = object_nbytes(entry["model"])
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous["nbytes"]
+            self._entries[key] = entry
+            self.nbytes += entry["nbytes"]
+            # The newest entry stays even when it alone exceeds max_bytes
+            while len(self._entries) > 1 and (len(self._entries) > self.max_size or self.nbytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted["nbytes"]
+
+    def get_or_create(self, key, create):
+        """
+        Cached entry for key, else the entry create() returns, stored.
+        Callers racing on a missing key share one create() call.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            key_lock = self._fitting.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                entry = self.get(key)
+                if entry is None:
+                    entry = create()
+                    self.put(key, entry)
+                return entry
+        finally:
+            with self._lock:
+                if self._fitting.get(key) is key_lock:
+                    del self._fitting[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+model_cache = ModelCache()
+
+def _fingerprint(values):
+    return None if values is None else series_fingerprint(np.ravel(values))
+
+def _index_key(series):
+    """First date and frequency of a date-indexed series: with the values they fix every date"""
+    index = getattr(series, "index", None)
+    if not isinstance(index, pd.DatetimeIndex) or len(index) == 0:
+        return None
+    freq = index.freqstr or (pd.infer_freq(index) if len(index) >= 3 else None)
+    return index[0].isoformat(), freq
+
+def cached_fit(series, exog=None, fit=None, **fit_kwargs):
+    """
+    Fit with fit(series, exog=exog, **fit_kwargs) (default: fit_auto_model),
+    reusing a previous fit of the same data, dates and settings (the engine
+    and seasonal periods depend on the frequency).
+    Returns the cache entry; the fitted model is entry["model"].
+    """
+    fit = fit or fit_auto_model
+    key = (
+        fit.__name__, _fingerprint(series), _index_key(series), _fingerprint(exog),
+        tuple(sorted(fit_kwargs.items()))
     )
-    forecast, conf_int = model.predict(n_periods=steps, return_conf_int=True)
-    return {
-        "order": model.order,
-        "seasonal_order": model.seasonal_order,
-        "forecast": forecast.tolist(),
-        "lower": conf_int[:, 0].tolist(),
-        "upper": conf_int[:, 1].tolist()
-    }
+    return model_cache.get_or_create(key, lambda: {
+        "model": fit(series, exog=exog, **fit_kwargs),
+        "mean": np.empty(0),
+        "se": np.empty(0),
+        "psi": np.empty(0),
+        "future_exog": None,
+        "lock": threading.Lock()
+    })
+
+def _forecast_moments(model, horizon, X=None):
+    """Forecast mean and standard error for `horizon` steps of any supported model"""
+    if hasattr(model, "forecast_moments"):
+        return model.forecast_moments(horizon)
+    results = getattr(model, "arima_res_", model)
+    if hasattr(results, "filter_results") and results.filter_results.conserve_memory:
+        # Low-memory fits keep no state covariance history; the standard
+        # errors come from the impulse responses (psi weights) instead
+        mean = np.asarray(results.get_forecast(steps=horizon, exog=X).predicted_mean)
+        psi = np.asarray(results.impulse_responses(horizon - 1)).ravel()[:horizon]
+        sigma2 = np.asarray(results.params)[results.model.param_names.index("sigma2")]
+        return mean, np.sqrt(sigma2 * np.cumsum(psi ** 2))
+    if hasattr(model, "get_forecast"):
+        result = model.get_forecast(steps=horizon, exog=X)
+        return np.asarray(result.predicted_mean), np.sqrt(np.asarray(result.var_pred_mean))
+    mean, conf_int = model.predict(n_periods=horizon, X=X, return_conf_int=True, alpha=0.05)
+    mean = np.asarray(mean)
+    return mean, (np.asarray(conf_int)[:, 1] - mean) / norm.ppf(0.975)
+
+def _impulse_weights(model, horizon):
+    """psi weights (psi_0 = 1) of the forecast errors for `horizon` steps of any supported model"""
+    if hasattr(model, "impulse_weights"):
+        return model.impulse_weights(horizon)
+    results = getattr(getattr(model, "arima_", model), "arima_res_", model)
+    return np.asarray(results.impulse_responses(horizon - 1)).ravel()[:horizon]
+
+def _cached_moments(entry, steps, future_exog=None):
+    """
+    Forecast mean and standard error for `steps` periods from a cached fit.
+    Predicts only when the cached horizon is shorter than `steps` (or the
+    future covariates differ).
+    """
+    with entry["lock"]:
+        cached_exog = entry["future_exog"]
+        reusable = len(entry["mean"]) >= steps and (
+            future_exog is None or (
+                cached_exog is not None and np.array_equal(cached_exog[:steps], np.asarray(future_exog)[:steps])
+            )
+        )
+        if not reusable:
+            horizon = steps if future_exog is not None else max(steps, MIN_CACHED_HORIZON)
+            entry["mean"], entry["se"] = _forecast_moments(entry["model"], horizon, future_exog)
+            entry["future_exog"] = None if future_exog is None else np.asarray(future_exog)
+        return entry["mean"][:steps], entry["se"][:steps]
+
+def forecast_from(entry, steps, confidence_level=0.95, future_exog=None):
+    """
+    (forecast, lower, upper) arrays for `steps` periods from a cached fit;
+    intervals for any confidence level come from the cached standard errors.
+    """
+    mean, se = _cached_moments(entry, steps, future_exog)
+    z = norm.ppf(0.5 + confidence_level / 2)
+    return mean, mean - z * se, mean + z * se
 
-def run_auto_forecast(series, seasonal=True, seasonal_period=None, steps=6, confidence_level=0.95):
+def forecast_distribution(entry, steps, quantiles=None, n_paths=0, future_exog=None):
+    """
+    (quantiles, paths) for `steps` periods from a cached fit: one row per
+    requested quantile of the Gaussian predictive distribution, and n_paths
+    sample paths whose shocks carry through later steps by the model's psi
+    weights, so sums over a path have the right spread. Either is None when
+    not requested.
+    """
+    mean, se = _cached_moments(entry, steps, future_exog)
+    rows = mean + np.outer(norm.ppf(quantiles), se) if quantiles else None
+    paths = None
+    if n_paths:
+        with entry["lock"]:
+            if len(entry["psi"]) < steps:
+                entry["psi"] = _impulse_weights(entry["model"], max(steps, MIN_CACHED_HORIZON))
+            psi = entry["psi"][:steps]
+        shocks = np.random.default_rng(SAMPLE_PATH_SEED).standard_normal((n_paths, steps)) * se[0]
+        paths = mean + lfilter(psi, [1.0], shocks, axis=1)
+    return rows, paths
+
+def _distribution_fields(quantiles, rows, paths):
+    fields = {}
+    if rows is not None:
+        fields["quantiles"] = {f"{q:g}": row for q, row in zip(quantiles, rows)}
+    if paths is not None:
+        fields["sample_paths"] = paths
+    return fields
+
+def engine_label(model, fit=None):
+    """Engine name accuracy is tracked under: manual, fourier or sarima"""
+    if fit is fit_manual_model:
+        return "manual"
+    return "fourier" if isinstance(model, FourierARIMA) else "sarima"
+
+def track_forecast(key, engine, series, forecast, actuals=None):
+    """
+    Score the earlier forecasts tracked under key against actuals (the
+    observed values, by default the history itself), then record this
+    forecast for the periods after the history.
+    """
+    get_accuracy_store().score(key, series if actuals is None else actuals)
+    freq = series.index.freq or (pd.infer_freq(series.index) if len(series) >= 3 else None)
+    if freq is not None:
+        dates = pd.date_range(series.index[-1], periods=len(forecast) + 1, freq=freq)[1:]
+        get_accuracy_store().issue(key, engine, dates, forecast)
+
+def fit_and_forecast(series, steps, confidence_level=0.95, exog=None, future_exog=None, aggregate=None,
+                     quantiles=None, sample_paths=0, per_period=False, track_as=None, actuals=None,
+                     **fit_kwargs):
+    """
+    cached_fit + forecast_from (+ forecast_distribution) for a history. With
+    aggregate ('W' or 'MS') a daily history is fitted as weekly or monthly
+    totals, with the seasonal period detected at that granularity, and the
+    coarse forecasts are spread back over the days by the history's weekday
+    profile. With per_period, steps counts coarse periods instead and the
+    period totals are returned as they are.
+    With track_as the forecast is recorded for accuracy tracking under that
+    key, after the earlier ones are scored against actuals.
+    Returns (entry, (forecast, lower, upper), distribution) where
+    distribution holds the requested "quantiles" and "sample_paths".
+    """
+    if aggregate is None:
+        entry = cached_fit(series, exog=exog, **fit_kwargs)
+        bands = forecast_from(entry, steps, confidence_level, future_exog)
+        rows, paths = forecast_distribution(entry, steps, quantiles, sample_paths, future_exog)
+        if track_as is not None:
+            track_forecast(track_as, engine_label(entry["model"], fit_kwargs.get("fit")), series, bands[0], actuals)
+        return entry, bands, _distribution_fields(quantiles, rows, paths)
+    if exog is not None:
+        raise ValueError("aggregate does not support covariates")
+    coarse = aggregation.aggregate(series, aggregate)
+    fit_kwargs["seasonal_period"] = None
+    if fit_kwargs.get("entity_id") is not None:
+        # Warm starts of a weekly fit must not seed the entity's daily fits
+        fit_kwargs["entity_id"] = f"{fit_kwargs['entity_id']}@{aggregate}"
+    entry = cached_fit(coarse, **fit_kwargs)
+    periods = steps if per_period else aggregation.horizon(series, coarse, steps, aggregate)
+    moments = forecast_from(entry, periods, confidence_level) + forecast_distribution(
+        entry, periods, quantiles, sample_paths
+    )
+    if per_period:
+        forecast, lower, upper, rows, paths = moments
+        if track_as is not None:
+            if actuals is not None:
+                # Totals of the observed values; unobserved days add nothing
+                actuals = aggregation.aggregate(actuals.reindex(series.index, fill_value=0.0), aggregate)
+            track_forecast(track_as, f"{engine_label(entry['model'])}@{aggregate}-total", coarse, forecast, actuals)
+        return entry, (forecast, lower, upper), _distribution_fields(quantiles, rows, paths)
+    forecast, lower, upper, rows, paths = aggregation.disaggregate(series, coarse, moments, steps, aggregate)
+    if track_as is not None:
+        track_forecast(track_as, f"{engine_label(entry['model'])}@{aggregate}", series, forecast, actuals)
+    return entry, (forecast, lower, upper), _distribution_fields(quantiles, rows, paths)
+
+def run_auto_forecast(series, seasonal=True, seasonal_period=None, steps=6, confidence_level=0.95, engine="auto",
+                      exog=None, future_exog=None, entity_id=None, low_memory=False, aggregate=None,
+                      quantiles=None, sample_paths=0, track_as=None, actuals=None):
     """Automatic SARIMA/ARIMA model selection and forecasting"""
-    if seasonal and seasonal_period is None:
-        seasonal_period = 12 if len(series) >= 24 else None
-        if seasonal_period is None:
-            seasonal = False
-    
-    m_value = int(seasonal_period) if seasonal and seasonal_period else 1
-    
-    model = auto_arima(
+    entry, (forecast, lower, upper), distribution = fit_and_forecast(
         series,
+        steps,
+        confidence_level,
+        exog=exog,
+        future_exog=future_exog,
+        aggregate=aggregate,
+        quantiles=quantiles,
+        sample_paths=sample_paths,
         seasonal=seasonal,
-        m=m_value,
+        seasonal_period=seasonal_period,
+        engine=engine,
+        entity_id=entity_id,
+        track_as=track_as,
+        actuals=actuals,
+        low_memory=low_memory,
         start_p=0, start_q=0,
         max_p=5, max_q=5,
         start_P=0, start_Q=0,
         max_P=2, max_Q=2,
         d=None, D=None,
         trace=False,
-        error_action='ignore',
-        suppress_warnings=True,
-        stepwise=True,
         random_state=42
     )
+    model = entry["model"]
     
-    alpha = 1 - confidence_level
-    forecast, conf_int = model.predict(n_periods=steps, return_conf_int=True, alpha=alpha)
     metrics = get_model_metrics(model)
     
     return {
         "order": model.order,
-        "seasonal_order": model.seasonal_order if seasonal else (0, 0, 0, 0),
-        "forecast": forecast.tolist(),
-        "lower": conf_int[:, 0].tolist(),
-        "upper": conf_int[:, 1].tolist(),
-        "metrics": metrics
+        "seasonal_order": model.seasonal_order,
+        "model_name": describe_model(model),
+        "forecast": forecast,
+        "lower": lower,
+        "upper": upper,
+        "metrics": metrics,
+        **distribution
     }
 
-def run_manual_forecast(series, order, seasonal_order=None, steps=6, confidence_level=0.95):
-    """Manual SARIMA/ARIMA forecasting with specified parameters"""
+def fit_fast_model(series, order, seasonal_order=(0, 0, 0, 0), entity_id=None):
+    """
+    Fit with the NumPy fast path (fast_arima.FastSARIMA), warm-started like
+    fit_manual_model. Returns None when the fit does not converge.
+    """
+    stored = get_parameter_store().get(entity_id, model_spec(order, seasonal_order)) if entity_id is not None else None
+    model_fit = fast_arima.FastSARIMA(order, seasonal_order).fit(series, start_params=stored)
+    if stored and not model_fit.converged:
+        model_fit = fast_arima.FastSARIMA(order, seasonal_order).fit(series)
+    if not model_fit.converged:
+        return None
+    if entity_id is not None:
+        remember_fit(entity_id, model_fit)
+    return model_fit
+
+def fit_manual_model(series, order, seasonal_order=(0, 0, 0, 0), exog=None, entity_id=None, fast_path=True,
+                     low_memory=False):
+    """
+    Fit a SARIMAX model with fixed orders. Orders where fast_arima agrees
+    with SARIMAX (fast_path_applies) and no covariates use the NumPy fast
+    path, falling back to statsmodels if it does not converge.
+    With an entity_id the optimizer starts from the parameters last fitted for
+    that entity and order, and falls back to a cold start if the warm-started
+    fit does not converge. low_memory is passed to the statsmodels fit.
+    """
+    if fast_path and exog is None and fast_arima.fast_path_applies(order, seasonal_order, len(series)):
+        model_fit = fit_fast_model(series, order, seasonal_order, entity_id=entity_id)
+        if model_fit is not None:
+            return model_fit
+
     model = SARIMAX(
         series,
+        exog=exog,
         order=order,
-        seasonal_order=seasonal_order if seasonal_order else (0, 0, 0, 0),
+        seasonal_order=seasonal_order,
         enforce_stationarity=False,
         enforce_invertibility=False
     )
-    
-    model_fit = model.fit(disp=False)
-    alpha = 1 - confidence_level
-    forecast_result = model_fit.get_forecast(steps=steps, alpha=alpha)
-    forecast = forecast_result.predicted_mean
-    conf_int = forecast_result.conf_int()
+    model_fit = None
+    if entity_id is not None:
+        spec = model_spec(order, seasonal_order, model.trend)
+        start_params = get_parameter_store().start_params(entity_id, spec, model)
+        if start_params is not None:
+            try:
+                model_fit = model.fit(start_params=start_params, disp=False, low_memory=low_memory)
+            except (ValueError, np.linalg.LinAlgError):
+                model_fit = None
+            if model_fit is not None and not model_fit.mle_retvals.get("converged", True):
+                model_fit = None
+    if model_fit is None:
+        model_fit = model.fit(disp=False, low_memory=low_memory)
+    if entity_id is not None:
+        remember_fit(entity_id, model_fit)
+    return model_fit
+
+def run_manual_forecast(series, order, seasonal_order=None, steps=6, confidence_level=0.95,
+                        exog=None, future_exog=None, entity_id=None, low_memory=False,
+                        quantiles=None, sample_paths=0, track_as=None, actuals=None):
+    """Manual SARIMA/ARIMA forecasting with specified parameters"""
+    entry, (forecast, lower, upper), distribution = fit_and_forecast(
+        series,
+        steps,
+        confidence_level,
+        exog=exog,
+        future_exog=future_exog,
+        quantiles=quantiles,
+        sample_paths=sample_paths,
+        fit=fit_manual_model,
+        entity_id=entity_id,
+        track_as=track_as,
+        actuals=actuals,
+        low_memory=low_memory,
+        order=tuple(order),
+        seasonal_order=tuple(seasonal_order) if seasonal_order else (0, 0, 0, 0)
+    )
+    model_fit = entry["model"]
     metrics = get_model_metrics(model_fit)
     
     return {
-        "forecast": forecast.tolist(),
-        "lower": conf_int.iloc[:, 0].tolist(),
-        "upper": conf_int.iloc[:, 1].tolist(),
-        "metrics": metrics
+        "forecast": forecast,
+        "lower": lower,
+        "upper": upper,
+        "metrics": metrics,
+        **distribution
     }
 
-def evaluate_forecast(series, test_size=6, seasonal=True, seasonal_period=None):
+def evaluate_forecast(series, test_size=6, seasonal=True, seasonal_period=None, engine="auto", exog=None,
+                      low_memory=False):
     """Evaluate forecast model accuracy using train-test split"""
     if len(series) < test_size + 10:
         raise ValueError(f"Series too short for test_size={test_size}")
     
     train = series[:-test_size]
     test = series[-test_size:]
+    train_exog = exog[:-test_size] if exog is not None else None
+    test_exog = exog[-test_size:] if exog is not None else None
     
-    if seasonal and seasonal_period is None:
-        seasonal_period = 12 if len(train) >= 24 else None
-        if seasonal_period is None:
-            seasonal = False
-    
-    m_value = int(seasonal_period) if seasonal and seasonal_period else 1
-    
-    model = auto_arima(
-        train,
-        seasonal=seasonal,
-        m=m_value,
-        suppress_warnings=True,
-        error_action='ignore',
-        stepwise=True
+    entry = cached_fit(
+        train, seasonal=seasonal, seasonal_period=seasonal_period, engine=engine, exog=train_exog, low_memory=low_memory
     )
+    model = entry["model"]
     
-    predictions, _ = model.predict(n_periods=test_size, return_conf_int=True)
+    predictions, _, _ = forecast_from(entry, test_size, future_exog=test_exog)
     mae = mean_absolute_error(test, predictions)
     rmse = np.sqrt(mean_squared_error(test, predictions))
     mape = calculate_mape(test, predictions)
     
-    model_name = f"SARIMA{model.order}x{model.seasonal_order}" if seasonal else f"ARIMA{model.order}"
+    model_name = describe_model(model)
     
     return {
         "model_name": model_name,
-        "predictions": predictions.tolist(),
-        "actual": test.tolist(),
+        "predictions": predictions,
+        "actual": test.to_numpy(),
         "metrics": {
             "mae": float(mae),
             "rmse": float(rmse),
@@ -148,102 +770,124 @@ def evaluate_forecast(series, test_size=6, seasonal=True, seasonal_period=None):
     }
 
 # Business-specific functions
-def forecast_ingredient_usage(series, steps=7, seasonal=True, seasonal_period=7):
+def forecast_ingredient_usage(series, steps=7, seasonal=True, seasonal_period=7, engine="auto",
+                              exog=None, future_exog=None, entity_id=None, low_memory=False, aggregate=None,
+                              quantiles=None, sample_paths=0, track_as=None, actuals=None):
     """Forecast ingredient usage for inventory management"""
-    if seasonal and len(series) < seasonal_period * 2:
+    if seasonal and seasonal_period and len(series) < seasonal_period * 2:
         seasonal = False
-    
-    m_value = int(seasonal_period) if seasonal else 1
-    
-    model = auto_arima(
+    entry, (forecast, lower, upper), distribution = fit_and_forecast(
         series,
+        steps,
+        exog=exog,
+        future_exog=future_exog,
+        aggregate=aggregate,
+        quantiles=quantiles,
+        sample_paths=sample_paths,
         seasonal=seasonal,
-        m=m_value,
+        seasonal_period=seasonal_period,
+        engine=engine,
+        entity_id=entity_id,
+        track_as=track_as,
+        actuals=actuals,
+        low_memory=low_memory,
         start_p=0, start_q=0,
         max_p=3, max_q=3,
         start_P=0, start_Q=0,
-        max_P=2, max_Q=2,
-        suppress_warnings=True,
-        error_action='ignore',
-        stepwise=True
+        max_P=2, max_Q=2
     )
+    model = entry["model"]
     
-    forecast, conf_int = model.predict(n_periods=steps, return_conf_int=True)
     total_usage = float(np.sum(forecast))
     avg_daily = float(np.mean(forecast))
     peak_day = int(np.argmax(forecast)) + 1
-    model_name = f"SARIMA{model.order}x{model.seasonal_order}" if seasonal else f"ARIMA{model.order}"
+    model_name = describe_model(model)
     
     return {
-        "forecast": forecast.tolist(),
-        "lower": conf_int[:, 0].tolist(),
-        "upper": conf_int[:, 1].tolist(),
+        "forecast": forecast,
+        "lower": lower,
+        "upper": upper,
         "total_usage": total_usage,
         "avg_daily_usage": avg_daily,
         "peak_day": peak_day,
         "model_name": model_name,
-        "metrics": get_model_metrics(model)
+        "metrics": get_model_metrics(model),
+        **distribution
     }
 
-def forecast_category_demand(series, steps=30, seasonal=True):
+def forecast_category_demand(series, steps=30, seasonal=True, engine="auto", exog=None, future_exog=None,
+                             entity_id=None, low_memory=False, aggregate=None,
+                             quantiles=None, sample_paths=0, track_as=None, actuals=None):
     """Forecast demand for a product category"""
-    seasonal_period = 7 if len(series) >= 14 else None
-    if not seasonal_period:
-        seasonal = False
-    
-    m_value = int(seasonal_period) if seasonal and seasonal_period else 1
-    
-    model = auto_arima(
+    entry, (forecast, lower, upper), distribution = fit_and_forecast(
         series,
+        steps,
+        exog=exog,
+        future_exog=future_exog,
+        aggregate=aggregate,
+        quantiles=quantiles,
+        sample_paths=sample_paths,
         seasonal=seasonal,
-        m=m_value,
-        suppress_warnings=True,
-        error_action='ignore',
-        stepwise=True
+        engine=engine,
+        entity_id=entity_id,
+        track_as=track_as,
+        actuals=actuals,
+        low_memory=low_memory
     )
+    model = entry["model"]
     
-    forecast, conf_int = model.predict(n_periods=steps, return_conf_int=True)
     trend_direction = "growing" if forecast[-1] > forecast[0] else "declining"
     trend_percentage = ((forecast[-1] - forecast[0]) / forecast[0]) * 100 if forecast[0] != 0 else 0
     total_demand = float(np.sum(forecast))
-    model_name = f"SARIMA{model.order}x{model.seasonal_order}" if seasonal else f"ARIMA{model.order}"
+    model_name = describe_model(model)
     
     return {
-        "forecast": forecast.tolist(),
-        "lower": conf_int[:, 0].tolist(),
-        "upper": conf_int[:, 1].tolist(),
+        "forecast": forecast,
+        "lower": lower,
+        "upper": upper,
         "total_demand": total_demand,
         "trend": {
             "direction": trend_direction,
             "percentage": float(trend_percentage)
         },
         "model_name": model_name,
-        "metrics": get_model_metrics(model)
+        "metrics": get_model_metrics(model),
+        **distribution
     }
 
-def forecast_revenue(series, steps=6, seasonal=True):
-    """Forecast total sales revenue"""
-    seasonal_period = 12 if len(series) >= 24 and seasonal else None
-    if not seasonal_period:
-        seasonal = False
-    
-    m_value = int(seasonal_period) if seasonal and seasonal_period else 1
-    
-    model = auto_arima(
+def forecast_revenue(series, steps=6, seasonal=True, engine="auto", exog=None, future_exog=None, entity_id=None,
+                     low_memory=False, aggregate=None,
+                     quantiles=None, sample_paths=0, track_as=None, actuals=None):
+    """
+    Forecast total sales revenue. steps counts the history's periods, or
+    with aggregate the coarse periods (months for 'MS'), whose totals are
+    returned.
+    """
+    entry, (forecast, lower, upper), distribution = fit_and_forecast(
         series,
+        steps,
+        exog=exog,
+        future_exog=future_exog,
+        aggregate=aggregate,
+        quantiles=quantiles,
+        sample_paths=sample_paths,
+        per_period=True,
         seasonal=seasonal,
-        m=m_value,
+        engine=engine,
+        entity_id=entity_id,
+        track_as=track_as,
+        actuals=actuals,
+        low_memory=low_memory,
         start_p=0, start_q=0,
-        max_p=5, max_q=5,
-        suppress_warnings=True,
-        error_action='ignore',
-        stepwise=True
+        max_p=5, max_q=5
     )
+    model = entry["model"]
     
-    forecast, conf_int = model.predict(n_periods=steps, return_conf_int=True)
     total_revenue = float(np.sum(forecast))
     avg_monthly = float(np.mean(forecast))
     
+    if aggregate is not None:
+        series = aggregation.aggregate(series, aggregate)
     if len(series) >= 2:
         recent_avg = float(series.tail(3).mean())
         forecast_avg = float(forecast.mean())
@@ -252,41 +896,46 @@ def forecast_revenue(series, steps=6, seasonal=True):
         growth_rate = 0.0
     
     trend_direction = "increasing" if forecast[-1] > forecast[0] else "decreasing"
-    model_name = f"SARIMA{model.order}x{model.seasonal_order}" if seasonal else f"ARIMA{model.order}"
+    model_name = describe_model(model)
     
     return {
-        "forecast": forecast.tolist(),
-        "lower": conf_int[:, 0].tolist(),
-        "upper": conf_int[:, 1].tolist(),
+        "forecast": forecast,
+        "lower": lower,
+        "upper": upper,
         "total_revenue": total_revenue,
         "avg_monthly_revenue": avg_monthly,
         "growth_rate": float(growth_rate),
         "trend": trend_direction,
         "model_name": model_name,
-        "metrics": get_model_metrics(model)
+        "metrics": get_model_metrics(model),
+        **distribution
     }
 
-def calculate_reorder_alert(series, current_stock, reorder_point, lead_time_days=3, safety_stock=0.0):
+def calculate_reorder_alert(series, current_stock, reorder_point, lead_time_days=3, safety_stock=0.0, engine="auto",
+                            exog=None, future_exog=None, entity_id=None, low_memory=False, aggregate=None,
+                            track_as=None, actuals=None):
     """Calculate reorder alerts based on forecasted usage"""
     try:
-        seasonal = len(series) >= 14
-        m_value = 7 if seasonal else 1
-        
-        model = auto_arima(
+        entry, (forecast_30, _, _), _ = fit_and_forecast(
             series,
-            seasonal=seasonal,
-            m=m_value,
+            30,
+            exog=exog,
+            future_exog=future_exog,
+            aggregate=aggregate,
+            engine=engine,
+            entity_id=entity_id,
+            low_memory=low_memory,
             start_p=0, start_q=0,
-            max_p=3, max_q=3,
-            suppress_warnings=True,
-            error_action='ignore',
-            stepwise=True
+            max_p=3, max_q=3
         )
-        
-        forecast_30, _ = model.predict(n_periods=30, return_conf_int=True)
-    except:
+        engine_name = engine_label(entry["model"]) + (f"@{aggregate}" if aggregate else "")
+    except Exception:
         avg_usage = series.mean()
         forecast_30 = np.array([avg_usage] * 30)
+        engine_name = "mean"
+    # Outside the fallback: a tracking failure must not turn into a mean forecast
+    if track_as is not None:
+        track_forecast(track_as, engine_name, series, forecast_30, actuals)
     
     cumulative_usage = np.cumsum(forecast_30)
     stock_levels = current_stock - cumulative_usage
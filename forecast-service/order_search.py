@@ -0,0 +1,211 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pmdarima import ARIMA
+from pmdarima.arima import ndiffs, nsdiffs
+import fast_arima
+
+# Candidate fits spend most of their time in Python (the optimizer loop
+# around small lfilter/linalg calls) holding the GIL, so threads add little;
+# parallelism comes from the job workers, one search per process
+SEARCH_WORKERS = int(os.getenv("FORECAST_SEARCH_WORKERS", 1))
+SEARCH_KWARGS = {
+    "start_p", "start_q", "start_P", "start_Q", "max_p", "max_q", "max_P", "max_Q",
+    "d", "D", "max_order", "trace", "random_state"
+}
+MAX_ORDER = 5
+# Orders refitted with statsmodels after the search; the lowest SARIMAX AIC wins
+FINALISTS = 2
+# (p, q, P, Q) moves tried around the current best model, as in the stepwise
+# Hyndman-Khandakar search auto_arima runs
+MOVES = (
+    (1, 0, 0, 0), (-1, 0, 0, 0), (0, 1, 0, 0), (0, -1, 0, 0),
+    (0, 0, 1, 0), (0, 0, -1, 0), (0, 0, 0, 1), (0, 0, 0, -1),
+    (1, 1, 0, 0), (-1, -1, 0, 0), (0, 0, 1, 1), (0, 0, -1, -1)
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Thread pool that evaluates the candidates of one search step, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="order-search")
+        return _pool
+
+def supports(exog=None, m=1, **search_kwargs):
+    """
+    Whether the batched search handles this auto_arima call (no covariates,
+    known arguments). Non-seasonal searches with p or q bounds above
+    fast_arima's limits are left to auto_arima: their selected order mostly
+    reaches the cap, and the batched search would be wasted before the
+    fallback.
+    """
+    if exog is not None or not set(search_kwargs) <= SEARCH_KWARGS:
+        return False
+    max_p_fast, _, max_q_fast = fast_arima.MAX_ORDER
+    return m > 1 or (search_kwargs.get("max_p", 5) <= max_p_fast and search_kwargs.get("max_q", 5) <= max_q_fast)
+
+class DifferencedSeries:
+    """
+    One series differenced once for a (d, D) pair and demeaned when the model
+    carries an intercept, with the Hannan-Rissanen lag matrices shared by
+    every candidate order. Candidates are ARMA models of the differenced
+    series fitted with fast_arima.FastSARIMA.
+    """
+    def __init__(self, y, d, D, m, limits):
+        w = np.asarray(y, dtype=np.float64)
+        for _ in range(D):
+            w = w[m:] - w[:-m]
+        w = np.diff(w, n=d)
+        self.with_intercept = d + D in (0, 1)
+        self.mean = w.mean() if self.with_intercept else 0.0
+        self.w = w - self.mean
+        self.m = m
+        p, q, P, Q = limits
+        self.max_states = max(p + P * m, q + Q * m)
+        self.starts = fast_arima.HannanRissanen(self.w, max(p + q, (P + Q) * m) + m)
+
+    def supports(self, sizes):
+        p, q, P, Q = sizes
+        return fast_arima.supports((p, 0, q), (P, 0, Q, self.m), len(self.w))
+
+    def evaluate(self, sizes, parent=None):
+        """
+        (criterion, fitted FastSARIMA) for a (p, q, P, Q) candidate, searched
+        from its Hannan-Rissanen estimates and from the parent model's fit.
+
+        Diffuse initial states cost each candidate its own number of
+        observations, so the AIC rescales the log-likelihood to the sample
+        size shared by every candidate in the search.
+        """
+        p, q, P, Q = sizes
+        model = fast_arima.FastSARIMA((p, 0, q), (P, 0, Q, self.m))
+        names = model.param_names[:-1]
+        starts = [dict(zip(names, self.starts.coefficients((p, q, P, Q), self.m)))]
+        if parent is not None:
+            starts.append(dict(zip(parent.param_names, parent.params)))
+        try:
+            model.fit(self.w, starts=starts)
+        except (ValueError, np.linalg.LinAlgError):
+            return np.inf, None
+        if not np.isfinite(model.llf):
+            return np.inf, None
+        common = len(self.w) - self.max_states
+        k = len(model.params) + int(self.with_intercept)
+        return -2 * model.llf * common / model.nobs + 2 * k, model
+
+def differencing_orders(y, m, d=None, D=None):
+    """(d, D) chosen with the unit-root tests auto_arima uses by default (OCSB, then KPSS)"""
+    if m <= 1:
+        D = 0
+    elif D is None:
+        D = nsdiffs(y, m=m, test="ocsb", max_D=1)
+    dx = y[D * m:] - y[:-D * m] if D else y
+    if d is None:
+        d = ndiffs(dx, test="kpss", alpha=0.05, max_d=2)
+    return int(d), int(D)
+
+def _clamp(value, limit):
+    return max(0, min(value, limit))
+
+def batched_auto_arima(series, seasonal=True, m=1, start_p=2, start_q=2, start_P=1, start_Q=1,
+                       max_p=5, max_q=5, max_P=2, max_Q=2, d=None, D=None, max_order=MAX_ORDER,
+                       low_memory=False, **ignored):
+    """
+    Stepwise order search with batched candidate evaluation.
+
+    The series is differenced once for the chosen (d, D); every candidate
+    (p, q, P, Q) is then an ARMA fit of that one differenced series by the
+    NumPy likelihood in fast_arima, and all unvisited neighbours of the
+    current best model are evaluated together on the search pool. The
+    FINALISTS best orders are refitted with pmdarima, with and without the
+    intercept, and the lowest AIC wins, so the result is the same ARIMA
+    object auto_arima returns; low_memory is passed to those fits.
+
+    Orders are capped at fast_arima's limits (2, 1, 2)x(2, 1, 2, m). When
+    the requested bounds are wider and the selected order reaches a cap,
+    a higher order may fit better, so None is returned and callers use
+    auto_arima over the full space. None is also returned when the
+    differencing or series length falls outside the limits.
+    """
+    y = np.asarray(series, dtype=np.float64)
+    m = m if seasonal and m > 1 else 1
+    d, D = differencing_orders(y, m, d, D)
+    max_p_fast, max_d_fast, max_q_fast = fast_arima.MAX_ORDER
+    max_P_fast, max_D_fast, max_Q_fast = fast_arima.MAX_SEASONAL_ORDER
+    if d > max_d_fast or D > max_D_fast:
+        return None
+
+    limits = (
+        _clamp(max_p, max_p_fast), _clamp(max_q, max_q_fast),
+        _clamp(max_P, max_P_fast) if m > 1 else 0, _clamp(max_Q, max_Q_fast) if m > 1 else 0
+    )
+    capped = [
+        requested > limit and (m > 1 or i < 2)
+        for i, (requested, limit) in enumerate(zip((max_p, max_q, max_P, max_Q), limits))
+    ]
+    differenced = DifferencedSeries(y, d, D, m, limits)
+
+    def allowed(sizes):
+        return (
+            all(0 <= v <= limit for v, limit in zip(sizes, limits))
+            and sum(sizes) <= (max_order if max_order is not None else np.inf)
+            and differenced.supports(sizes)
+        )
+
+    initial = [
+        tuple(_clamp(v, limit) for v, limit in zip((start_p, start_q, start_P, start_Q), limits)),
+        (0, 0, 0, 0), (1, 0, 1, 0), (0, 1, 0, 1)
+    ]
+    candidates = [sizes for sizes in dict.fromkeys(initial) if allowed(sizes)]
+    visited = set(candidates)
+    scores = {}
+    best_criterion, best_sizes, best_model = np.inf, None, None
+
+    while candidates:
+        results = _map(lambda sizes: differenced.evaluate(sizes, best_model), candidates)
+        scores.update((sizes, criterion) for sizes, (criterion, _) in zip(candidates, results))
+        step = min(range(len(candidates)), key=lambda i: results[i][0])
+        if results[step][0] >= best_criterion:
+            break
+        best_criterion, best_model = results[step]
+        best_sizes = candidates[step]
+        neighbours = (tuple(v + move for v, move in zip(best_sizes, moves)) for moves in MOVES)
+        candidates = [sizes for sizes in dict.fromkeys(neighbours) if sizes not in visited and allowed(sizes)]
+        visited.update(candidates)
+
+    finalists = [sizes for sizes in sorted(scores, key=scores.get) if np.isfinite(scores[sizes])][:FINALISTS]
+    fits = _map(lambda job: _final_fit(y, d, D, m, *job, low_memory=low_memory), [
+        (sizes, with_intercept) for sizes in finalists for with_intercept in dict.fromkeys((differenced.with_intercept, False))
+    ])
+    fits = [fit for fit in fits if fit is not None and np.isfinite(fit.aic())]
+    if not fits:
+        return None
+    best = min(fits, key=lambda fit: fit.aic())
+    (p, _, q), (P, _, Q, _) = best.order, best.seasonal_order
+    if any(cap and v >= limit for cap, v, limit in zip(capped, (p, q, P, Q), limits)):
+        return None
+    return best
+
+def _map(function, items):
+    """Evaluate function over items, on the search pool when it has several workers"""
+    if SEARCH_WORKERS > 1 and len(items) > 1:
+        return list(get_pool().map(function, items))
+    return [function(item) for item in items]
+
+def _final_fit(y, d, D, m, sizes, with_intercept, low_memory=False):
+    """pmdarima ARIMA for one (p, q, P, Q) finalist, or None if statsmodels fails"""
+    p, q, P, Q = sizes
+    try:
+        return ARIMA(
+            order=(p, d, q),
+            seasonal_order=(P, D, Q, m) if m > 1 else (0, 0, 0, 0),
+            with_intercept=with_intercept,
+            suppress_warnings=True
+        ).fit(y, low_memory=low_memory)
+    except (ValueError, np.linalg.LinAlgError):
+        return None
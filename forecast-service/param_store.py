@@ -0,0 +1,145 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+
+PARAM_DB = os.getenv("FORECAST_PARAM_DB", "forecast_params.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS params (
+    entity_id TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    params TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (entity_id, spec)
+);
+CREATE TABLE IF NOT EXISTS selections (
+    entity_id TEXT NOT NULL,
+    search TEXT NOT NULL,
+    model_order TEXT NOT NULL,
+    seasonal_order TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (entity_id, search)
+);
+CREATE TABLE IF NOT EXISTS baselines (
+    entity_id TEXT NOT NULL,
+    search TEXT NOT NULL,
+    trend TEXT,
+    fitted_through TEXT NOT NULL,
+    params TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (entity_id, search)
+);
+"""
+
+# Columns added to existing databases: {column: ALTER statement}
+MIGRATIONS = {
+    "params": "ALTER TABLE baselines ADD COLUMN params TEXT NOT NULL DEFAULT '{}'",
+}
+
+def model_spec(order, seasonal_order, trend=None):
+    """Key identifying a model structure, e.g. '(1, 1, 1)x(0, 1, 1, 7):c'"""
+    return f"{tuple(order)}x{tuple(seasonal_order)}:{trend or 'n'}"
+
+class ParameterStore:
+    """
+    Last fitted parameters per (entity, model specification), the last
+    order auto_arima selected per entity and the drift monitor's baseline
+    for that selection, kept in SQLite so a refresh after a restart can
+    still start from yesterday's estimates.
+    Parameters are stored by name, so models with extra or missing terms
+    (intercept, covariates) reuse whatever overlaps. Only converged fits
+    are kept as warm starts; a baseline holds the parameters the selected
+    model was forecast with, converged or not, and the date it was fitted
+    through.
+    """
+    def __init__(self, path=PARAM_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(baselines)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                self._conn.execute(statement)
+
+    def get(self, entity_id, spec):
+        """Stored {name: value} parameters, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT params FROM params WHERE entity_id = ? AND spec = ?", (entity_id, spec)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, entity_id, spec, names, values):
+        """Store fitted parameters, replacing the previous ones (non-finite values are ignored)"""
+        params = {name: float(value) for name, value in zip(names, np.asarray(values))}
+        if not all(np.isfinite(v) for v in params.values()):
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO params (entity_id, spec, params, updated_at) VALUES (?, ?, ?, ?)",
+                (entity_id, spec, json.dumps(params), time.time())
+            )
+
+    def start_params(self, entity_id, spec, model):
+        """
+        Start vector for an unfitted statsmodels model from stored values,
+        filling names that were not stored with the model's own defaults.
+        Returns None when nothing is stored.
+        """
+        stored = self.get(entity_id, spec)
+        if not stored:
+            return None
+        names = model.param_names
+        if all(name in stored for name in names):
+            return np.array([stored[name] for name in names])
+        defaults = model.start_params
+        return np.array([stored.get(name, default) for name, default in zip(names, defaults)])
+
+    def get_selection(self, entity_id, search):
+        """(order, seasonal_order) last selected for entity under a search key, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT model_order, seasonal_order FROM selections WHERE entity_id = ? AND search = ?",
+                (entity_id, search)
+            ).fetchone()
+        return (tuple(json.loads(row[0])), tuple(json.loads(row[1]))) if row else None
+
+    def put_selection(self, entity_id, search, order, seasonal_order):
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO selections (entity_id, search, model_order, seasonal_order, updated_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (entity_id, search, json.dumps([int(v) for v in order]),
+                 json.dumps([int(v) for v in seasonal_order]), time.time())
+            )
+
+    def get_baseline(self, entity_id, search):
+        """(trend, fitted_through, {name: value} params) of the last full order selection for entity, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT trend, fitted_through, params FROM baselines WHERE entity_id = ? AND search = ?",
+                (entity_id, search)
+            ).fetchone()
+        return (row[0], row[1], json.loads(row[2])) if row else None
+
+    def put_baseline(self, entity_id, search, trend, fitted_through, names, values):
+        """
+        Record the trend, last history date and parameters of a full order
+        selection; drift is measured after that date with those parameters.
+        """
+        params = {name: float(value) for name, value in zip(names, np.asarray(values))}
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO baselines (entity_id, search, trend, fitted_through, params, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (entity_id, search, trend, fitted_through, json.dumps(params), time.time())
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from seasonality import detect_seasonal_period
+
+FILL_METHODS = ("zero", "interpolate", "ffill")
+DUPLICATE_AGGREGATIONS = ("sum", "mean", "last")
+
+MAX_EXPANSION = 10
+
+def infer_frequency(index):
+    """
+    Infer the sampling frequency of a sorted DatetimeIndex.
+
+    Uses pandas' exact inference first. Gappy histories fall back to the
+    largest step that divides every spacing, so missing dates become explicit
+    gaps; monthly dates anchored at month start/end map to MS/ME.
+    """
+    unique = index.unique()
+    if len(unique) >= 3:
+        freq = pd.infer_freq(unique)
+        if freq:
+            return to_offset(freq)
+    if len(unique) < 2:
+        return to_offset("D")
+
+    diffs = np.diff(unique.asi8)
+    step = np.gcd.reduce(diffs)
+    if (unique[-1] - unique[0]).value / step > MAX_EXPANSION * len(unique):
+        step = int(np.median(diffs))
+
+    step = pd.Timedelta(int(step), unit="ns")
+    if pd.Timedelta(days=28) <= step <= pd.Timedelta(days=31):
+        if unique.is_month_start.all():
+            return to_offset("MS")
+        if unique.is_month_end.all():
+            return to_offset("ME")
+    return to_offset(step)
+
+def regularize(df, freq=None, fill_method="zero", duplicates="sum", end_date=None, observed=False):
+    """
+    Put a date-indexed frame (value + covariate columns) on a regular calendar.
+
+    Repeated dates are aggregated, missing periods are inserted and filled by
+    fill_method ('zero', 'interpolate' or 'ffill'); covariates are carried
+    forward. Everything runs as a single pandas resample, no Python loops.
+    Returns (frame, report) where report describes what was changed, and
+    with observed also the aggregated values of the periods that had data.
+    """
+    if fill_method not in FILL_METHODS:
+        raise ValueError(f"Unknown fill_method '{fill_method}', expected one of {FILL_METHODS}")
+    if duplicates not in DUPLICATE_AGGREGATIONS:
+        raise ValueError(f"Unknown duplicates '{duplicates}', expected one of {DUPLICATE_AGGREGATIONS}")
+
+    offset = to_offset(freq) if freq else infer_frequency(df.index)
+    input_points = len(df)
+    duplicates_merged = int(df.index.duplicated().sum())
+
+    if end_date is not None:
+        end = pd.Timestamp(end_date)
+        if end > df.index[-1]:
+            df = pd.concat([df, pd.DataFrame(index=pd.DatetimeIndex([end]), columns=df.columns, dtype=float)])
+
+    resampler = df.resample(offset, origin="start")
+    if duplicates == "sum":
+        values = resampler["value"].sum(min_count=1)
+    else:
+        values = getattr(resampler["value"], duplicates)()
+    missing = values.isna()
+    actuals = values[~missing] if observed else None
+
+    if fill_method == "zero":
+        values = values.fillna(0.0)
+    elif fill_method == "interpolate":
+        values = values.interpolate(method="time").ffill().bfill()
+    else:
+        values = values.ffill().bfill()
+
+    frame = values.to_frame("value")
+    covariates = [c for c in df.columns if c != "value"]
+    if covariates:
+        frame[covariates] = resampler[covariates].last().ffill().bfill()
+
+    report = {
+        "frequency": offset.freqstr,
+        "input_points": input_points,
+        "output_points": len(frame),
+        "duplicates_merged": duplicates_merged,
+        "gaps_filled": int(missing.sum()),
+        "fill_method": fill_method
+    }
+    if observed:
+        return frame, report, actuals
+    return frame, report
+
+MAD_SCALE = 1.4826
+
+def _robust_scale(values):
+    """Scaled median absolute deviation; 0 for series too sparse to judge"""
+    return float(np.median(np.abs(values - np.median(values))) * MAD_SCALE)
+
+def rolling_median(values, window):
+    """
+    Centered rolling median of each point's neighbours (the point itself is
+    excluded), computed on strided window views with padded edges.
+    """
+    half = max(1, window // 2)
+    padded = np.pad(values, half, mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1)
+    return np.median(np.delete(windows, half, axis=1), axis=1)
+
+def winsorize_outliers(values, window=7, threshold=3.5, period=None):
+    """
+    Clip points further than `threshold` robust deviations from the median of their neighbours.
+
+    With a seasonal period the per-phase profile (e.g. the weekday pattern) is
+    removed first, so regular peaks are not mistaken for outliers. Sparse
+    series whose residual MAD is zero are left unchanged.
+    Returns (cleaned values, boolean mask of changed points).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    profile = np.zeros_like(values)
+    if period:
+        phase_medians = np.array([np.median(values[p::period]) for p in range(period)])
+        profile = np.resize(phase_medians - np.median(values), len(values))
+
+    baseline = rolling_median(values - profile, window) + profile
+    scale = _robust_scale(values - baseline)
+    if scale == 0:
+        return values.copy(), np.zeros(len(values), dtype=bool)
+    cleaned = np.clip(values, baseline - threshold * scale, baseline + threshold * scale)
+    return cleaned, cleaned != values
+
+def detect_level_shifts(values, window=7, threshold=3.5):
+    """
+    Positions where the median of the next `window` points differs from the
+    median of the previous `window` points by more than `threshold` robust
+    deviations. Returns a list of (position, shift size).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    scale = _robust_scale(np.diff(values)) / np.sqrt(2) if n > 2 else 0
+    if n < 2 * window or scale == 0:
+        return []
+
+    medians = np.median(np.lib.stride_tricks.sliding_window_view(values, window), axis=1)
+    # shift[i] compares values[i+window:i+2*window] with values[i:i+window]
+    shift = medians[window:] - medians[:-window]
+    strength = np.abs(shift)
+    significant = strength > threshold * scale
+
+    shifts = []
+    for i in np.flatnonzero(significant):
+        lo, hi = max(0, i - window + 1), min(len(strength), i + window)
+        if lo + np.argmax(strength[lo:hi]) == i:
+            shifts.append((int(i + window), float(shift[i])))
+    return shifts
+
+def clean_outliers(df, threshold=3.5, window=7, period=None):
+    """
+    Winsorize outliers in df['value'] and detect level shifts. The seasonal
+    period is detected when not given.
+    Returns (frame, report) listing every changed point and each shift found.
+    """
+    values = df["value"].to_numpy(dtype=np.float64)
+    if period is None:
+        period = detect_seasonal_period(values)
+    cleaned, changed = winsorize_outliers(values, window=window, threshold=threshold, period=period)
+    shifts = detect_level_shifts(values, window=window, threshold=threshold)
+    # Points next to a level shift are the new level, not outliers
+    for position, _ in shifts:
+        changed[max(0, position - window // 2):position + window // 2 + 1] = False
+    cleaned = np.where(changed, cleaned, values)
+
+    frame = df.copy()
+    frame["value"] = cleaned
+    dates = df.index.strftime("%Y-%m-%d")
+    report = {
+        "outliers": [
+            {"date": dates[i], "original": float(values[i]), "cleaned": float(cleaned[i])}
+            for i in np.flatnonzero(changed)
+        ],
+        "level_shifts": [{"date": dates[i], "shift": size} for i, size in shifts]
+    }
+    return frame, report
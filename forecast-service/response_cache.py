@@ -0,0 +1,158 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+
+CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", 300))
+CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", 512))
+
+def etag(body):
+    """Strong ETag of a response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match, tag):
+    """Whether an If-None-Match header lists tag (or is *), compared weakly as RFC 9110 requires"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in if_none_match.split(","))
+
+def sets_any(body, fields):
+    """Whether a JSON object request body sets any of fields to a non-null value"""
+    if not fields or not body:
+        return False
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        return False
+    return isinstance(payload, dict) and any(payload.get(field) is not None for field in fields)
+
+class ResponseCache:
+    """
+    Least recently used {key: (expires, etag, headers, body)} of at most
+    `size` responses; entries expire after the max-age they were put with.
+    """
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1:]
+
+    def put(self, key, max_age, tag, headers, body):
+        self._entries[key] = (time.monotonic() + max_age, tag, headers, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+class ETagMiddleware:
+    """
+    ASGI middleware for the routes in max_age ({path: seconds}).
+
+    Their 200 responses get a strong ETag and `Cache-Control: max-age`, and
+    a request whose If-None-Match lists the ETag is answered 304 without a
+    body. Routes with a max-age above 0 also keep the response for that long,
+    keyed by method, path, query string and request body, so a repeated
+    request is served from the cache without running the endpoint. A request
+    sent with `Cache-Control: no-cache`, or whose body sets one of
+    uncached_fields (its response depends on more than the body, such as a
+    database), is always recomputed and answered with `no-cache`.
+    """
+    def __init__(self, app, max_age, cache=None, uncached_fields=()):
+        self.app = app
+        self.max_age = max_age
+        self.cache = cache if cache is not None else ResponseCache()
+        self.uncached_fields = tuple(uncached_fields)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.max_age:
+            await self.app(scope, receive, send)
+            return
+
+        max_age = self.max_age[scope["path"]]
+        request_headers = Headers(scope=scope)
+        body = await self._read_body(receive)
+        if sets_any(body, self.uncached_fields):
+            max_age = 0
+        key = hashlib.sha256(
+            b"\0".join([scope["method"].encode(), scope["path"].encode(), scope["query_string"], body])
+        ).digest()
+
+        cached = None if "no-cache" in request_headers.get("cache-control", "") else self.cache.get(key)
+        if cached is None:
+            status, headers, response_body = await self._run(scope, body, receive)
+            if status != 200:
+                await self._reply(send, status, headers, response_body)
+                return
+            tag = etag(response_body)
+            headers = MutableHeaders(raw=list(headers))
+            headers["etag"] = tag
+            headers["cache-control"] = f"max-age={max_age}" if max_age > 0 else "no-cache"
+            headers = headers.raw
+            if max_age > 0:
+                self.cache.put(key, max_age, tag, headers, response_body)
+        else:
+            tag, headers, response_body = cached
+
+        if etag_matches(request_headers.get("if-none-match"), tag):
+            not_modified = [(name, value) for name, value in headers if name in (b"etag", b"cache-control")]
+            await self._reply(send, 304, not_modified, b"")
+        else:
+            await self._reply(send, 200, headers, response_body)
+
+    @staticmethod
+    async def _read_body(receive):
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _run(self, scope, body, receive):
+        """(status, raw headers, body) of the wrapped app for a request whose body was already read"""
+        replayed = False
+        start, chunks = {}, []
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, replay, capture)
+        return start["status"], start.get("headers", []), b"".join(chunks)
+
+    @staticmethod
+    async def _reply(send, status, headers, body):
+        headers = MutableHeaders(raw=list(headers))
+        if status == 304:
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            headers["content-length"] = str(len(body))
+        await send({"type": "http.response.start", "status": status, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
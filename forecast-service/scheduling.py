@@ -0,0 +1,71 @@
+import os
+from collections import Counter
+
+def parse_weights(spec):
+    """{tenant: weight} from "business:1=3,business:7=0.5" (FORECAST_TENANT_WEIGHTS)"""
+    weights = {}
+    for item in (spec or "").split(","):
+        if item.strip():
+            tenant, _, weight = item.rpartition("=")
+            weights[tenant.strip()] = float(weight)
+    return weights
+
+TENANT_WEIGHTS = parse_weights(os.getenv("FORECAST_TENANT_WEIGHTS"))
+TENANT_MAX_RUNNING = int(os.getenv("FORECAST_TENANT_MAX_RUNNING", 0)) or None
+# Tenant of jobs whose payload names no business (the queue's column default)
+DEFAULT_TENANT = "default"
+
+def tenant_of(payload, default=DEFAULT_TENANT):
+    """
+    Tenant a job payload is scheduled under: its business (business_id, or
+    source.business_id for database-loaded histories), e.g. business:3, or
+    default. Entities are not tenants: a business with many ingredients or
+    categories would otherwise get a share of the workers for each.
+    """
+    business = payload.get("business_id")
+    if business is None:
+        business = (payload.get("source") or {}).get("business_id")
+    return default if business is None else f"business:{business}"
+
+class FairScheduler:
+    """
+    Weighted fair queuing of jobs across tenants.
+
+    Each tenant has a virtual pass that grows by 1/weight per dispatched
+    job, and the next job comes from the backlogged tenant with the lowest
+    pass. A tenant that (re)joins starts at the lowest pass of the others,
+    so idle time earns no burst credit: a tenant with one job waits for at
+    most one free worker however many jobs a large tenant has queued.
+    Tenants already running max_running jobs are skipped.
+    """
+    def __init__(self, weights=None, max_running=TENANT_MAX_RUNNING):
+        self.weights = TENANT_WEIGHTS if weights is None else weights
+        self.max_running = max_running
+        self.dispatched = Counter()
+        self._pass = {}
+
+    def weight(self, tenant):
+        return self.weights.get(tenant, 1.0)
+
+    def pick(self, depths):
+        """
+        Tenant to dispatch from next given {tenant: {"queued": n, "running": n}},
+        or None when no tenant has a queued job it may start.
+        """
+        active = [tenant for tenant, depth in depths.items() if depth["queued"] or depth["running"]]
+        self._pass = {tenant: value for tenant, value in self._pass.items() if tenant in active}
+        candidates = [
+            tenant for tenant in active
+            if depths[tenant]["queued"] and (self.max_running is None or depths[tenant]["running"] < self.max_running)
+        ]
+        if not candidates:
+            return None
+        floor = min(self._pass.values(), default=0.0)
+        for tenant in candidates:
+            self._pass[tenant] = max(self._pass.get(tenant, floor), floor)
+        return min(candidates, key=lambda tenant: (self._pass[tenant], tenant))
+
+    def charge(self, tenant):
+        """Account one dispatched job to tenant"""
+        self._pass[tenant] = self._pass.get(tenant, 0.0) + 1.0 / self.weight(tenant)
+        self.dispatched[tenant] += 1
@@ -0,0 +1,95 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+MAX_SEASONAL_PERIOD = 52
+MIN_CYCLES = 2
+CACHE_SIZE = 512
+
+_period_cache = OrderedDict()
+_period_cache_lock = threading.Lock()
+
+def series_fingerprint(values):
+    """Stable hash of the series values, used as a cache key"""
+    data = np.ascontiguousarray(values, dtype=np.float64)
+    return hashlib.blake2b(data.tobytes(), digest_size=16).hexdigest()
+
+def _detrend(values):
+    """Remove the linear trend so it does not dominate the low frequencies"""
+    n = len(values)
+    t = np.arange(n, dtype=np.float64)
+    slope, intercept = np.polyfit(t, values, 1)
+    return values - (slope * t + intercept)
+
+def autocorrelation(values, nlags):
+    """Autocorrelation function up to nlags computed via FFT in O(n log n)"""
+    x = np.asarray(values, dtype=np.float64)
+    x = x - x.mean()
+    n = len(x)
+    nfft = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(x, nfft)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), nfft)[:nlags + 1]
+    if acf[0] == 0:
+        return np.zeros(nlags + 1)
+    return acf / acf[0]
+
+def periodogram(values):
+    """Return (periods, power) of the detrended series, strongest first"""
+    x = _detrend(np.asarray(values, dtype=np.float64))
+    power = np.abs(np.fft.rfft(x)) ** 2
+    freqs = np.fft.rfftfreq(len(x))
+    # Skip the zero frequency (mean level)
+    freqs, power = freqs[1:], power[1:]
+    order = np.argsort(power)[::-1]
+    return 1.0 / freqs[order], power[order]
+
+def detect_seasonal_periods(values, max_period=MAX_SEASONAL_PERIOD, top_k=3):
+    """
+    Detect plausible seasonal periods from the periodogram, confirmed by the ACF.
+
+    Candidates come from the strongest periodogram peaks. A candidate is kept
+    only if the series covers at least MIN_CYCLES full cycles and the
+    autocorrelation at that lag is significant and a local peak.
+    Returns a list of periods ordered by ACF strength (may be empty).
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    max_period = min(int(max_period), n // MIN_CYCLES)
+    if n < 2 * MIN_CYCLES or max_period < 2 or np.ptp(x) == 0:
+        return []
+
+    key = (series_fingerprint(x), max_period, top_k)
+    with _period_cache_lock:
+        cached = _period_cache.get(key)
+        if cached is not None:
+            _period_cache.move_to_end(key)
+            return list(cached)
+
+    periods, _ = periodogram(x)
+    acf = autocorrelation(x, min(max_period + 1, n - 1))
+    threshold = 2.0 / np.sqrt(n)
+
+    scores = {}
+    for period in periods[:top_k * 3]:
+        m = int(round(period))
+        if m < 2 or m > max_period or m in scores:
+            continue
+        value = acf[m]
+        is_peak = value >= acf[m - 1] and (m + 1 >= len(acf) or value >= acf[m + 1])
+        if value > threshold and is_peak:
+            scores[m] = float(value)
+
+    result = sorted(scores, key=scores.get, reverse=True)[:top_k]
+
+    with _period_cache_lock:
+        _period_cache[key] = tuple(result)
+        _period_cache.move_to_end(key)
+        while len(_period_cache) > CACHE_SIZE:
+            _period_cache.popitem(last=False)
+    return result
+
+def detect_seasonal_period(values, max_period=MAX_SEASONAL_PERIOD):
+    """Return the single most plausible seasonal period, or None"""
+    periods = detect_seasonal_periods(values, max_period=max_period)
+    return periods[0] if periods else None
@@ -154,6 +154,45 @@ def test_legacy_endpoint():
         print(f"Error: {response.text}")
         return False
 
+def test_async_job():
+    """Test background job submission and polling"""
+    print("\n=== Testing Async Job ===")
+    import time
+    
+    payload = {
+        "kind": "forecast/auto",
+        "payload": {
+            "series": generate_sample_data(periods=24),
+            "steps": 6,
+            "seasonal": True,
+            "seasonal_period": 12
+        }
+    }
+    
+    response = requests.post(f"{BASE_URL}/jobs", json=payload)
+    print(f"Status: {response.status_code}")
+    
+    if response.status_code != 202:
+        print(f"Error: {response.text}")
+        return False
+    
+    job_id = response.json()["job_id"]
+    print(f"Job ID: {job_id}")
+    
+    for _ in range(60):
+        job = requests.get(f"{BASE_URL}/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            break
+        time.sleep(1)
+    
+    print(f"Job Status: {job['status']}")
+    if job["status"] == "done":
+        print(f"Model: {job['result']['model']}")
+        print(f"Forecast: {job['result']['forecast']}")
+        return True
+    print(f"Error: {job['error']}")
+    return False
+
 def run_all_tests():
     """Run all tests"""
     print("=" * 60)
@@ -168,7 +207,8 @@ def run_all_tests():
         "Auto Forecast": test_auto_forecast(),
         "Manual Forecast": test_manual_forecast(),
         "Model Evaluation": test_evaluation(),
-        "Legacy Endpoint": test_legacy_endpoint()
+        "Legacy Endpoint": test_legacy_endpoint(),
+        "Async Job": test_async_job()
     }
     
     print("\n" + "=" * 60)
@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The stores open their SQLite files and directories from these paths, so the
+# tests never touch the service's own databases
+_DATA_DIR = tempfile.mkdtemp(prefix="forecast-tests-")
+for _name, _file in (
+    ("FORECAST_PARAM_DB", "params.db"),
+    ("FORECAST_ACCURACY_DB", "accuracy.db"),
+    ("FORECAST_JOB_DB", "jobs.db"),
+    ("FORECAST_HISTORY_DIR", "histories"),
+    ("FORECAST_IMPORT_DIR", "imports"),
+):
+    os.environ.setdefault(_name, os.path.join(_DATA_DIR, _file))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def daily_series(n, start="2023-01-01", level=100.0, weekly=10.0, noise=3.0, seed=0):
+    """Daily history with a weekly cycle and noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    values = level + weekly * np.sin(2 * np.pi * t / 7) + rng.normal(0, noise, n)
+    return pd.Series(values, index=pd.date_range(start, periods=n, freq="D"))
+
+def points(series):
+    """Request data points of a date-indexed series"""
+    return [{"date": date.strftime("%Y-%m-%d"), "value": float(value)} for date, value in series.items()]
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    import app
+
+    with TestClient(app.app) as client:
+        yield client
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import model
+from conftest import daily_series, points
+
+def test_observed_actuals_skip_filled_gaps():
+    from preprocessing import regularize
+
+    history = daily_series(10)
+    frame = history.drop(history.index[4]).to_frame("value")
+    regular, report, actuals = regularize(frame, observed=True)
+    assert report["gaps_filled"] == 1 and len(regular) == 10
+    assert list(actuals.index) == list(frame.index)
+
+def test_endpoints_are_tracked_separately_against_raw_actuals(client):
+    history = daily_series(120, seed=11)
+    first, later = history[:100], history[100:107].copy()
+    later.iloc[1] = 1000.0
+    for endpoint, extra in (("ingredient-usage", {}), ("reorder-alert", {"current_stock": 500, "reorder_point": 50})):
+        response = client.post(f"/business/{endpoint}", json={
+            "ingredient_id": "acc-1", "usage_history": points(first), "seasonal": False, **extra
+        })
+        assert response.status_code == 200, response.text
+        if endpoint == "ingredient-usage":
+            issued = np.array(response.json()["daily_usage_forecast"])
+
+    # A gap on the first new day and a spike that outlier cleaning clips
+    observed = pd.concat([first, later.drop(later.index[0])])
+    for endpoint, extra in (("ingredient-usage", {}), ("reorder-alert", {"current_stock": 500, "reorder_point": 50})):
+        response = client.post(f"/business/{endpoint}", json={
+            "ingredient_id": "acc-1", "usage_history": points(observed), "seasonal": False,
+            "clean_outliers": True, **extra
+        })
+        assert response.status_code == 200, response.text
+
+    records = {r["entity_id"]: r for r in client.get("/accuracy", params={"entity_id": "ingredient:acc-1"}).json()["accuracy"]}
+    assert set(records) == {"ingredient:acc-1/ingredient-usage", "ingredient:acc-1/reorder-alert"}
+    assert records["ingredient:acc-1/ingredient-usage"]["points"] == 6
+    assert records["ingredient:acc-1/reorder-alert"]["points"] == 6
+    expected_mae = np.mean(np.abs(later.to_numpy()[1:] - issued[1:]))
+    assert records["ingredient:acc-1/ingredient-usage"]["mae"] == pytest.approx(expected_mae)
+
+def test_reorder_tracking_errors_are_not_swallowed(monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("accuracy store unavailable")
+
+    monkeypatch.setattr(model, "track_forecast", fail)
+    with pytest.raises(RuntimeError):
+        model.calculate_reorder_alert(
+            daily_series(60, seed=12), current_stock=100, reorder_point=10, track_as="ingredient:acc-2/reorder-alert"
+        )
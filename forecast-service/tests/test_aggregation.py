@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+import aggregation
+import model
+from conftest import daily_series, points
+
+def test_revenue_with_monthly_aggregation_forecasts_months(client):
+    history = daily_series(400, level=100.0, seed=3)
+    response = client.post("/business/revenue", json={
+        "business_id": "agg-test", "revenue_history": points(history), "steps": 6, "aggregate": "MS"
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    monthly = aggregation.aggregate(history, "MS")
+    assert len(body["revenue_forecast"]) == 6
+    assert len(body["confidence_interval"]["lower"]) == 6
+    # Six months of about 100 a day, not six days
+    assert body["total_forecasted_revenue"] == pytest.approx(6 * monthly.mean(), rel=0.15)
+    assert body["average_monthly_revenue"] == pytest.approx(monthly.mean(), rel=0.15)
+
+def test_daily_aggregated_forecast_covers_steps_days():
+    history = daily_series(400, level=100.0, seed=4)
+    _, (forecast, lower, upper), _ = model.fit_and_forecast(history, 45, aggregate="W")
+    assert len(forecast) == len(lower) == len(upper) == 45
+    assert forecast.sum() == pytest.approx(45 * 100.0, rel=0.15)
+    assert np.all(lower <= forecast) and np.all(forecast <= upper)
@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+import pytest
+
+import bulk_import
+import history_store
+
+def test_rows_without_entity_date_or_value_are_dropped():
+    codes = np.array([1, -1, 0, 1, 0, 0])
+    dates = np.array(["2024-01-02", "2024-01-01", "2024-01-03", "NaT", "2024-01-01", "2024-01-02"],
+                     dtype="datetime64[ns]")
+    values = np.array([5.0, 1.0, 3.0, 2.0, np.nan, 4.0])
+    keep = bulk_import.valid_rows(codes, dates, values)
+    assert keep.tolist() == [True, False, True, False, False, True]
+    parts = bulk_import.split_series(codes[keep], dates[keep], values[keep])
+    assert sorted(parts) == [0, 1]
+    assert parts[0][1].tolist() == [4.0, 3.0]
+    assert parts[1][1].tolist() == [5.0]
+
+def test_import_skips_null_entity_ids():
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    root = os.environ["FORECAST_IMPORT_DIR"]
+    os.makedirs(root, exist_ok=True)
+    table = pa.table({
+        "entity_id": ["a", None, "b", "a"],
+        "date": pa.array(np.array(["2024-01-01", "2024-01-01", "2024-01-01", "2024-01-02"], dtype="datetime64[ms]")),
+        "value": [1.0, 9.0, 2.0, 3.0],
+    })
+    pq.write_table(table, os.path.join(root, "nulls.parquet"))
+    payloads, rows = bulk_import.import_payloads("nulls.parquet", "forecast/auto", {"steps": 3})
+    assert rows == 4
+    assert sorted(payloads) == ["a", "b"]
+    stored = payloads["a"]["stored_history"]
+    _, values = history_store.read_series(stored["store"], stored["offset"], stored["length"])
+    assert list(values) == [1.0, 3.0]
@@ -0,0 +1,85 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from compression import CompressionMiddleware, response_encoding
+from response_cache import ETagMiddleware
+
+BIG = {"values": list(range(500))}
+
+@pytest.fixture
+def client():
+    async def echo(request):
+        return JSONResponse({"size": len(await request.body()), "body": (await request.json())})
+
+    async def big(request):
+        return JSONResponse(BIG)
+
+    async def small(request):
+        return JSONResponse({"status": "ok"})
+
+    app = Starlette(routes=[
+        Route("/echo", echo, methods=["POST"]),
+        Route("/big", big, methods=["POST"]),
+        Route("/small", small)
+    ])
+    app.add_middleware(ETagMiddleware, max_age={"/big": 60})
+    app.add_middleware(CompressionMiddleware, min_size=1024, max_body=4096)
+    with TestClient(app) as client:
+        yield client
+
+def post_encoded(client, body, encoding):
+    return client.post("/echo", content=body, headers={"Content-Encoding": encoding, "Content-Type": "application/json"})
+
+def test_gzip_request_bodies_are_decoded(client):
+    response = post_encoded(client, gzip.compress(b'{"steps": 3}'), "gzip")
+    assert response.status_code == 200
+    assert response.json() == {"size": 12, "body": {"steps": 3}}
+
+def test_zstd_request_bodies_are_decoded(client):
+    zstandard = pytest.importorskip("zstandard")
+    response = post_encoded(client, zstandard.ZstdCompressor().compress(b'{"steps": 3}'), "zstd")
+    assert response.json() == {"size": 12, "body": {"steps": 3}}
+
+def test_oversized_malformed_and_unknown_bodies_are_refused(client):
+    assert post_encoded(client, gzip.compress(b"0" * 8192), "gzip").status_code == 413
+    assert post_encoded(client, b"not gzip", "gzip").status_code == 400
+    assert post_encoded(client, gzip.compress(b'{"steps": 3}')[:-4], "gzip").status_code == 400
+    assert post_encoded(client, b"{}", "br").status_code == 415
+
+def test_only_responses_above_min_size_are_compressed(client):
+    big = client.post("/big", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip"
+    assert big.json() == BIG
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert "accept-encoding" in small.headers["vary"].lower()
+    plain = client.post("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+def test_compressed_etag_round_trips_through_if_none_match(client):
+    first = client.post("/big", headers={"Accept-Encoding": "gzip"})
+    assert "accept-encoding" in first.headers["vary"].lower()
+    tag = first.headers["etag"]
+    assert tag.endswith('-gzip"')
+    again = client.post("/big", headers={"Accept-Encoding": "gzip", "If-None-Match": tag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == tag
+    plain = client.post("/big", headers={"Accept-Encoding": "identity"})
+    assert plain.headers["etag"] == tag.replace("-gzip", "")
+
+def test_response_encoding_follows_q_values():
+    assert response_encoding("gzip") == "gzip"
+    assert response_encoding("gzip;q=0") is None
+    assert response_encoding("*, gzip;q=0, zstd;q=0") is None
+    assert response_encoding("deflate, gzip;q=0.5") == "gzip"
+    assert response_encoding("br") is None
+
+def test_zstd_is_preferred_only_at_an_equal_or_higher_q():
+    pytest.importorskip("zstandard")
+    assert response_encoding("gzip, zstd") == "zstd"
+    assert response_encoding("zstd;q=0.5, gzip") == "gzip"
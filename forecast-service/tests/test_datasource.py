@@ -0,0 +1,28 @@
+import sqlite3
+from datetime import date
+
+import numpy as np
+
+import datasource
+
+def test_history_is_bounded_by_until(tmp_path):
+    path = str(tmp_path / "source.db")
+    source = datasource.SQLiteSource(path, size=1)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO business_user_position_table VALUES (1, 7)")
+    conn.executemany("INSERT INTO purchases_table VALUES (?, 1, ?, ?, ?)", [
+        (1, "2024-02-28 09:00:00", 10.0, 1),
+        (2, "2024-03-01 08:00:00", 20.0, 1),
+        (3, "2024-03-01 23:30:00", 5.0, 1),
+        (4, "2024-03-01 12:00:00", 99.0, 3),  # cancelled
+        (5, "2024-03-02 00:00:00", 40.0, 1),  # after until
+        (6, "2024-01-15 12:00:00", 80.0, 1),  # before the window
+    ])
+    conn.commit()
+    conn.close()
+    try:
+        dates, values = source.history("daily_revenue", days=30, until=date(2024, 3, 1), business_id=7)
+        assert dates.tolist() == [date(2024, 2, 28), date(2024, 3, 1)]
+        np.testing.assert_array_equal(values, [10.0, 25.0])
+    finally:
+        source.close()
@@ -0,0 +1,34 @@
+import numpy as np
+from scipy.stats import norm
+
+import model
+from conftest import daily_series
+
+def manual_fit(seed=21):
+    return model.cached_fit(daily_series(120, seed=seed), fit=model.fit_manual_model, order=(1, 0, 1))
+
+def test_quantile_rows_are_the_normal_bands():
+    entry = manual_fit()
+    quantiles = [0.05, 0.5, 0.9]
+    rows, paths = model.forecast_distribution(entry, 14, quantiles=quantiles)
+    assert paths is None
+    assert rows.shape == (3, 14)
+    mean, lower, upper = model.forecast_from(entry, 14, confidence_level=0.8)
+    se = (upper - lower) / (2 * norm.ppf(0.9))
+    for q, row in zip(quantiles, rows):
+        np.testing.assert_allclose(row, mean + norm.ppf(q) * se)
+    np.testing.assert_allclose(rows[1], mean)
+    assert (np.diff(rows, axis=0) > 0).all()
+
+def test_sample_paths_have_one_row_per_path():
+    entry = manual_fit(seed=22)
+    rows, paths = model.forecast_distribution(entry, 10, n_paths=500)
+    assert rows is None
+    assert paths.shape == (500, 10)
+    mean, lower, upper = model.forecast_from(entry, 10)
+    se = (upper - lower) / (2 * norm.ppf(0.975))
+    # Shocks carry through later steps, so each step has the forecast's spread
+    np.testing.assert_allclose(paths.std(axis=0), se, rtol=0.1)
+    assert (np.abs(paths.mean(axis=0) - mean) < 4 * se / np.sqrt(500)).all()
+    again = model.forecast_distribution(entry, 10, n_paths=500)[1]
+    np.testing.assert_array_equal(paths, again)
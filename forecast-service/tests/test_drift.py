@@ -0,0 +1,60 @@
+import sqlite3
+
+import numpy as np
+import pytest
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+import model
+from conftest import daily_series
+from param_store import ParameterStore, model_spec
+
+def test_non_converged_fit_is_a_baseline_but_no_warm_start():
+    series = daily_series(120, seed=21)
+    results = SARIMAX(series.to_numpy(), order=(1, 0, 1), trend="c").fit(disp=False, maxiter=1)
+    assert not results.mle_retvals["converged"]
+    store = ParameterStore(":memory:")
+    store.put_baseline("entity:d1", "sarima:m=1", "c", "2023-04-30", results.model.param_names, results.params)
+
+    model.remember_fit("entity:d1", results)
+    assert model.get_parameter_store().get("entity:d1", model_spec((1, 0, 1), (0, 0, 0, 0), "c")) is None
+    trend, fitted_through, params = store.get_baseline("entity:d1", "sarima:m=1")
+    assert (trend, fitted_through) == ("c", "2023-04-30")
+    assert list(params) == results.model.param_names
+    assert list(params.values()) == pytest.approx(list(results.params))
+
+def test_baselines_without_params_are_migrated(tmp_path):
+    path = str(tmp_path / "params.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE baselines (entity_id TEXT NOT NULL, search TEXT NOT NULL, trend TEXT, "
+        "fitted_through TEXT NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (entity_id, search))"
+    )
+    conn.execute("INSERT INTO baselines VALUES ('entity:d2', 'sarima:m=7', NULL, '2023-01-31', 0)")
+    conn.commit()
+    conn.close()
+    store = ParameterStore(path)
+    assert store.get_baseline("entity:d2", "sarima:m=7") == (None, "2023-01-31", {})
+    store.close()
+
+def test_stable_refit_maps_stored_parameters_by_name(monkeypatch):
+    series = daily_series(120, seed=22)
+    order, seasonal_order = (1, 0, 1), (0, 0, 0, 0)
+    names = SARIMAX(series.to_numpy(), order=order, trend="c").param_names
+    values = {"intercept": 50.0, "ar.L1": 0.5, "ma.L1": -0.2, "sigma2": 9.0}
+    # Stored in another order than the model's parameter names
+    model.get_parameter_store().put("entity:d3", model_spec(order, seasonal_order, "c"), list(values)[::-1],
+                                    list(values.values())[::-1])
+    monkeypatch.setattr(model.drift, "check", lambda *args, **kwargs: {
+        "status": "stable", "order": order, "seasonal_order": seasonal_order, "trend": "c"
+    })
+    passed = {}
+    real_arima = model.ARIMA
+
+    def arima(**kwargs):
+        passed.update(kwargs)
+        return real_arima(**kwargs)
+
+    monkeypatch.setattr(model, "ARIMA", arima)
+    fitted = model.refit_if_stable(series, "entity:d3", "sarima:m=1")
+    assert fitted is not None and fitted.order == order
+    assert np.array_equal(passed["start_params"], [values[name] for name in names])
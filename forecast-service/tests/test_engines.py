@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+import model
+from conftest import daily_series
+
+def monthly_series(n):
+    rng = np.random.default_rng(0)
+    values = 100 + 10 * np.sin(2 * np.pi * np.arange(n) / 12) + rng.normal(0, 1, n)
+    return pd.Series(values, index=pd.date_range("1900-01-01", periods=n, freq="MS"))
+
+def test_auto_uses_fourier_for_long_daily_histories():
+    series = daily_series(800)
+    assert model.select_engine(series) == "fourier"
+    assert model.fourier_periods(series) == (7, 365.25)
+    assert model.fourier_periods(series, 30) == (7, 30, 365.25)
+
+def test_auto_keeps_sarima_for_long_non_daily_histories():
+    monthly = monthly_series(800)
+    assert model.select_engine(monthly) == "sarima"
+    assert model.select_engine(monthly, seasonal_period=12) == "sarima"
+    hourly = pd.Series(np.ones(800), index=pd.date_range("2024-01-01", periods=800, freq="h"))
+    assert model.select_engine(hourly) == "sarima"
+    assert model.select_engine(np.ones(800)) == "sarima"
+
+def test_non_daily_fourier_uses_only_the_explicit_period():
+    monthly = monthly_series(800)
+    assert model.fourier_periods(monthly) == ()
+    assert model.fourier_periods(monthly, 12) == (12,)
+    assert model.select_engine(monthly, seasonal_period=120) == "fourier"
+
+def test_explicit_period_reaches_the_monthly_fit():
+    fitted = model.fit_auto_model(monthly_series(60), seasonal_period=12, batched_search=False, start_p=0, start_q=0,
+                                  max_p=1, max_q=1, max_P=1, max_Q=1)
+    assert fitted.seasonal_order[3] == 12
@@ -0,0 +1,45 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exogenous import build_exog, easter_date, holiday_calendar
+
+def test_holy_week_follows_easter():
+    assert easter_date(2024) == datetime.date(2024, 3, 31)
+    calendar = holiday_calendar("2024-03-27", 5)
+    # Columns: holiday, holiday_eve, payday (27 Mar to 31 Mar)
+    assert calendar[:, 0].tolist() == [0, 1, 1, 1, 0]
+    assert calendar[:, 1].tolist() == [1, 1, 1, 0, 0]
+    assert calendar[:, 2].tolist() == [0, 0, 0, 0, 1]
+
+def test_calendar_flags_cover_the_history_and_the_horizon():
+    index = pd.date_range("2024-12-10", periods=20, freq="D")
+    X, X_future = build_exog(pd.DataFrame(index=index), holidays=True, steps=5)
+    assert X.shape == (20, 3) and X_future.shape == (5, 3)
+    flags = pd.DataFrame(np.vstack([X, X_future]), columns=["holiday", "holiday_eve", "payday"],
+                         index=pd.date_range("2024-12-10", periods=25, freq="D"))
+    assert flags.loc["2024-12-25", "holiday"] == 1
+    assert flags.loc["2024-12-23", "holiday_eve"] == 1
+    assert flags.loc["2025-01-01", "holiday"] == 1
+    assert flags.loc["2025-01-02", "holiday"] == 0
+    assert flags.loc["2024-12-31", "payday"] == 1
+    assert flags["payday"].sum() == 2
+
+def test_calendar_columns_constant_over_the_history_are_dropped():
+    # No 15th or month end from 20 to 29 Dec, so payday cannot be estimated
+    index = pd.date_range("2024-12-20", periods=10, freq="D")
+    X, X_future = build_exog(pd.DataFrame(index=index), holidays=True, steps=5)
+    assert X.shape == (10, 2) and X_future.shape == (5, 2)
+
+def test_covariates_need_a_future_row_per_step():
+    index = pd.date_range("2024-01-01", periods=6, freq="D")
+    covariates = pd.DataFrame({"price": [1.0, 2.0, 1.5, 1.0, 2.5, 3.0]}, index=index)
+    X, X_future = build_exog(covariates, future_exog=[{"price": 2.0}, {"price": 1.0}], steps=2)
+    assert X.shape == (6, 1)
+    assert X_future.tolist() == [[2.0], [1.0]]
+    with pytest.raises(ValueError, match="3 rows"):
+        build_exog(covariates, future_exog=[{"price": 2.0}, {"price": 1.0}], steps=3)
+    with pytest.raises(ValueError, match="missing values"):
+        build_exog(covariates, future_exog=[{"cost": 2.0}], steps=1)
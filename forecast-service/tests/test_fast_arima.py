@@ -0,0 +1,84 @@
+import warnings
+
+import numpy as np
+import pytest
+from statsmodels.tsa.arima_process import arma_generate_sample
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+import fast_arima
+import model
+
+# Forecast means within MEAN_TOLERANCE standard errors of SARIMAX's and
+# standard errors within SE_TOLERANCE of its, over SEEDS simulated series
+MEAN_TOLERANCE = 0.15
+SE_TOLERANCE = 1.10
+SEEDS = range(6)
+STEPS = 12
+
+def simulate(order, seasonal_order, n, seed):
+    rng = np.random.default_rng(seed)
+    p, d, q = order
+    _, D, _, m = seasonal_order
+    ar = np.r_[1, -0.4 * rng.uniform(0.5, 1, p)]
+    ma = np.r_[1, 0.3 * rng.uniform(0.5, 1, q)]
+    x = arma_generate_sample(ar, ma, n + 200, distrvs=rng.standard_normal)[200:]
+    if m > 1:
+        x = x + 3 * np.sin(2 * np.pi * np.arange(n) / m)
+    for _ in range(d):
+        x = np.cumsum(x)
+    return 50 + x
+
+def statsmodels_fit(y, order, seasonal_order):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return SARIMAX(
+            y, order=order, seasonal_order=seasonal_order, enforce_stationarity=False, enforce_invertibility=False
+        ).fit(disp=False)
+
+@pytest.mark.parametrize("n", [170, 300])
+@pytest.mark.parametrize("order,seasonal_order", [
+    ((0, 1, 1), (0, 0, 0, 0)),
+    ((1, 1, 0), (0, 0, 0, 0)),
+    ((1, 1, 1), (0, 0, 0, 0)),
+    ((0, 1, 1), (0, 1, 1, 7)),
+    ((1, 0, 0), (0, 1, 1, 7)),
+    ((1, 1, 1), (1, 1, 1, 7)),
+])
+def test_fast_path_matches_statsmodels(order, seasonal_order, n):
+    assert fast_arima.fast_path_applies(order, seasonal_order, n)
+    for seed in SEEDS:
+        y = simulate(order, seasonal_order, n, seed)
+        fast = fast_arima.FastSARIMA(order, seasonal_order).fit(y)
+        if not fast.converged:
+            # fit_manual_model refits these with SARIMAX
+            continue
+        forecast = statsmodels_fit(y, order, seasonal_order).get_forecast(STEPS)
+        sm_mean, sm_se = np.asarray(forecast.predicted_mean), np.sqrt(np.asarray(forecast.var_pred_mean))
+        mean, se = fast.forecast_moments(STEPS)
+        assert np.max(np.abs(mean - sm_mean) / sm_se) <= MEAN_TOLERANCE, seed
+        assert np.max(np.maximum(se / sm_se, sm_se / se)) <= SE_TOLERANCE, seed
+
+@pytest.mark.parametrize("order,seasonal_order,n", [
+    ((1, 0, 1), (0, 0, 0, 0), 300),   # not differenced
+    ((0, 0, 2), (0, 0, 0, 0), 300),
+    ((2, 1, 2), (0, 0, 0, 0), 300),   # too many non-seasonal coefficients
+    ((2, 1, 2), (1, 1, 1, 7), 300),   # too many seasonal coefficients
+    ((0, 1, 1), (0, 0, 0, 0), 120),   # too short
+])
+def test_orders_outside_the_fast_path_use_statsmodels(order, seasonal_order, n):
+    assert not fast_arima.fast_path_applies(order, seasonal_order, n)
+    fitted = model.fit_manual_model(simulate(order, seasonal_order, n, 0), order, seasonal_order)
+    assert not isinstance(fitted, fast_arima.FastSARIMA)
+
+def test_information_criteria_follow_statsmodels():
+    order, seasonal_order = (1, 1, 1), (0, 1, 1, 7)
+    y = simulate(order, seasonal_order, 200, 1)
+    fast = fast_arima.FastSARIMA(order, seasonal_order).fit(y)
+    at_fast_params = SARIMAX(
+        y, order=order, seasonal_order=seasonal_order, enforce_stationarity=False, enforce_invertibility=False
+    ).filter(fast.params)
+    assert fast.aic() == pytest.approx(at_fast_params.aic)
+    assert fast.bic() == pytest.approx(at_fast_params.bic)
+    assert fast.aicc() == pytest.approx(at_fast_params.aicc)
+    # Both optimize nearly the same likelihood, so the criteria are close to SARIMAX's own fit
+    assert fast.aic() == pytest.approx(statsmodels_fit(y, order, seasonal_order).aic, abs=2.0)
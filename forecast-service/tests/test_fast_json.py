@@ -0,0 +1,70 @@
+import numpy as np
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import fast_json
+from fast_json import NumpyRoute
+
+@pytest.fixture
+def numpy_client():
+    api = FastAPI()
+    api.router.route_class = NumpyRoute
+    matrix = np.arange(12, dtype=np.float64).reshape(3, 4)
+
+    @api.get("/arrays")
+    def arrays():
+        return {
+            "column": matrix[:, 1],
+            "reversed": matrix[0, ::-1],
+            "float32": np.array([0.5, 1.25], dtype=np.float32),
+            "missing": np.array([1.0, np.nan, np.inf, -np.inf]),
+            "scalar": np.float32(2.5),
+            "count": np.int64(7),
+        }
+
+    @api.get("/scalar")
+    async def scalar():
+        return {"value": np.float64(np.nan)}
+
+    with TestClient(api) as client:
+        yield client
+
+def test_arrays_of_any_layout_and_dtype_are_serialized(numpy_client):
+    body = numpy_client.get("/arrays").json()
+    assert body["column"] == [1.0, 5.0, 9.0]
+    assert body["reversed"] == [3.0, 2.0, 1.0, 0.0]
+    assert body["float32"] == [0.5, 1.25]
+    assert body["scalar"] == 2.5
+    assert body["count"] == 7
+
+def test_nan_and_infinity_become_null(numpy_client):
+    assert numpy_client.get("/arrays").json()["missing"] == [1.0, None, None, None]
+    assert numpy_client.get("/scalar").json() == {"value": None}
+
+def test_non_contiguous_nan_becomes_null():
+    values = np.array([[np.nan, 1.0], [2.0, np.nan]])[:, 0]
+    assert not values.flags["C_CONTIGUOUS"]
+    assert orjson.loads(fast_json.dumps({"values": values})) == {"values": [None, 2.0]}
+
+def test_route_status_code_is_kept():
+    api = FastAPI()
+    api.router.route_class = NumpyRoute
+
+    @api.post("/accepted", status_code=202)
+    def accepted():
+        return {"values": np.zeros(2)}
+
+    with TestClient(api) as client:
+        response = client.post("/accepted")
+    assert response.status_code == 202
+    assert response.json() == {"values": [0.0, 0.0]}
+
+def test_job_submission_returns_202(client):
+    response = client.post("/jobs", json={
+        "kind": "forecast/auto",
+        "payload": {"series": [{"date": f"2024-01-{day:02d}", "value": float(day)} for day in range(1, 29)], "steps": 3}
+    })
+    assert response.status_code == 202, response.text
+    assert response.json()["job_id"]
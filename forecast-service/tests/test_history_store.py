@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import history_store
+from job_queue import DurableQueue
+
+def parts(n=5):
+    dates = np.datetime64("2024-01-01") + np.arange(n)
+    return {"a": (dates, np.arange(n, dtype=float)), "b": (dates[:2], np.array([7.0, 8.0]))}
+
+def age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+def test_concurrent_writers_of_one_store(tmp_path):
+    root = str(tmp_path)
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def write():
+        barrier.wait()
+        try:
+            history_store.write_store("same", parts(), root=root)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert not [name for name in os.listdir(root) if name.endswith(".tmp")]
+    _, values = history_store.read_series("same", 5, 2, root=root)
+    assert list(values) == [7.0, 8.0]
+
+def test_store_without_index_is_not_opened(tmp_path):
+    root = str(tmp_path)
+    history_store.write_store("partial", parts(), root=root)
+    os.remove(os.path.join(root, "partial.index.json"))
+    with pytest.raises(ValueError):
+        history_store.open_store("partial", root=root)
+
+def test_purge_removes_old_unreferenced_stores(tmp_path):
+    root = str(tmp_path)
+    for name in ("old", "referenced", "fresh"):
+        history_store.write_store(name, parts(), root=root)
+    for name in ("old", "referenced"):
+        age(os.path.join(root, f"{name}.index.json"), 3600)
+    stray = os.path.join(root, "dead.values.npy.0123.tmp")
+    open(stray, "wb").close()
+    age(stray, 2 * history_store.TEMP_MAX_AGE)
+
+    assert history_store.purge(max_age=60, keep={"referenced"}, root=root) == ["old"]
+    assert sorted(os.listdir(root)) == sorted(
+        f"{name}.{kind}" for name in ("referenced", "fresh") for kind in ("values.npy", "dates.npy", "index.json")
+    )
+
+def test_queue_lists_stores_of_pending_jobs(tmp_path):
+    queue = DurableQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue("forecast/auto", {"entity_id": "a", "stored_history": {"store": "import-1", "offset": 0, "length": 3}}, 60)
+    queue.enqueue("forecast/auto", {"entity_id": "b"}, 60)
+    assert queue.stored_histories() == {"import-1"}
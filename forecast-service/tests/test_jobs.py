@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from pydantic import BaseModel
+
+import jobs
+from job_queue import DurableQueue
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Echo(BaseModel):
+    value: int
+
+def echo(request):
+    return {"value": request.value}
+
+def claim_one(queue):
+    queue.enqueue("echo", {"value": 1}, ttl=60)
+    (job_id, _, _), = queue.claim(1)
+    return job_id
+
+def test_recover_requeues_jobs_of_an_earlier_boot_with_the_same_pid(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    job_id = claim_one(DurableQueue(path, boot_id="before-restart"))
+    # Same PID (e.g. PID 1 in a restarted container), new boot id
+    restarted = DurableQueue(path, boot_id="after-restart")
+    assert restarted.recover() == 1
+    assert restarted.get(job_id)["status"] == "queued"
+
+def test_recover_keeps_jobs_of_this_process(tmp_path):
+    queue = DurableQueue(str(tmp_path / "jobs.db"))
+    job_id = claim_one(queue)
+    assert queue.recover() == 0
+    assert queue.get(job_id)["status"] == "running"
+
+def test_job_store_runs_a_job(tmp_path):
+    store = jobs.JobStore({"echo": (Echo, echo)}, path=str(tmp_path / "jobs.db"))
+    try:
+        job_id = store.submit("echo", Echo(value=3), tenant="business:1")
+        deadline = time.time() + 60
+        while store.get(job_id)["status"] not in ("done", "failed") and time.time() < deadline:
+            time.sleep(0.1)
+        job = store.get(job_id)
+        assert job["status"] == "done", job["error"]
+        assert job["result"] == {"value": 3}
+        assert store._inflight == {}
+    finally:
+        store.stop()
+        jobs.shutdown_pool()
+
+def test_importing_the_app_creates_no_databases(tmp_path):
+    env = {name: value for name, value in os.environ.items() if not name.startswith("FORECAST_")}
+    env["PYTHONPATH"] = SERVICE_DIR
+    subprocess.run([sys.executable, "-c", "import app"], cwd=tmp_path, env=env, check=True)
+    assert list(tmp_path.iterdir()) == []
+
+def test_submit_many_queues_all_or_none(tmp_path):
+    store = jobs.JobStore({"echo": (Echo, echo)}, path=str(tmp_path / "jobs.db"), max_jobs=2, max_import_jobs=3)
+    store.start = lambda: None  # keep the jobs queued
+    job_ids = store.submit_many("echo", [Echo(value=1), Echo(value=2), Echo(value=3)], tenant="import:a")
+    assert len(set(job_ids)) == 3
+    assert store.queue.tenant_depths()["import:a"]["queued"] == 3
+    with pytest.raises(jobs.JobStoreFull):
+        store.submit_many("echo", [Echo(value=4)])
+    assert store.queue.pending() == 3
+
+def test_jobs_without_a_business_use_the_default_tenant(tmp_path):
+    store = jobs.JobStore({"echo": (Echo, echo)}, path=str(tmp_path / "jobs.db"))
+    store.start = lambda: None
+    store.submit("echo", Echo(value=1))
+    store.submit_many("echo", [Echo(value=2), Echo(value=3)])
+    assert store.queue.tenant_depths()["default"]["queued"] == 3
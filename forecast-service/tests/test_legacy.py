@@ -0,0 +1,26 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from conftest import points
+
+def monthly_series(n=48, seed=5):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    values = 200 + 2 * t + 20 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 4, n)
+    return pd.Series(values, index=pd.date_range("2020-01-01", periods=n, freq="MS"))
+
+def test_legacy_forecast_keeps_its_response_shape(client):
+    response = client.post("/forecast", json={"series": points(monthly_series()), "steps": 4})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert set(body) == {"model", "forecast", "confidence"}
+    assert set(body["confidence"]) == {"lower", "upper"}
+    assert re.fullmatch(r"SARIMA\(\d+, \d+, \d+\)\(\d+, \d+, \d+, (12|0)\)", body["model"])
+    assert len(body["forecast"]) == len(body["confidence"]["lower"]) == len(body["confidence"]["upper"]) == 4
+    assert all(lo <= f <= hi for lo, f, hi in zip(body["confidence"]["lower"], body["forecast"], body["confidence"]["upper"]))
+
+def test_legacy_forecast_rejects_malformed_payloads(client):
+    assert client.post("/forecast", json={"steps": 4}).status_code == 400
+    assert client.post("/forecast", json={"series": [{"date": "2024-01-01"}]}).status_code == 400
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from low_memory import compact_frame, track_peak_memory
+from conftest import daily_series
+
+def test_float32_when_rounding_is_negligible():
+    df = daily_series(200).to_frame("value")
+    frame, report = compact_frame(df)
+    assert frame["value"].dtype == np.float32
+    assert report == {"history_points": 200, "dtype": "float32"}
+    assert frame["value"].to_numpy().flags["C_CONTIGUOUS"]
+
+def test_float64_when_float32_would_round_too_much():
+    # Large level, tiny spread: float32 loses the variation
+    df = (1e9 + daily_series(200, level=0.0, weekly=0.01, noise=0.001)).to_frame("value")
+    frame, report = compact_frame(df)
+    assert frame["value"].dtype == np.float64
+    assert report["dtype"] == "float64"
+    assert compact_frame(daily_series(10).to_frame("value"), float32=False)[1]["dtype"] == "float64"
+
+def test_history_is_trimmed_and_covariates_kept():
+    df = daily_series(100).to_frame("value")
+    df["price"] = np.arange(100, dtype=np.int64)
+    frame, report = compact_frame(df, max_history=30)
+    assert report["history_points"] == 30
+    assert frame.index[0] == pd.Timestamp("2023-03-12")
+    assert frame["price"].tolist() == list(range(70, 100))
+    assert frame["price"].dtype == np.int64
+
+def test_peak_memory_of_a_block_running_alone():
+    with track_peak_memory() as usage:
+        block = np.ones(1_000_000)
+        del block
+    assert usage["peak_bytes"] >= 8_000_000
+
+def test_overlapping_blocks_report_no_peak():
+    with track_peak_memory() as outer:
+        with track_peak_memory() as inner:
+            pass
+    assert outer["peak_bytes"] is None
+    assert inner["peak_bytes"] is None
+    with track_peak_memory() as alone:
+        pass
+    assert alone["peak_bytes"] is not None
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import model
+from conftest import daily_series
+
+def test_concurrent_requests_share_one_fit():
+    calls = []
+
+    def slow_fit(series, exog=None, **kwargs):
+        calls.append(1)
+        time.sleep(0.2)
+        return {"weights": np.zeros(10)}
+
+    series = daily_series(50, seed=11)
+    entries = []
+    threads = [threading.Thread(target=lambda: entries.append(model.cached_fit(series, fit=slow_fit)))
+               for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(entry is entries[0] for entry in entries)
+    assert model.model_cache._fitting == {}
+
+def test_cache_is_bounded_by_bytes():
+    cache = model.ModelCache(max_size=100, max_bytes=3 * 8000)
+    for key in range(5):
+        cache.put(key, {"model": {"weights": np.zeros(1000)}})
+    assert cache.nbytes == 3 * 8000
+    assert [key for key in range(5) if cache.get(key) is not None] == [2, 3, 4]
+
+def test_oversized_entry_is_kept_alone():
+    cache = model.ModelCache(max_bytes=100)
+    cache.put("a", {"model": np.zeros(10)})
+    cache.put("b", {"model": np.zeros(1000)})
+    assert cache.get("a") is None and cache.get("b") is not None
+
+def test_fitted_model_size_counts_filter_output():
+    small = model.cached_fit(daily_series(100), seasonal_period=7, engine="sarima", max_p=1, max_q=1)
+    large = model.cached_fit(daily_series(1000), seasonal_period=7, engine="sarima", max_p=1, max_q=1)
+    assert large["nbytes"] > 5 * small["nbytes"] > 0
+
+def test_same_values_at_another_frequency_are_fitted_again():
+    calls = []
+
+    def counting_fit(series, exog=None, **kwargs):
+        calls.append(series.index.freqstr)
+        return {"weights": np.zeros(1)}
+
+    daily = daily_series(40, start="2020-01-01", seed=12)
+    weekly = daily.set_axis(pd.date_range("2020-01-05", periods=40, freq="W"))
+    shifted = daily.set_axis(pd.date_range("2021-01-01", periods=40, freq="D"))
+    for series in (daily, weekly, shifted, daily):
+        model.cached_fit(series, fit=counting_fit)
+    assert calls == ["D", "W-SUN", "D"]
@@ -0,0 +1,30 @@
+import warnings
+
+import numpy as np
+from statsmodels.tsa.arima_process import arma_generate_sample
+
+import order_search
+
+def ar4_series(n=365, seed=0):
+    rng = np.random.default_rng(seed)
+    return 50 + arma_generate_sample([1, -0.3, 0.1, -0.1, 0.4], [1], n, distrvs=rng.standard_normal)
+
+def search(y, **kwargs):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return order_search.batched_auto_arima(y, seasonal=False, start_p=0, start_q=0, **kwargs)
+
+def test_order_at_the_fast_path_cap_falls_back_when_wider_bounds_were_requested():
+    assert search(ar4_series(), max_p=5, max_q=5) is None
+
+def test_non_seasonal_search_beyond_the_fast_path_limits_is_left_to_auto_arima():
+    assert not order_search.supports()
+    assert not order_search.supports(max_p=5, max_q=2)
+    assert order_search.supports(max_p=2, max_q=2)
+    assert order_search.supports(m=7)
+    assert not order_search.supports(np.zeros((10, 1)), m=7)
+
+def test_search_within_the_fast_path_limits_returns_a_model():
+    fitted = search(ar4_series(), max_p=2, max_q=2)
+    assert fitted is not None
+    assert fitted.order[0] <= 2 and fitted.order[2] <= 2
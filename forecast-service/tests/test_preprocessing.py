@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing import clean_outliers, detect_level_shifts, regularize, winsorize_outliers
+
+def frame(dates, values, **covariates):
+    return pd.DataFrame({"value": values, **covariates}, index=pd.DatetimeIndex(dates))
+
+def test_gaps_are_inserted_and_filled():
+    df = frame(["2024-01-01", "2024-01-02", "2024-01-05", "2024-01-06"], [1.0, 2.0, 5.0, 6.0],
+               price=[10.0, 11.0, 12.0, 13.0])
+    zero, report = regularize(df, freq="D")
+    assert zero["value"].tolist() == [1.0, 2.0, 0.0, 0.0, 5.0, 6.0]
+    assert zero["price"].tolist() == [10.0, 11.0, 11.0, 11.0, 12.0, 13.0]
+    assert report["gaps_filled"] == 2
+    assert report["output_points"] == 6
+    interpolated, _ = regularize(df, freq="D", fill_method="interpolate")
+    assert interpolated["value"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    carried, _ = regularize(df, freq="D", fill_method="ffill")
+    assert carried["value"].tolist() == [1.0, 2.0, 2.0, 2.0, 5.0, 6.0]
+
+def test_gappy_history_infers_its_step():
+    df = frame(["2024-01-01", "2024-01-02", "2024-01-04", "2024-01-07"], [1.0, 1.0, 1.0, 1.0])
+    regular, report = regularize(df)
+    assert report["frequency"] == "D"
+    assert len(regular) == 7
+
+def test_repeated_dates_are_merged():
+    df = frame(["2024-01-01", "2024-01-01", "2024-01-02", "2024-01-03", "2024-01-03"], [1.0, 2.0, 4.0, 3.0, 5.0])
+    summed, report = regularize(df, freq="D")
+    assert summed["value"].tolist() == [3.0, 4.0, 8.0]
+    assert report["duplicates_merged"] == 2
+    assert report["input_points"] == 5
+    assert regularize(df, freq="D", duplicates="mean")[0]["value"].tolist() == [1.5, 4.0, 4.0]
+    assert regularize(df, freq="D", duplicates="last")[0]["value"].tolist() == [2.0, 4.0, 5.0]
+
+def test_end_date_extends_the_calendar():
+    df = frame(["2024-01-01", "2024-01-02"], [1.0, 2.0])
+    regular, report = regularize(df, freq="D", end_date="2024-01-04")
+    assert regular["value"].tolist() == [1.0, 2.0, 0.0, 0.0]
+    assert report["gaps_filled"] == 2
+
+def test_unknown_options_are_rejected():
+    df = frame(["2024-01-01", "2024-01-02"], [1.0, 2.0])
+    with pytest.raises(ValueError):
+        regularize(df, fill_method="spline")
+    with pytest.raises(ValueError):
+        regularize(df, duplicates="max")
+
+def spike_and_step(n=60, spike=20, step=40, seed=0):
+    """Noisy level of 100 with a spike of +60 at spike and a shift to 130 from step"""
+    rng = np.random.default_rng(seed)
+    values = 100 + rng.normal(0, 2, n)
+    values[step:] += 30
+    values[spike] += 60
+    return values
+
+def test_spike_is_winsorized():
+    values = spike_and_step(step=60)
+    cleaned, changed = winsorize_outliers(values)
+    assert np.flatnonzero(changed).tolist() == [20]
+    assert cleaned[20] < values[20] - 40
+    assert np.array_equal(cleaned[~changed], values[~changed])
+
+def test_step_is_a_level_shift_not_outliers():
+    values = spike_and_step()
+    shifts = detect_level_shifts(values)
+    assert len(shifts) == 1
+    position, size = shifts[0]
+    assert abs(position - 40) <= 1
+    assert size == pytest.approx(30, abs=4)
+    # Winsorizing alone clips the points on either side of the step
+    assert winsorize_outliers(values)[1][38:42].any()
+    df = pd.DataFrame({"value": values}, index=pd.date_range("2024-01-01", periods=len(values), freq="D"))
+    cleaned, report = clean_outliers(df, period=1)
+    assert [outlier["date"] for outlier in report["outliers"]] == ["2024-01-21"]
+    assert cleaned["value"].iloc[45:].mean() == pytest.approx(130, abs=2)
+
+def test_flat_series_is_left_unchanged():
+    cleaned, changed = winsorize_outliers(np.full(30, 5.0))
+    assert not changed.any()
+    assert detect_level_shifts(np.full(30, 5.0)) == []
@@ -0,0 +1,48 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from response_cache import ETagMiddleware
+
+@pytest.fixture
+def counting_client():
+    calls = []
+
+    async def endpoint(request):
+        calls.append(await request.body())
+        return JSONResponse({"value": 1})
+
+    app = Starlette(routes=[Route("/cached", endpoint, methods=["POST"])])
+    app.add_middleware(ETagMiddleware, max_age={"/cached": 60}, uncached_fields=("source",))
+    with TestClient(app) as client:
+        yield client, calls
+
+def test_identical_requests_are_served_from_the_cache(counting_client):
+    client, calls = counting_client
+    first = client.post("/cached", json={"steps": 3})
+    second = client.post("/cached", json={"steps": 3})
+    assert first.json() == second.json() == {"value": 1}
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["cache-control"] == "max-age=60"
+    assert len(calls) == 1
+    client.post("/cached", json={"steps": 3}, headers={"Cache-Control": "no-cache"})
+    assert len(calls) == 2
+
+def test_matching_if_none_match_gets_304(counting_client):
+    client, _ = counting_client
+    tag = client.post("/cached", json={"steps": 3}).headers["etag"]
+    response = client.post("/cached", json={"steps": 3}, headers={"If-None-Match": f'"other", W/{tag}'})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == tag
+
+def test_source_requests_are_not_cached(counting_client):
+    client, calls = counting_client
+    payload = {"source": {"business_id": "1"}, "steps": 3}
+    first = client.post("/cached", json=payload)
+    second = client.post("/cached", json=payload, headers={"If-None-Match": first.headers["etag"]})
+    assert len(calls) == 2
+    assert first.headers["cache-control"] == "no-cache"
+    assert second.status_code == 304
@@ -0,0 +1,41 @@
+import threading
+
+import numpy as np
+
+import model
+import seasonality
+from conftest import daily_series
+
+def test_detects_weekly_period():
+    assert seasonality.detect_seasonal_period(daily_series(120).to_numpy()) == 7
+
+def test_period_cache_is_thread_safe(monkeypatch):
+    monkeypatch.setattr(seasonality, "CACHE_SIZE", 4)
+    seasonality._period_cache.clear()
+    rng = np.random.default_rng(1)
+    series = [np.sin(2 * np.pi * np.arange(60) / 7) + rng.normal(0, 0.1, 60) for _ in range(16)]
+    errors = []
+
+    def detect():
+        try:
+            for _ in range(20):
+                for values in series:
+                    seasonality.detect_seasonal_periods(values)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=detect) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(seasonality._period_cache) <= 4
+
+def test_explicit_period_is_kept_for_short_series():
+    series = daily_series(20)
+    assert model.resolve_seasonality(series, True, 12) == (True, 12)
+    assert model.resolve_seasonality(series, False, 12) == (False, 1)
+
+def test_detected_period_needs_two_cycles():
+    assert model.resolve_seasonality(daily_series(10), True, None) == (False, 1)
@@ -0,0 +1,13 @@
+import model
+import param_store
+
+def test_parameter_store_opens_at_the_configured_path(tmp_path, monkeypatch):
+    path = tmp_path / "configured.db"
+    monkeypatch.setattr(param_store, "PARAM_DB", str(path))
+    model.close_stores()
+    try:
+        model.get_parameter_store().put_selection("entity:1", "sarima:m=7", (1, 0, 1), (0, 0, 0, 0))
+        assert path.exists()
+        assert model.get_parameter_store() is model.get_parameter_store()
+    finally:
+        model.close_stores()